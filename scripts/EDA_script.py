@@ -1,48 +1,50 @@
-import pandas as pd
-import numpy as np
-from sklearn.model_selection import train_test_split
-import altair_ally as aly
 import click
+import sys 
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.columnar_io import read_rows, with_format
+from src.split_data import load_split, SPLIT_FILES
+from src.clean_data import clean_frame
+from src.artifact_cache import run_cached
+from src import eda_charts, clean_data, split_data, columnar_io
+from src.eda_charts import numerical_chart, categorical_chart, save_charts
+from src.instrumentation import stage_timer
 
 @click.command()
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'parquet', 'feather']), default='csv',
+              help='Storage format of the cleaned input.')
+@click.option('--split-folder', type=str, default='data', help='Folder holding the train_idx.npy split.')
+@click.option('--force', is_flag=True, help='Redo the charts even if the input is unchanged since the last run.')
 
-def main(): 
+def main(fmt, split_folder, force): 
 
-    combined_df = pd.read_csv('data/combined_df_clean.csv')
+    # skipped when the cleaned data, the split, this script and the modules it calls are unchanged since
+    # the charts were written
+    outputs = ['results/numerical_chart.png', 'results/categorical_chart.png']
+    inputs = [with_format('data/combined_df_clean.csv', fmt), os.path.join(split_folder, SPLIT_FILES['train']),
+              __file__, eda_charts.__file__, clean_data.__file__, split_data.__file__, columnar_io.__file__]
+    run_cached(f'eda.{fmt}', inputs, outputs, lambda: explore(fmt, split_folder), force=force)
 
-    #same data cleaning codes
-    combined_df['trestbps'] = combined_df['trestbps'].astype('float64')
-    combined_df['chol'] = combined_df['chol'].astype('float64')
-    combined_df['thalach'] = combined_df['thalach'].astype('float64')
-    combined_df['oldpeak'] = combined_df['thalach'].astype('float64')
 
-    # Casting label as categorical 
-    combined_df['label'] = combined_df['label'].astype('category')
+@stage_timer('eda')
+def explore(fmt, split_folder):
 
-    # Casting as categorical 
-    combined_df['cp'] = combined_df['cp'].astype('category')
-    combined_df['sex'] = combined_df['sex'].astype('category')
+    # the charts only show the training rows, read by position from the cleaned data
+    train_idx, _ = load_split(split_folder)
+    train_df = read_rows(with_format('data/combined_df_clean.csv', fmt), train_idx)
 
-    # For the following features, have to first convert dtype to number first to ensure the category labels
-    # are not affected by decimals (i.e. 1.0 and 1 are not treated as different groups)
-    combined_df['exang'] = pd.to_numeric(combined_df['exang'], errors='coerce').astype('category')
-    combined_df['thal'] = pd.to_numeric(combined_df['thal'], errors='coerce').astype('category')
-    combined_df['fbs'] = pd.to_numeric(combined_df['fbs'], errors='coerce').astype('category')
-    combined_df['ca'] = pd.to_numeric(combined_df['ca'], errors='coerce').astype('category')
-    combined_df['slope'] = pd.to_numeric(combined_df['slope'], errors='coerce').astype('category')
-    combined_df['restecg'] = pd.to_numeric(combined_df['restecg'], errors='coerce').astype('category')
+    # Parquet and Feather keep the dtypes set by the cleaning step, CSV has to be cast again
+    if fmt == 'csv':
+        train_df = clean_frame(train_df)
 
-    train_df, test_df = train_test_split(combined_df, test_size=0.3, random_state=123)
-
-    numerical_chart = aly.dist(train_df, color='label')
-    numerical_chart.save('results/numerical_chart.png', format='png')
-
-    categorical_chart = aly.dist(train_df, dtype = 'category', color = 'label')
-    categorical_chart.save('results/categorical_chart.png', format='png')
-
-    train_df.to_csv('data/train_df.csv')
-    test_df.to_csv('data/test_df.csv')
+    # densities and counts are pre-aggregated, so the charts stay small however many rows there are,
+    # and both charts are rendered at the same time
+    save_charts({
+        'results/numerical_chart.png': numerical_chart(train_df, color='label'),
+        'results/categorical_chart.png': categorical_chart(train_df, color='label')
+    })
 
 # call main function 
 if __name__ == "__main__":
-    main() # pass any command line args to main here
\ No newline at end of file
+    main() # pass any command line args to main here
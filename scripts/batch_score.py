@@ -0,0 +1,27 @@
+# heart_disease_batch_score
+# Score a large batch of patients with a model from the model registry.
+
+import click
+import sys 
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.model_registry import load_model
+from src.batch_score import score_batches
+
+@click.command()
+@click.option('--registry-dir', type=str, help='Model registry directory', default='models')
+@click.option('--model', 'model_name', type=str, help='Name of the model to score with', default='Logistic Regression')
+@click.option('--version', type=str, help='Registry version to load (defaults to the latest)', default=None)
+@click.option('--input', 'input_path', type=str, help='CSV or Parquet file with patient features', required=True)
+@click.option('--output', 'output_path', type=str, help='CSV or Parquet file to write predictions to', required=True)
+@click.option('--chunksize', type=int, help='Number of rows scored per chunk', default=10000)
+@click.option('--id-column', type=str, help='Input column copied to the output to identify patients', default=None)
+def main(registry_dir, model_name, version, input_path, output_path, chunksize, id_column):
+    """Load a model once and stream its predictions for a batch of patients."""
+    model = load_model(registry_dir, model_name, version=version)
+    n_rows = score_batches(model, input_path, output_path, chunksize=chunksize, id_column=id_column)
+    print(f"Scored {n_rows} rows with {model_name}. Predictions saved to {output_path}.")
+
+if __name__ == '__main__':
+    main()
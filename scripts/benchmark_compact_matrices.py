@@ -0,0 +1,80 @@
+# heart_disease_benchmark_compact_matrices
+# Compare the memory and fit time of float64 dense, float32 dense and float32 sparse
+# transformed matrices for the logistic regression, SVC and KNN models.
+
+import time
+import click
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.svm import SVC
+from sklearn.neighbors import KNeighborsClassifier
+import sys
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.columnar_io import read_frame
+from src.preprocessing import build_preprocessor
+from src.matrix_io import matrix_nbytes
+
+REPRESENTATIONS = {
+    'float64 dense': {'dtype': 'float64', 'sparse': False},
+    'float32 dense': {'dtype': 'float32', 'sparse': False},
+    'float32 sparse': {'dtype': 'float32', 'sparse': True},
+}
+
+MODELS = {
+    'Logistic Regression': lambda seed: LogisticRegression(max_iter=1000, random_state=seed),
+    'SVC': lambda seed: SVC(random_state=seed),
+    # KNN only stores the training data when fitted, so its prediction time is measured too
+    'KNN': lambda seed: KNeighborsClassifier(),
+}
+
+def best_time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+@click.command()
+@click.option('--input', type=str, help='Cleaned data (CSV, Parquet or Feather)', default='data/combined_df_clean.csv')
+@click.option('--n-rows', type=int, help='Resample the training data to this many rows', default=20000)
+@click.option('--repeat', type=int, help='Number of timed repetitions (the fastest is kept)', default=3)
+@click.option('--seed', type=int, help='Random seed for the resampling and the models', default=123)
+@click.option('--output', type=str, help='CSV file to write the results to', default='results/compact_matrix_benchmark.csv')
+def main(input, n_rows, repeat, seed, output):
+    train_df = read_frame(input)
+    train_df = train_df.sample(n=n_rows, replace=True, random_state=seed).reset_index(drop=True)
+    X, y = train_df.drop(columns=['label']), train_df['label'].astype(str)
+
+    rows = []
+    for representation, options in REPRESENTATIONS.items():
+        X_transformed = build_preprocessor(**options).fit_transform(X)
+        for model_name, make_model in MODELS.items():
+            model = make_model(seed)
+            fit_time = best_time(lambda: model.fit(X_transformed, y), repeat)
+            predict_time = best_time(lambda: model.predict(X_transformed[:1000]), repeat) if model_name == 'KNN' else np.nan
+            rows.append({
+                'representation': representation,
+                'model': model_name,
+                'matrix_bytes': matrix_nbytes(X_transformed),
+                'dtype': str(X_transformed.dtype),
+                'fit_time': fit_time,
+                'predict_time_1000_rows': predict_time,
+            })
+
+    results = pd.DataFrame(rows)
+    baseline = results[results['representation'] == 'float64 dense'].set_index('model')
+    results['memory_ratio'] = results['matrix_bytes'] / baseline.loc[results['model'], 'matrix_bytes'].to_numpy()
+    results['fit_speedup'] = baseline.loc[results['model'], 'fit_time'].to_numpy() / results['fit_time']
+
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    results.to_csv(output, index=False)
+    print(results.to_string(index=False, float_format=lambda value: f"{value:.4g}"))
+    print(f"Benchmark results saved to {output}")
+
+if __name__ == '__main__':
+    main()
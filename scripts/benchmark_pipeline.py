@@ -0,0 +1,40 @@
+# heart_disease_benchmark_pipeline
+# Time and memory-profile each pipeline stage on synthetic data of increasing size, and
+# compare the results with those of an earlier commit.
+
+import click
+import sys
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.benchmark import MODEL_NAMES, run_benchmarks, compare_benchmarks
+
+@click.command()
+@click.option('--size', 'sizes', type=int, multiple=True, default=[1000, 10000, 100000],
+              help='Number of synthetic rows to benchmark (repeatable, from 1e3 to 1e7).')
+@click.option('--seed', type=int, default=0, help='Random seed of the data, the split and the tuning.')
+@click.option('--model', 'models', type=click.Choice(MODEL_NAMES), multiple=True,
+              help='Models to tune (repeatable). Defaults to all four.')
+@click.option('--skip-models', is_flag=True, help='Only benchmark the data stages.')
+@click.option('--max-model-rows', type=int, default=5000, help='Maximum number of training rows used to tune the models.')
+@click.option('--n-iter', type=int, default=3, help='Number of candidates sampled per model.')
+@click.option('--n-bootstrap', type=int, default=10000, help='Bootstrap resamples of the test metrics (0 skips the stage).')
+@click.option('--no-memory', is_flag=True, help='Only time the stages, without a second run tracing their memory.')
+@click.option('--output', type=str, default='results/benchmarks/pipeline.json', help='JSON file to write the results to.')
+@click.option('--baseline', type=str, default=None, help='Earlier JSON results to compare with.')
+@click.option('--threshold', type=float, default=1.2, help='Time or memory ratio flagged as a regression.')
+def main(sizes, seed, models, skip_models, max_model_rows, n_iter, n_bootstrap, no_memory, output, baseline, threshold):
+    models = [] if skip_models else (list(models) or None)
+    report = run_benchmarks(list(sizes), seed=seed, models=models, max_model_rows=max_model_rows,
+                            n_iter=n_iter, n_bootstrap=n_bootstrap, trace_memory=not no_memory, output_file=output)
+    print(f"Benchmark results saved to {output}")
+
+    if baseline is not None:
+        comparison = compare_benchmarks(baseline, report, threshold=threshold)
+        print(comparison.to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+        regressions = comparison[comparison['regression']]
+        if len(regressions):
+            print(f"{len(regressions)} stage(s) are more than {threshold}x slower or larger than in {baseline}.")
+
+if __name__ == '__main__':
+    main()
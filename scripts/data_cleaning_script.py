@@ -1,48 +1,52 @@
-import pandas as pd
-import numpy as np
 import click
+import sys 
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.columnar_io import read_frame, write_frame
+from src.dedup_index import drop_duplicate_rows
+from src.clean_data import clean_frame
+from src.artifact_cache import run_cached
+from src.instrumentation import stage_timer
+from src import clean_data as clean_data_module, dedup_index, columnar_io
 
 @click.command()
 @click.option('--input', type=str)
 @click.option('--output', type=str)
+@click.option('--force', is_flag=True, help='Clean the data even if the input and output are unchanged since the last run.')
 
-def main(input, output): 
+def main(input, output, force): 
 
-    combined_df = pd.read_csv(input)
-    combined_df.replace("?", np.nan, inplace = True)
+    # skipped when the input file, this script and the modules it calls are unchanged since the output was written
+    inputs = [input, __file__, clean_data_module.__file__, dedup_index.__file__, columnar_io.__file__]
+    run_cached(f'clean.{os.path.basename(output)}', inputs, [output],
+               lambda: clean_data(input, output), force=force)
 
-    columns = ['age','sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal', 'label']
-    
-
-    ## delete duplicated rows
-    #This process ensures the data is clean, well-formatted, and appropriate for analysis or modeling.
-    duplicate_index = [102,187]
-    combined_df = combined_df.drop(index=duplicate_index).reset_index(drop=True)
-
-    # Casting continuous features to float64 instead of categories 
-    combined_df['trestbps'] = combined_df['trestbps'].astype('float64')
-    combined_df['chol'] = combined_df['chol'].astype('float64')
-    combined_df['thalach'] = combined_df['thalach'].astype('float64')
-    combined_df['oldpeak'] = combined_df['thalach'].astype('float64')
 
-    # Casting label as categorical 
-    combined_df['label'] = combined_df['label'].astype('category')
+def clean_data(input, output):
 
-    # Casting as categorical 
-    combined_df['cp'] = combined_df['cp'].astype('category')
-    combined_df['sex'] = combined_df['sex'].astype('category')
-
-    # For the following features, have to first convert dtype to number first to ensure the category labels
-    # are not affected by decimals (i.e. 1.0 and 1 are not treated as different groups)
-    combined_df['exang'] = pd.to_numeric(combined_df['exang'], errors='coerce').astype('category')
-    combined_df['thal'] = pd.to_numeric(combined_df['thal'], errors='coerce').astype('category')
-    combined_df['fbs'] = pd.to_numeric(combined_df['fbs'], errors='coerce').astype('category')
-    combined_df['ca'] = pd.to_numeric(combined_df['ca'], errors='coerce').astype('category')
-    combined_df['slope'] = pd.to_numeric(combined_df['slope'], errors='coerce').astype('category')
-    combined_df['restecg'] = pd.to_numeric(combined_df['restecg'], errors='coerce').astype('category')
+    # the file format (CSV, Parquet or Feather) follows the file extension
+    # the '?' sentinel is parsed as missing while reading
+    combined_df = read_frame(input, na_values=['?'])
 
+    columns = ['age','sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal', 'label']
+    
 
-    combined_df.to_csv(output, index=False)
+    with stage_timer('clean', rows=len(combined_df)) as record:
+        ## delete duplicated rows
+        #This process ensures the data is clean, well-formatted, and appropriate for analysis or modeling.
+        #Rows are found by their hashes, so the duplicates follow the data instead of fixed row numbers.
+        combined_df, duplicate_index = drop_duplicate_rows(combined_df)
+        combined_df = combined_df.reset_index(drop=True)
+        print(f"Dropped {len(duplicate_index)} duplicate row(s) at index {duplicate_index.tolist()}.")
+        record['duplicates'] = len(duplicate_index)
+
+        # Continuous features are stored as float32 and categorical ones (including the label) as
+        # categories with int8 codes, following CLEANING_SCHEMA. Every column is parsed as a number
+        # first, so the category labels are not affected by decimals (1.0 and 1 are one group).
+        combined_df = clean_frame(combined_df)
+
+    write_frame(combined_df, output)
 
 
 # call main function 
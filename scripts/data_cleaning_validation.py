@@ -1,47 +1,37 @@
-import pandas as pd
-import numpy as np
 import click
+import sys 
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.columnar_io import read_frame, write_frame
+from src.dedup_index import drop_duplicate_rows
+from src.clean_data import clean_frame
 
 @click.command()
 @click.option('--path', type=str)
 
 def main(path): 
 
-    combined_df = pd.read_csv(path)
-    combined_df.replace("?", np.nan, inplace = True)
+    # the file format (CSV, Parquet or Feather) follows the file extension
+    # the '?' sentinel is parsed as missing while reading
+    combined_df = read_frame(path, na_values=['?'])
 
     columns = ['age','sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal', 'label']
     
 
     ## delete duplicated rows
     #This process ensures the data is clean, well-formatted, and appropriate for analysis or modeling.
-    duplicate_index = [102,187]
-    combined_df = combined_df.drop(index=duplicate_index).reset_index(drop=True)
+    #Rows are found by their hashes, so the duplicates follow the data instead of fixed row numbers.
+    combined_df, duplicate_index = drop_duplicate_rows(combined_df)
+    combined_df = combined_df.reset_index(drop=True)
+    print(f"Dropped {len(duplicate_index)} duplicate row(s) at index {duplicate_index.tolist()}.")
 
-    # Casting continuous features to float64 instead of categories 
-    combined_df['trestbps'] = combined_df['trestbps'].astype('float64')
-    combined_df['chol'] = combined_df['chol'].astype('float64')
-    combined_df['thalach'] = combined_df['thalach'].astype('float64')
-    combined_df['oldpeak'] = combined_df['thalach'].astype('float64')
+    # Continuous features are stored as float32 and categorical ones (including the label) as
+    # categories with int8 codes, following CLEANING_SCHEMA. Every column is parsed as a number
+    # first, so the category labels are not affected by decimals (1.0 and 1 are one group).
+    combined_df = clean_frame(combined_df)
 
-    # Casting label as categorical 
-    combined_df['label'] = combined_df['label'].astype('category')
-
-    # Casting as categorical 
-    combined_df['cp'] = combined_df['cp'].astype('category')
-    combined_df['sex'] = combined_df['sex'].astype('category')
-
-    # For the following features, have to first convert dtype to number first to ensure the category labels
-    # are not affected by decimals (i.e. 1.0 and 1 are not treated as different groups)
-    combined_df['exang'] = pd.to_numeric(combined_df['exang'], errors='coerce').astype('category')
-    combined_df['thal'] = pd.to_numeric(combined_df['thal'], errors='coerce').astype('category')
-    combined_df['fbs'] = pd.to_numeric(combined_df['fbs'], errors='coerce').astype('category')
-    combined_df['ca'] = pd.to_numeric(combined_df['ca'], errors='coerce').astype('category')
-    combined_df['slope'] = pd.to_numeric(combined_df['slope'], errors='coerce').astype('category')
-    combined_df['restecg'] = pd.to_numeric(combined_df['restecg'], errors='coerce').astype('category')
-
-
-    combined_df.to_csv(path, index=False)
+    write_frame(combined_df, path)
 
 
 # call main function 
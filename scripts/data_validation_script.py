@@ -8,12 +8,47 @@ import sys
 import os
 current_dir = os.getcwd()
 sys.path.append(current_dir)
-from src.validate_data import check_empty_obs, check_missingness, check_duplicate_obs
+from src.validate_data import check_empty_obs, check_missingness, check_duplicate_obs, check_value_ranges, validate_chunks
+from src.batch_score import read_batches
+from src.check_cache import dataset_fingerprint, run_check_cached
+from src.incremental_validation import validate_incremental
+from src.columnar_io import read_frame
+from src.combine_load_data import NA_REP
+from src.instrumentation import stage_timer
+
+# the combine step parses every column to float64 with '?' as missing, whatever the storage format, so the
+# integer-coded columns are checked for whole numbers instead of an integer dtype
+WHOLE_NUMBERS = pa.Check(lambda s: s % 1 == 0, error="whole numbers")
+
+COLUMN_TYPE_SCHEMA = pa.DataFrameSchema(
+    {
+        "age": pa.Column(pa.Float, WHOLE_NUMBERS, nullable = True),
+        "sex": pa.Column(pa.Float, WHOLE_NUMBERS, nullable = True),
+        "cp": pa.Column(pa.Float, WHOLE_NUMBERS, nullable = True),
+        "trestbps": pa.Column(pa.Float, WHOLE_NUMBERS, nullable = True),
+        "chol": pa.Column(pa.Float, WHOLE_NUMBERS, nullable = True),
+        "fbs": pa.Column(pa.Float, WHOLE_NUMBERS, nullable = True),
+        "restecg": pa.Column(pa.Float, WHOLE_NUMBERS, nullable = True),
+        "thalach": pa.Column(pa.Float, WHOLE_NUMBERS, nullable = True),
+        "exang": pa.Column(pa.Float, WHOLE_NUMBERS, nullable = True),
+        "oldpeak": pa.Column(pa.Float, nullable = True),
+        "slope": pa.Column(pa.Float, WHOLE_NUMBERS, nullable = True),
+        "ca": pa.Column(pa.Float, WHOLE_NUMBERS, nullable = True),
+        "thal": pa.Column(pa.Float, WHOLE_NUMBERS, nullable = True),
+        "label": pa.Column(pa.Float, WHOLE_NUMBERS, nullable = True)
+    }    
+)
 
 @click.command()
 @click.option('--input', type=str)
-
-def main(input): 
+@click.option('--chunksize', type=int, default=None,
+              help='Validate the file in chunks of this many rows (empty rows, missingness and duplicates only).')
+@click.option('--check-cache-dir', type=str, default='results/validation_cache',
+              help='Directory caching the correlation check results of unchanged data.')
+@click.option('--state-dir', type=str, default=None,
+              help='Directory with the state of the last validation; only rows appended since then are checked.')
+@stage_timer('validate')
+def main(input, chunksize, check_cache_dir, state_dir): 
 
     file_path_hungarian = 'data/processed.hungarian.data'
     file_path_switzerland = 'data/processed.switzerland.data'
@@ -21,7 +56,19 @@ def main(input):
     file_path_va = 'data/processed.va.data'
     columns = ['age','sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal', 'label']
     
-    combined_df = pd.read_csv(input)
+    ## --- Out-of-core mode
+    #For files larger than memory, the empty row, missingness and duplicate checks run in a single pass over
+    #the chunks, keeping only running counts and row fingerprints. The remaining checks need the whole DataFrame.
+
+    if chunksize is not None:
+        validate_chunks(read_batches(input, chunksize, na_values=[NA_REP]))
+        return
+
+    #CSV files store missing values as the '?' sentinel and Parquet/Feather files as nulls. Both are read as missing,
+    #and CSV columns without missing values (read as integers) are cast to the float64 of the columnar files,
+    #so every format gives the same checks
+    combined_df = read_frame(input, na_values=[NA_REP])
+    combined_df = combined_df.astype({column: "float64" for column in combined_df.select_dtypes("integer")})
 
     ## --- 1. Correct data file format
 
@@ -42,6 +89,15 @@ def main(input):
     else:
         print("Column names are correct.")
     
+    ## --- Incremental mode
+    #New site data is appended to the combined file, so only the rows added since the last run are validated.
+    #Their counts, row hashes and correlation statistics are merged with the stored state of the earlier rows,
+    #and the report covers the whole dataset (see validate_incremental).
+
+    if state_dir is not None:
+        validate_incremental(combined_df, state_dir, schema=COLUMN_TYPE_SCHEMA)
+        return
+
     ## --- 3. No empty observations
     #This script checks whether the files specified by the paths in the list file_path all have the .data file extension
 
@@ -53,30 +109,12 @@ def main(input):
     check_missingness(combined_df)
 
     ## --- 5. Correct data types in each column
-    #This script uses the pandera library to validate the combined_df DataFrame's columns against a predefined schema (column_type_schema).
+    #This script uses the pandera library to validate the combined_df DataFrame's columns against a predefined schema (COLUMN_TYPE_SCHEMA).
     #If the columns match the expected data types, it prints a success message. If any columns don't match the expected types,
     #it prints a warning with details about the mismatch
 
-    column_type_schema = pa.DataFrameSchema(
-        {
-            "age": pa.Column(pa.Int, nullable = True),
-            "sex": pa.Column(pa.Int, nullable = True),
-            "cp": pa.Column(pa.String, nullable = True),
-            "trestbps": pa.Column(pa.Int, nullable = True),
-            "chol": pa.Column(pa.Int, nullable = True),
-            "fbs": pa.Column(pa.Int, nullable = True),
-            "restecg": pa.Column(pa.String, nullable = True),
-            "thalach": pa.Column(pa.Int, nullable = True),
-            "exang": pa.Column(pa.String, nullable = True),
-            "oldpeak": pa.Column(pa.Float, nullable = True),
-            "slope": pa.Column(pa.String, nullable = True),
-            "ca": pa.Column(pa.Float, nullable = True),
-            "thal": pa.Column(pa.String, nullable = True),
-            "label": pa.Column(pa.Int, nullable = True)
-        }    
-    )
     try:
-        column_type_schema.validate(combined_df)
+        COLUMN_TYPE_SCHEMA.validate(combined_df)
         print("All columns have correct data types.")
     except pa.errors.SchemaError as e:
         print(f"Warning: Validation failed: {e}")
@@ -88,32 +126,12 @@ def main(input):
     check_duplicate_obs(combined_df)
     
     ## --- 7. No outlier or anomalous values
-    #This script uses the pandera library to validate the values in the combined_df DataFrame against a defined schema (values_schema) to ensure the values meet specific criteria (e.g., value ranges, membership in predefined sets).
-    #It performs this validation after converting the values in combined_df to float (if not NaN) to facilitate numeric checks.
-
-    values_schema = pa.DataFrameSchema({
-        "age": pa.Column(int, pa.Check.between(0, 120), nullable=True),
-        "sex": pa.Column(float, pa.Check.isin([0.0, 1.0]), nullable=True), 
-        "cp": pa.Column(float, pa.Check.isin([1.0, 2.0, 3.0, 4.0]), nullable=True), 
-        "trestbps": pa.Column(float, pa.Check.between(20, 220), nullable=True),
-        "chol": pa.Column(float, pa.Check.between(0, 800), nullable=True), 
-        "fbs": pa.Column(float, pa.Check.isin([0.0, 1.0]), nullable=True), 
-        "restecg": pa.Column(float, pa.Check.isin([0.0, 1.0, 2.0]), nullable=True),  
-        "thalach": pa.Column(float, pa.Check.between(50, 240), nullable=True),  
-        "exang":  pa.Column(float, pa.Check.isin([0.0, 1.0]), nullable=True),  
-        "oldpeak": pa.Column(float, pa.Check.between(0.0, 250.0), nullable=True),  
-        "slope": pa.Column(float, pa.Check.isin([1.0, 2.0, 3.0]), nullable=True),  
-        "ca": pa.Column(float, pa.Check.between(0, 4), nullable=True), 
-        "thal": pa.Column(float, pa.Check.isin([3.0, 6.0, 7.0]), nullable=True),  
-        "label": pa.Column(float, pa.Check.between(0.0, 4.0), nullable=True),  
-    })
-
-    replicate_df = combined_df.applymap(lambda x: float(x) if pd.notnull(x) else x)
+    #This script checks the values in the combined_df DataFrame against the range and membership rules in VALUE_RULES
+    #(e.g., age between 0 and 120, cp in {1, 2, 3, 4}). Each column is converted to numbers once and all rules are
+    #evaluated in a single vectorized pass, reporting how many rows (and which ones) violate each rule.
 
-    try:
-        values_schema.validate(replicate_df, lazy = True)
-        print("No outlier or anomalous value found.")
-    except pa.errors.SchemaErrors as e:
+    value_report = check_value_ranges(combined_df)
+    if any(result["violations"] for result in value_report.values()):
         print(f"Warning: There're outlier or anomalous values.")
     
     ## --- 9. Target/response variable follows expected distribution
@@ -125,12 +143,17 @@ def main(input):
 
     ## --- 10. No anomalous correlations between target variable and features variables
 
+    #Each correlation check runs once; its result is cached by a content hash of combined_df and the check
+    #configuration, so later runs on unchanged data load the result instead of recomputing it.
+
     categorical_features = ['sex', 'cp', 'fbs', 'restecg', 'exang', 'slope', 'ca', 'thal']
     ds = Dataset(combined_df, label='label', cat_features=categorical_features)
+    fingerprint = dataset_fingerprint(combined_df)
+    dataset_params = {'label': 'label', 'cat_features': categorical_features}
 
     check_feat_lab_corr = FeatureLabelCorrelation().add_condition_feature_pps_less_than(0.9)
-    check_feat_lab_corr_result = check_feat_lab_corr.run(dataset=ds)
-    check_feat_lab_corr.run(dataset=ds).show()
+    check_feat_lab_corr_result = run_check_cached(check_feat_lab_corr, ds, fingerprint, check_cache_dir, dataset_params)
+    check_feat_lab_corr_result.show()
     if not check_feat_lab_corr_result.passed_conditions():
         raise ValueError("The correlation between target and features variables exceeds the threshold.")
     else:
@@ -141,8 +164,8 @@ def main(input):
     #(above a threshold of 0.9) between feature variables in a dataset.
 
     check_feat_feat_corr = FeatureFeatureCorrelation(threshold=0.9)
-    check_feat_feat_corr_result = check_feat_feat_corr.run(dataset=ds)
-    check_feat_feat_corr.run(dataset=ds).show()
+    check_feat_feat_corr_result = run_check_cached(check_feat_feat_corr, ds, fingerprint, check_cache_dir, dataset_params)
+    check_feat_feat_corr_result.show()
 
     if not check_feat_feat_corr_result.passed_conditions():
         raise ValueError("The correlation between features variables exceeds the threshold.")
@@ -1,26 +1,78 @@
 import pandas as pd
 import click
-import sys 
+import sys
 import os
 current_dir = os.getcwd()
 sys.path.append(current_dir)
-from src.combine_load_data import combine_load_data
-
-def combine_files(output_file):
-    file_paths = [
-        'data/processed.hungarian.data',
-        'data/processed.switzerland.data',
-        'data/processed.cleveland.data',
-        'data/processed.va.data'
-    ]
-    columns = ['age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 
+from src.combine_load_data import combine_load_data_chunks, write_chunks, parse_missing
+from src.ingest_sources import resolve_sources, sync_from_mirror, load_sources
+from src.artifact_cache import run_cached
+from src.instrumentation import stage_timer
+from src import combine_load_data, ingest_sources, columnar_io
+
+DEFAULT_SOURCES = [
+    {'site': 'hungarian', 'path': 'data/processed.hungarian.data', 'sha256': None},
+    {'site': 'switzerland', 'path': 'data/processed.switzerland.data', 'sha256': None},
+    {'site': 'cleveland', 'path': 'data/processed.cleveland.data', 'sha256': None},
+    {'site': 'va', 'path': 'data/processed.va.data', 'sha256': None}
+]
+
+def combine_files(output_file, chunksize=None, sources=None, max_workers=None, site_column=None):
+    if sources is None:
+        sources = DEFAULT_SOURCES
+    columns = ['age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg',
                'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal', 'label']
-    
-    combined_df = combine_load_data(file_paths, columns)
-    
-    #save combined df
-    combined_df.to_csv(output_file, index=False)
+
+    if chunksize is not None:
+        if site_column is not None:
+            raise ValueError("Tagging rows with their site is not supported in streaming mode.")
+        # stream fixed-size chunks straight to the output without building the full frame
+        file_paths = [source['path'] for source in sources]
+        with stage_timer('combine', chunksize=chunksize) as record:
+            n_rows = write_chunks(combine_load_data_chunks(file_paths, columns, chunksize=chunksize), output_file)
+            record['rows'] = n_rows
+        print(f"Combined data ({n_rows} rows) streamed to {output_file}")
+        return
+
+    with stage_timer('combine') as record:
+        # load every site file concurrently, combined in source order
+        combined_df = load_sources(sources, columns, max_workers=max_workers, site_column=site_column)
+        record['rows'] = len(combined_df)
+
+        # parsed and written as in streaming mode, so both modes give the same file
+        combined_df = parse_missing(combined_df, columns)
+
+        #save combined df
+        write_chunks([combined_df], output_file)
     print(f"Combined data saved to {output_file}")
 
+@click.command()
+@click.option('--output', type=str, help='Path to the combined CSV, Parquet or Feather file', default='data/combined_df.csv')
+@click.option('--chunksize', type=int, help='Stream the files in chunks of this many rows instead of loading them whole', default=None)
+@click.option('--config', type=str, help='JSON file listing the site files to ingest', default=None)
+@click.option('--glob', 'pattern', type=str, help="Glob pattern matching the site files, e.g. 'data/processed.*.data'", default=None)
+@click.option('--mirror-dir', type=str, help='Local mirror to copy (resumably, checksum-verified) the site files from', default=None)
+@click.option('--max-workers', type=int, help='Number of files loaded or copied in parallel', default=None)
+@click.option('--site-column', type=str, help='Add a column with this name tagging each row with its source site', default=None)
+@click.option('--force', is_flag=True, help='Combine the files even if they are unchanged since the last run')
+def main(output, chunksize, config, pattern, mirror_dir, max_workers, site_column, force):
+    sources = None
+    if config is not None or pattern is not None:
+        sources = resolve_sources(config_path=config, pattern=pattern)
+
+    if mirror_dir is not None:
+        statuses = sync_from_mirror(sources or DEFAULT_SOURCES, mirror_dir, max_workers=max_workers)
+        for site, status in statuses.items():
+            print(f"{site}: {status} from {mirror_dir}")
+
+    # skipped when the site files, this script, the modules it calls and the options are unchanged
+    # since the output was written
+    inputs = [source['path'] for source in sources or DEFAULT_SOURCES] + [
+        __file__, combine_load_data.__file__, ingest_sources.__file__, columnar_io.__file__]
+    run_cached(f'combine.{os.path.basename(output)}', inputs, [output],
+               lambda: combine_files(output, chunksize=chunksize, sources=sources, max_workers=max_workers,
+                                     site_column=site_column),
+               config={'chunksize': chunksize, 'site_column': site_column}, force=force)
+
 if __name__ == '__main__':
-    combine_files('data/combined_df.csv')
\ No newline at end of file
+    main()
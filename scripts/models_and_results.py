@@ -23,26 +23,48 @@ import os
 current_dir = os.getcwd()
 sys.path.append(current_dir)
 from src.models_fit_and_result_output import models_fit_and_result_output
+from src.transform_cache import TransformCache
+from src.trial_store import TrialStore
+from src.columnar_io import read_frame, with_format
 
 @click.command()
 @click.option('--output-file-path', type=str, help='Path to the output results file', default="results/model_evaluation_results.txt")
 @click.option('--seed', type=int, help='Random seed for reproducibility', default=123)
-def main(output_file_path, seed):
+@click.option('--n-jobs', type=int, help='Number of worker processes shared by all models during tuning (-1 for all cores)', default=None)
+@click.option('--search', type=click.Choice(['random', 'halving']), help='Hyperparameter search strategy', default='random')
+@click.option('--n-iter', type=int, help='Number of candidates sampled per model', default=10)
+@click.option('--transform-cache-dir', type=str, help='Directory to persist the per-fold preprocessing cache across runs', default=None)
+@click.option('--transform-cache-max-mb', type=int, help='Memory limit of the per-fold preprocessing cache in MB (0 for no limit)', default=1024)
+@click.option('--registry-dir', type=str, help='Model registry directory to save the best pipelines to as a new version (not saved if omitted)', default=None)
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'parquet', 'feather']), help='Storage format of the preprocessed data files', default='csv')
+@click.option('--data-folder', type=str, help='Folder holding the preprocessed data files and the preprocessor', default='../data')
+@click.option('--n-bootstrap', type=int, help='Bootstrap resamples for the confidence intervals of the test metrics (0 to skip)', default=10000)
+@click.option('--trial-store-dir', type=str, help='Directory of the store of evaluated (candidate, fold) fits reused by later searches (not used if omitted)', default=None)
+def main(output_file_path, seed, n_jobs, search, n_iter, transform_cache_dir, transform_cache_max_mb, registry_dir, fmt, data_folder, n_bootstrap,
+         trial_store_dir):
     
     #The models dictionary holds the classifier objects for different algorithms.
     #The param_distributions dictionary specifies the ranges and values for hyperparameters to be explored during optimization.
     #This setup allows for an efficient search over multiple hyperparameters and algorithms to find the best configuration for the task at hand.
 
-    X_train = pd.read_csv('../data/x_train.csv', index_col = 0)
-    y_train = pd.read_csv('../data/y_train.csv')
-    X_test = pd.read_csv('../data/x_test.csv', index_col = 0)
-    y_test = pd.read_csv('../data/y_test.csv')
+    # the split stage stores row positions, so the feature files no longer carry an index column
+    X_train = read_frame(with_format(os.path.join(data_folder, 'x_train.csv'), fmt))
+    X_test = read_frame(with_format(os.path.join(data_folder, 'x_test.csv'), fmt))
+    y_train = read_frame(with_format(os.path.join(data_folder, 'y_train.csv'), fmt))
+    y_test = read_frame(with_format(os.path.join(data_folder, 'y_test.csv'), fmt))
     y_train = y_train['label']
     y_test = y_test['label']
-    preprocessor = pickle.load(open('../data/preprocessor.pkl', "rb"))
+    preprocessor = pickle.load(open(os.path.join(data_folder, 'preprocessor.pkl'), "rb"))
+    
+    transform_cache = TransformCache(max_bytes=transform_cache_max_mb * 2 ** 20 or None, cache_dir=transform_cache_dir)
     
     output_file_dir = "results"
-    models_fit_and_result_output(preprocessor, X_train, y_train, X_test, y_test, output_file_dir,seed=123)
+    models_fit_and_result_output(preprocessor, X_train, y_train, X_test, y_test, output_file_dir,seed=123,n_jobs=n_jobs,
+                                 search=search,n_iter=n_iter,
+                                 transform_cache=transform_cache,
+                                 registry_dir=registry_dir,
+                                 n_bootstrap=n_bootstrap,
+                                 trial_store=None if trial_store_dir is None else TrialStore(trial_store_dir))
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
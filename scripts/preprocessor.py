@@ -1,96 +1,129 @@
 import os
 import click
+import joblib
 import pandas as pd
-from sklearn.compose import make_column_transformer
-from sklearn.pipeline import make_pipeline
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
-from sklearn.impute import SimpleImputer
 import pickle
+import sys 
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.columnar_io import read_rows, iter_rows, write_frame, with_format
+from src.split_data import load_split, SPLIT_FILES
+from src.artifact_cache import run_cached
+from src.preprocessing import build_preprocessor, feature_names, fit_preprocessor_streaming, transform_chunks
+from src.combine_load_data import write_chunks
+from src.matrix_io import save_matrix
+from src.instrumentation import stage_timer
+from src import preprocessing, split_data, columnar_io, combine_load_data, matrix_io
 
 @click.command()
-@click.option('--data-folder', default='data', help='Path to the folder containing input data files.')
+@click.option('--data-folder', default='data', help='Path to the folder containing the cleaned data and the split.')
 @click.option('--output-folder', default='output', help='Path to the folder for saving output files.')
-def preprocess(data_folder, output_folder):
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'parquet', 'feather']), default='csv',
+              help='Storage format of the input and output data files.')
+@click.option('--force', is_flag=True, help='Refit even if the inputs and outputs are unchanged since the last run.')
+@click.option('--chunksize', type=int, default=None,
+              help='Fit and transform out of core, reading this many rows at a time.')
+@click.option('--dtype', type=click.Choice(['float64', 'float32']), default='float64',
+              help='Dtype of the transformed matrices, also used when fitting the models.')
+@click.option('--sparse', is_flag=True,
+              help='Encode the one-hot blocks sparsely and output sparse CSR matrices.')
+def preprocess(data_folder, output_folder, fmt, force, chunksize, dtype, sparse):
     """Preprocess the train and test datasets and save the results."""
-    # we define our input file paths
-    train_file = os.path.join(data_folder, 'train_df.csv')
-    test_file = os.path.join(data_folder, 'test_df.csv')
+    # compact matrices (float32 or sparse) are saved as memory-mappable .npy/.npz files
+    compact = dtype != 'float64' or sparse
+    if compact and chunksize is not None:
+        raise click.UsageError('--chunksize writes data frames and cannot be combined with --dtype float32 or --sparse.')
+    # we define our input file paths: the train and test rows are read by position from the cleaned data
+    clean_file = with_format(os.path.join(data_folder, 'combined_df_clean.csv'), fmt)
+    split_files = [os.path.join(data_folder, SPLIT_FILES[name]) for name in ('train', 'test')]
 
     # we define our output file paths
     os.makedirs(output_folder, exist_ok=True)
     preprocessor_file = os.path.join(output_folder, 'preprocessor.pkl')
-    processed_train_file = os.path.join(output_folder, 'processed_X_train.csv')
-    processed_test_file = os.path.join(output_folder, 'processed_X_test.csv')
-    x_train_file = os.path.join(output_folder, 'x_train.csv')
-    x_test_file = os.path.join(output_folder, 'x_test.csv')
-    y_train_file = os.path.join(output_folder, 'y_train.csv')
-    y_test_file = os.path.join(output_folder, 'y_test.csv')
-
-    # loading out data
-    train_df = pd.read_csv(train_file)
-    test_df = pd.read_csv(test_file)
-
-    # Separating our features and labels
-    X_train = train_df.drop(columns=["label"])
-    X_test = test_df.drop(columns=["label"])
-    y_train = train_df["label"]
-    y_test = test_df["label"]
-
-    # We proceed to save y_train and y_test
-    y_train.to_csv(y_train_file, index=False)
-    y_test.to_csv(y_test_file, index=False)
-
-    # We then move to the next step and define feature groups
-    numeric_features = ['age', 'trestbps', 'chol', 'thalach', 'oldpeak']
-    categorical_features = ['cp', 'restecg']
-    binary_features = ['sex', 'exang', 'fbs']
-    drop_features = ['thal', 'ca', 'slope']
-
-    # Define transformation pipelines
-    numeric_transformer_pipe = make_pipeline(
-        SimpleImputer(strategy='median'),
-        StandardScaler()
-    )
-    categorical_transformer_pipe = make_pipeline(
-        SimpleImputer(strategy='most_frequent'),
-        OneHotEncoder(drop='if_binary', sparse_output=False)
-    )
-    binary_transformer = SimpleImputer(strategy='most_frequent')
-
-    # We combine into a column transformer
-    preprocessor = make_column_transformer(
-        (numeric_transformer_pipe, numeric_features),
-        (categorical_transformer_pipe, categorical_features),
-        (binary_transformer, binary_features),
-        ("drop", drop_features)
-    )
-
-    # Fit and transform the data
-    X_train_transformed = preprocessor.fit_transform(X_train)
-    X_test_transformed = preprocessor.transform(X_test)
-
-    # Get transformed column names
-    col_names = (
-        numeric_features +
-        preprocessor.named_transformers_['pipeline-2'].get_feature_names_out().tolist() + 
-        binary_features
-    )
-
-    # Convert transformed data into DataFrames
-    X_train_transformed = pd.DataFrame(X_train_transformed, columns=col_names)
-    X_test_transformed = pd.DataFrame(X_test_transformed, columns=col_names)
-
-    # Saving of the processed data
-    X_train_transformed.to_csv(processed_train_file, index=False)
-    X_test_transformed.to_csv(processed_test_file, index=False)
-    X_train.to_csv(x_train_file, index=False)
-    X_test.to_csv(x_test_file, index=False)
-
-    # Save the preprocessor
-    with open(preprocessor_file, 'wb') as f:
-        pickle.dump(preprocessor, f)
-
-    print(f"Preprocessing complete. Files saved in {output_folder}.")
+    matrix_ext = '.npz' if sparse else '.npy'
+    processed_train_file = os.path.join(output_folder, 'processed_X_train' + matrix_ext) if compact \
+        else with_format(os.path.join(output_folder, 'processed_X_train.csv'), fmt)
+    processed_test_file = os.path.join(output_folder, 'processed_X_test' + matrix_ext) if compact \
+        else with_format(os.path.join(output_folder, 'processed_X_test.csv'), fmt)
+    x_train_file = with_format(os.path.join(output_folder, 'x_train.csv'), fmt)
+    x_test_file = with_format(os.path.join(output_folder, 'x_test.csv'), fmt)
+    y_train_file = with_format(os.path.join(output_folder, 'y_train.csv'), fmt)
+    y_test_file = with_format(os.path.join(output_folder, 'y_test.csv'), fmt)
+
+    # The column transformer (median/most frequent imputation, scaling and one-hot encoding)
+    preprocessor = build_preprocessor(dtype=dtype, sparse=sparse)
+
+    def fit_and_save():
+        # loading out data
+        train_idx, test_idx = load_split(data_folder)
+        train_df = read_rows(clean_file, train_idx)
+        test_df = read_rows(clean_file, test_idx)
+
+        # Separating our features and labels
+        X_train = train_df.drop(columns=["label"])
+        X_test = test_df.drop(columns=["label"])
+        y_train = train_df["label"]
+        y_test = test_df["label"]
+
+        # We proceed to save y_train and y_test
+        write_frame(y_train.to_frame(), y_train_file)
+        write_frame(y_test.to_frame(), y_test_file)
+
+        # Fit and transform the data
+        with stage_timer('preprocess.fit_transform', rows=len(X_train)):
+            X_train_transformed = preprocessor.fit_transform(X_train)
+        with stage_timer('preprocess.transform', rows=len(X_test)):
+            X_test_transformed = preprocessor.transform(X_test)
+
+        # Saving of the processed data
+        if compact:
+            save_matrix(X_train_transformed, processed_train_file)
+            save_matrix(X_test_transformed, processed_test_file)
+        else:
+            # Convert transformed data into DataFrames with the transformed column names
+            col_names = feature_names(preprocessor)
+            write_frame(pd.DataFrame(X_train_transformed, columns=col_names), processed_train_file)
+            write_frame(pd.DataFrame(X_test_transformed, columns=col_names), processed_test_file)
+        write_frame(X_train, x_train_file)
+        write_frame(X_test, x_test_file)
+
+        save_preprocessor()
+
+    def fit_and_save_streaming():
+        # One pass over the training chunks collects the imputation, scaling and one-hot statistics;
+        # further passes transform the data and split features from labels chunk by chunk, so only
+        # one chunk is held in memory at a time (the rows of each split are read in file order)
+        train_idx, test_idx = load_split(data_folder)
+        features = lambda indices: (chunk.drop(columns=["label"]) for chunk in iter_rows(clean_file, indices, chunksize))
+        with stage_timer('preprocess.fit', rows=len(train_idx), chunksize=chunksize):
+            fit_preprocessor_streaming(features(train_idx), preprocessor)
+
+        for indices, x_file, y_file, processed_file in [(train_idx, x_train_file, y_train_file, processed_train_file),
+                                                        (test_idx, x_test_file, y_test_file, processed_test_file)]:
+            write_chunks((chunk[["label"]] for chunk in iter_rows(clean_file, indices, chunksize)), y_file)
+            write_chunks(features(indices), x_file)
+            with stage_timer('preprocess.transform', rows=len(indices), chunksize=chunksize):
+                transform_chunks(preprocessor, features(indices), processed_file)
+
+        save_preprocessor()
+
+    def save_preprocessor():
+        # Save the preprocessor
+        with open(preprocessor_file, 'wb') as f:
+            pickle.dump(preprocessor, f)
+
+        print(f"Preprocessing complete. Files saved in {output_folder}.")
+
+    # The fit is skipped when the cleaned data, the split, this script, the modules it calls and the
+    # (unfitted) transformer configuration hash to the same key as the last run and its outputs are unchanged
+    outputs = [preprocessor_file, processed_train_file, processed_test_file,
+               x_train_file, x_test_file, y_train_file, y_test_file]
+    modules = [preprocessing.__file__, split_data.__file__, columnar_io.__file__, combine_load_data.__file__,
+               matrix_io.__file__]
+    run_cached(f'preprocess.{fmt}', [clean_file, *split_files, __file__, *modules], outputs,
+               fit_and_save if chunksize is None else fit_and_save_streaming,
+               config={'preprocessor': joblib.hash(preprocessor), 'format': fmt, 'chunksize': chunksize},
+               force=force)
 
 if __name__ == '__main__':
     preprocess()
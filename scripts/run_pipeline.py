@@ -0,0 +1,36 @@
+import click
+import sys
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.pipeline_runner import default_stages, run_pipeline
+from src.instrumentation import configure_instrumentation, PROFILERS, DEFAULT_PROFILE_DIR
+
+STAGE_NAMES = [stage.name for stage in default_stages()]
+
+@click.command()
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'parquet', 'feather']), default='csv',
+              help='Storage format of the intermediate data files.')
+@click.option('--target', 'targets', type=click.Choice(STAGE_NAMES), multiple=True,
+              help='Only run this stage and the stages it depends on (repeatable). Defaults to all stages.')
+@click.option('--max-workers', type=int, default=None, help='Maximum number of stages running at the same time.')
+@click.option('--force', is_flag=True, help='Run every stage even if its outputs are up to date.')
+@click.option('--timings-file', type=str, default='results/pipeline_timings.json',
+              help='JSON file to write the per-stage timings to.')
+@click.option('--trace-log', type=str, default='results/pipeline_trace.jsonl',
+              help='JSON-lines file the stages append their timing, memory and CV split records to.')
+@click.option('--profiler', type=click.Choice(PROFILERS), default=None,
+              help='Profile the stages with cProfile or a low-overhead sampling profiler.')
+@click.option('--profile-stage', 'profile_stages', type=str, multiple=True,
+              help="Only profile this stage, e.g. 'preprocess' or 'model.tune' (repeatable). Defaults to all stages.")
+@click.option('--profile-dir', type=str, default=DEFAULT_PROFILE_DIR, help='Folder to write the profiles to.')
+def main(fmt, targets, max_workers, force, timings_file, trace_log, profiler, profile_stages, profile_dir):
+    """Run the whole pipeline in one interpreter, skipping stages whose inputs are unchanged."""
+    configure_instrumentation(trace_log, profiler=profiler, profile_stages=list(profile_stages),
+                              profile_dir=profile_dir)
+    run_pipeline(default_stages(fmt), targets=list(targets), max_workers=max_workers, force=force,
+                 timings_file=timings_file)
+
+
+if __name__ == '__main__':
+    main()
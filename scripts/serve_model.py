@@ -0,0 +1,26 @@
+# heart_disease_serve_model
+# Serve a model from the model registry over HTTP with micro-batched predictions.
+
+import click
+import sys 
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.model_registry import load_model
+from src.prediction_service import serve
+
+@click.command()
+@click.option('--registry-dir', type=str, help='Model registry directory', default='models')
+@click.option('--model', 'model_name', type=str, help='Name of the model to serve', default='Logistic Regression')
+@click.option('--version', type=str, help='Registry version to load (defaults to the latest)', default=None)
+@click.option('--host', type=str, help='Interface to listen on', default='127.0.0.1')
+@click.option('--port', type=int, help='Port to listen on', default=8000)
+@click.option('--max-batch-size', type=int, help='Maximum number of rows scored per model call', default=256)
+@click.option('--max-delay-ms', type=float, help='Maximum time a request waits to be batched with others', default=2.0)
+def main(registry_dir, model_name, version, host, port, max_batch_size, max_delay_ms):
+    """Load a model once and serve it on POST /predict, with latency stats on GET /stats."""
+    model = load_model(registry_dir, model_name, version=version)
+    serve(model, host=host, port=port, max_batch_size=max_batch_size, max_delay=max_delay_ms / 1000)
+
+if __name__ == '__main__':
+    main()
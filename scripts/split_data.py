@@ -0,0 +1,52 @@
+import click
+import sys
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.columnar_io import read_frame
+from src.split_data import split_indices, save_split, SPLIT_FILES
+from src.artifact_cache import run_cached
+from src.instrumentation import stage_timer
+from src import split_data, columnar_io
+
+@click.command()
+@click.option('--input', type=str, default='data/combined_df_clean.csv',
+              help='Cleaned data (CSV, Parquet or Feather) whose rows are split.')
+@click.option('--output-folder', type=str, default='data', help='Folder to write train_idx.npy and test_idx.npy to.')
+@click.option('--test-size', type=float, default=0.3,
+              help='Proportion of the rows (or of the groups, with --group-column) in the test split.')
+@click.option('--seed', type=int, default=123, help='Random seed of the split.')
+@click.option('--stratify', is_flag=True, help='Keep the label proportions the same in both splits.')
+@click.option('--group-column', type=str, default=None,
+              help='Keep all rows with the same value of this column (e.g. the site) in one split.')
+@click.option('--force', is_flag=True, help='Split again even if the input is unchanged since the last run.')
+def main(input, output_folder, test_size, seed, stratify, group_column, force):
+    """Split the cleaned data into train and test row positions."""
+    outputs = [os.path.join(output_folder, SPLIT_FILES[name]) for name in ('train', 'test')]
+    run_cached('split', [input, __file__, split_data.__file__, columnar_io.__file__], outputs,
+               lambda: split(input, output_folder, test_size, seed, stratify, group_column),
+               config={'test_size': test_size, 'seed': seed, 'stratify': stratify, 'group_column': group_column},
+               force=force)
+
+
+def split(input, output_folder, test_size, seed, stratify, group_column):
+
+    # only the columns the split depends on are read
+    columns = ['label'] + ([group_column] if group_column is not None else [])
+    df = read_frame(input, columns=columns)
+
+    with stage_timer('split', rows=len(df), stratify=stratify, group_column=group_column):
+        train_idx, test_idx = split_indices(
+            len(df), test_size=test_size, random_state=seed,
+            stratify=df['label'] if stratify else None,
+            groups=df[group_column] if group_column is not None else None
+        )
+
+    # the splits are stored as int32 row positions into the cleaned data, not as copies of the rows
+    paths = save_split(train_idx, test_idx, output_folder)
+    print(f"Split {len(df)} rows into {len(train_idx)} train and {len(test_idx)} test rows, "
+          f"saved to {paths['train']} and {paths['test']}.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+import os
+import json
+import hashlib
+from src.ingest_sources import file_sha256
+
+DEFAULT_MANIFEST_DIR = ".artifact_cache"
+
+def artifact_key(inputs, config=None):
+    """
+    Content address of a pipeline step: the SHA-256 of its input files and its config.
+
+    Parameters:
+        inputs (list of str): Paths of the files the step reads, including its script
+                              so that code changes invalidate the outputs.
+        config (dict, optional): JSON-serializable settings of the step (options, a
+                                 hash of the unfitted transformer, ...). Defaults to None.
+
+    Returns:
+        str: A SHA-256 hex digest.
+
+    Raises:
+        FileNotFoundError: If an input file does not exist.
+    """
+    digest = hashlib.sha256()
+    for path in inputs:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"File not found: {path}")
+        digest.update(f"{os.path.basename(path)}:{file_sha256(path)}\n".encode())
+    digest.update(json.dumps(config or {}, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def _manifest_path(step, manifest_dir):
+    return os.path.join(manifest_dir, f"{step}.json")
+
+
+def is_up_to_date(step, key, outputs, manifest_dir=DEFAULT_MANIFEST_DIR):
+    """
+    Whether the outputs of a step were produced from inputs with the given key and are unchanged.
+
+    Returns:
+        bool: True if the manifest of `step` records `key`, and every output exists with
+              the checksum recorded when it was written.
+    """
+    manifest_path = _manifest_path(step, manifest_dir)
+    if not os.path.exists(manifest_path):
+        return False
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get("key") != key or sorted(manifest.get("outputs", {})) != sorted(outputs):
+        return False
+    return all(os.path.exists(path) and file_sha256(path) == checksum
+               for path, checksum in manifest["outputs"].items())
+
+
+def record_artifacts(step, key, outputs, manifest_dir=DEFAULT_MANIFEST_DIR):
+    """
+    Record the key of a step and the checksums of the outputs it has just written.
+
+    Raises:
+        FileNotFoundError: If an output file was not written.
+    """
+    os.makedirs(manifest_dir, exist_ok=True)
+    manifest = {"key": key, "outputs": {path: file_sha256(path) for path in outputs}}
+    with open(_manifest_path(step, manifest_dir), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def run_cached(step, inputs, outputs, compute, config=None, manifest_dir=DEFAULT_MANIFEST_DIR, force=False):
+    """
+    Run a pipeline step only if its inputs, config or outputs changed since its last run.
+
+    The step is identified by a content hash of its input files and config (see
+    `artifact_key`). After a run, the hash and the checksums of the outputs are stored
+    in `<manifest_dir>/<step>.json`. Later runs with the same hash skip `compute` as long
+    as every output still exists unchanged; deleting or editing an output, changing an
+    input file or changing the config makes the step run again. A skipped step touches
+    its outputs, so that under `make` they are not older than inputs that were rewritten
+    with the same content, which would start the step again on every run.
+
+    Parameters:
+        step (str): Name of the step, used for its manifest file.
+        inputs (list of str): Paths of the files the step reads.
+        outputs (list of str): Paths of the files the step writes.
+        compute (callable): Function without arguments that runs the step and writes
+                            `outputs`.
+        config (dict, optional): JSON-serializable settings of the step. Defaults to None.
+        manifest_dir (str, optional): Directory holding the step manifests.
+                                      Defaults to ".artifact_cache".
+        force (bool, optional): Run the step even if it is up to date. Defaults to False.
+
+    Returns:
+        bool: True if the step ran, False if it was skipped.
+
+    Prints:
+        A message when the step is skipped.
+
+    Examples:
+        >>> run_cached('preprocess', ['data/combined_df_clean.csv', 'data/train_idx.npy', 'data/test_idx.npy'],
+        ...            ['data/preprocessor.pkl'], fit_and_save, config={'format': 'csv'})
+        Skipping preprocess: outputs are up to date.
+        False
+    """
+    key = artifact_key(inputs, config)
+    if not force and is_up_to_date(step, key, outputs, manifest_dir):
+        print(f"Skipping {step}: outputs are up to date.")
+        for path in outputs:
+            os.utime(path)
+        return False
+    compute()
+    record_artifacts(step, key, outputs, manifest_dir)
+    return True
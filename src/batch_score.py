@@ -0,0 +1,136 @@
+import os
+import pandas as pd
+
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() in (".parquet", ".pq")
+
+
+def _positioned(chunk, offset):
+    chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+    return chunk
+
+
+def read_batches(input_path, chunksize=10000, columns=None, na_values=None):
+    """
+    Read a CSV, Parquet or Feather file as a sequence of DataFrame chunks.
+
+    Parameters:
+        input_path (str): Path to a `.csv`, `.parquet` or `.feather` file.
+        chunksize (int, optional): Number of rows per chunk. Defaults to 10000.
+        columns (list of str, optional): Columns to read. Defaults to all columns.
+        na_values (list, optional): Extra values parsed as missing in a CSV file, e.g. ['?'].
+                                    Defaults to None.
+
+    Yields:
+        pandas.DataFrame: Consecutive chunks of at most `chunksize` rows, indexed by row
+                          position in the file (as `pd.read_csv` chunks are).
+
+    Raises:
+        FileNotFoundError: If `input_path` does not exist.
+    """
+    if not os.path.exists(input_path):
+        raise FileNotFoundError(f"File not found: {input_path}")
+
+    if _is_parquet(input_path):
+        import pyarrow.parquet as pq
+        offset = 0
+        for batch in pq.ParquetFile(input_path).iter_batches(batch_size=chunksize, columns=columns):
+            yield _positioned(batch.to_pandas(), offset)
+            offset += batch.num_rows
+    elif os.path.splitext(input_path)[1].lower() == ".feather":
+        import pyarrow as pa
+        # Feather files are memory-mapped; each record batch is sliced into chunks
+        with pa.memory_map(input_path) as source:
+            reader = pa.ipc.open_file(source)
+            offset = 0
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if columns is not None:
+                    batch = batch.select(columns)
+                for start in range(0, batch.num_rows, chunksize):
+                    yield _positioned(batch.slice(start, chunksize).to_pandas(), offset + start)
+                offset += batch.num_rows
+    else:
+        yield from pd.read_csv(input_path, chunksize=chunksize, usecols=columns, na_values=na_values)
+
+
+def predict_batch(model, X):
+    """
+    Predict labels (and class probabilities when available) for one chunk.
+
+    When the model supports `predict_proba`, the label is taken as the most probable
+    class so that each chunk goes through the model only once.
+
+    Parameters:
+        model (sklearn estimator): A fitted classifier or pipeline.
+        X (pandas.DataFrame): Feature data.
+
+    Returns:
+        pandas.DataFrame: A `prediction` column followed by one `proba_<class>` column
+                          per class if the model supports `predict_proba`.
+    """
+    if hasattr(model, "predict_proba"):
+        proba = model.predict_proba(X)
+        predictions = pd.DataFrame(
+            proba, columns=[f"proba_{c}" for c in model.classes_], index=X.index
+        )
+        predictions.insert(0, "prediction", model.classes_[proba.argmax(axis=1)])
+        return predictions
+    return pd.DataFrame({"prediction": model.predict(X)}, index=X.index)
+
+
+def score_batches(model, input_path, output_path, chunksize=10000, id_column=None):
+    """
+    Score a large CSV or Parquet file chunk by chunk and stream predictions to disk.
+
+    Only one chunk of the input is held in memory at a time: each chunk is scored with
+    `predict_batch` and appended to `output_path` (CSV or Parquet, chosen by its
+    extension) before the next chunk is read.
+
+    Parameters:
+        model (sklearn estimator): A fitted classifier or pipeline, e.g. from
+                                   `src.model_registry.load_model`.
+        input_path (str): Path to the `.csv` or `.parquet` file with patient features.
+        output_path (str): Path to the `.csv` or `.parquet` file to write predictions to.
+        chunksize (int, optional): Number of rows scored per chunk. Defaults to 10000.
+        id_column (str, optional): Column copied from the input to the output to identify
+                                   each patient; it is not passed to the model. Defaults to None.
+
+    Returns:
+        int: Number of rows scored.
+
+    Raises:
+        FileNotFoundError: If `input_path` does not exist.
+
+    Examples:
+        >>> model = load_model('models', 'Logistic Regression')
+        >>> score_batches(model, 'data/new_patients.parquet', 'results/predictions.csv')
+        125000
+    """
+    writer = None
+    n_rows = 0
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    try:
+        for chunk in read_batches(input_path, chunksize):
+            if id_column is None:
+                predictions = predict_batch(model, chunk)
+            else:
+                predictions = predict_batch(model, chunk.drop(columns=[id_column]))
+                predictions.insert(0, id_column, chunk[id_column])
+
+            if _is_parquet(output_path):
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                table = pa.Table.from_pandas(predictions, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema)
+                writer.write_table(table)
+            else:
+                predictions.to_csv(output_path, mode="a" if n_rows else "w",
+                                   header=not n_rows, index=False)
+            n_rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return n_rows
@@ -0,0 +1,223 @@
+import os
+import io
+import sys
+import json
+import time
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+import contextlib
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+import sklearn
+from src.synthetic_data import COLUMNS, synthetic_heart_data, write_site_files
+from src.combine_load_data import combine_load_data
+from src.dedup_index import drop_duplicate_rows
+from src.clean_data import clean_frame
+from src.validate_data import check_empty_obs, check_missingness, check_duplicate_obs, check_value_ranges
+from src.split_data import split_indices
+from src.preprocessing import build_preprocessor
+from src.models_fit_and_result_output import models_fit_and_result_output
+from src.evaluate_models import predict_probas
+from src.bootstrap_metrics import bootstrap_metrics
+
+MODEL_NAMES = ['Logistic Regression', 'Decision Tree', 'Support Vector Machine', 'K-Nearest Neighbors']
+
+def measure(func, *args, trace_memory=True, **kwargs):
+    """
+    Time a function, then run it again tracing the memory it allocates.
+
+    The time comes from a first, untraced run: `tracemalloc` slows down code that
+    creates many Python objects (such as object columns) by more than an order of
+    magnitude. The second run traces the peak memory allocated during the call, which
+    includes NumPy and pandas buffers. Anything the function prints is discarded.
+
+    Parameters:
+        func (callable): The function to measure, called with `args` and `kwargs`.
+        trace_memory (bool, optional): Make the second, traced run. Defaults to True.
+
+    Returns:
+        tuple: The result of the first run, its elapsed seconds and the peak traced
+               memory in bytes (None if `trace_memory` is False).
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        seconds = time.perf_counter() - start
+        if not trace_memory:
+            return result, seconds, None
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return result, seconds, peak
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark_metadata(seed):
+    """The commit, library versions and machine a benchmark ran on."""
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "seed": seed,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count()
+    }
+
+
+def benchmark_pipeline(n_rows, seed=0, models=None, max_model_rows=5000, n_iter=3, n_bootstrap=10000,
+                       trace_memory=True, work_dir=None):
+    """
+    Time and memory-profile every pipeline stage on synthetic data of one size.
+
+    The stages are run as the scripts run them: `combine_load_data` over four site
+    files, the duplicate removal and cleaning casts, the `validate_data` checks, the
+    train/test split, the preprocessor fit/transform and `models_fit_and_result_output`
+    for each model in turn. Model tuning is run on at most `max_model_rows` training
+    rows (drawn with the seed), as SVC and KNN do not scale to millions of rows. The
+    bootstrap of the test metrics is left out of the model stages and timed once for all
+    models as the `model.bootstrap` stage.
+
+    Parameters:
+        n_rows (int): Number of rows of synthetic data.
+        seed (int, optional): Seed of the data, the split and the tuning. Defaults to 0.
+        models (list of str, optional): Models to tune. Defaults to `MODEL_NAMES`; an
+                                        empty list skips model tuning.
+        max_model_rows (int, optional): Maximum number of training rows used for model
+                                        tuning. Defaults to 5000.
+        n_iter (int, optional): Candidates sampled per model. Defaults to 3.
+        n_bootstrap (int, optional): Bootstrap resamples of the `model.bootstrap` stage;
+                                     0 skips it. Defaults to 10000.
+        trace_memory (bool, optional): Run every stage a second time to trace its peak
+                                       memory (see `measure`). Defaults to True.
+        work_dir (str, optional): Folder for the site files and reports. Defaults to a
+                                  temporary folder removed afterwards.
+
+    Returns:
+        list of dict: One record per stage with its `stage` name, `n_rows` (rows given
+                      to the stage), `seconds` and `peak_memory_mb` (None when
+                      memory is not traced).
+    """
+    models = MODEL_NAMES if models is None else models
+    records = []
+
+    def record(stage, rows, func, *args, **kwargs):
+        result, seconds, peak = measure(func, *args, trace_memory=trace_memory, **kwargs)
+        records.append({"stage": stage, "size": n_rows, "n_rows": rows, "seconds": seconds,
+                        "peak_memory_mb": None if peak is None else peak / 2 ** 20})
+        return result
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        folder = work_dir or tmp_dir
+        paths = write_site_files(synthetic_heart_data(n_rows, seed=seed), os.path.join(folder, "data"))
+
+        combined_df = record("combine_load_data", n_rows, combine_load_data, paths, COLUMNS)
+        for check in [check_empty_obs, check_missingness, check_duplicate_obs, check_value_ranges]:
+            record(f"validate.{check.__name__}", n_rows, check, combined_df)
+        deduplicated, _ = record("clean.drop_duplicate_rows", n_rows, drop_duplicate_rows, combined_df)
+        deduplicated = deduplicated.reset_index(drop=True)
+        clean_df = record("clean.clean_frame", len(deduplicated), clean_frame, deduplicated, verbose=False)
+        del combined_df, deduplicated
+
+        train_idx, test_idx = record("split", len(clean_df), split_indices, len(clean_df), random_state=seed)
+        X, y = clean_df.drop(columns=["label"]), clean_df["label"]
+        X_train, X_test = X.iloc[train_idx], X.iloc[test_idx]
+        preprocessor = build_preprocessor()
+        record("preprocess.fit_transform", len(X_train), preprocessor.fit_transform, X_train)
+        record("preprocess.transform", len(X_test), preprocessor.transform, X_test)
+
+        if models:
+            rng = np.random.default_rng(seed)
+            model_idx = np.sort(rng.choice(len(X_train), min(len(X_train), max_model_rows), replace=False))
+            test_rows = np.sort(rng.choice(len(X_test), min(len(X_test), max_model_rows), replace=False))
+            model_args = (build_preprocessor(), X_train.iloc[model_idx], y.iloc[train_idx].iloc[model_idx],
+                          X_test.iloc[test_rows], y.iloc[test_idx].iloc[test_rows])
+            reports_dir = os.path.join(folder, "results")
+            os.makedirs(reports_dir, exist_ok=True)
+            best_models = {}
+            for model_name in models:
+                best_models.update(record(f"model.{model_name}", len(model_idx), models_fit_and_result_output,
+                                          *model_args, reports_dir, seed=seed, n_iter=n_iter,
+                                          model_names=[model_name], n_bootstrap=0))
+            if n_bootstrap:
+                probas = predict_probas(best_models, model_args[3])
+                record("model.bootstrap", len(test_rows), bootstrap_metrics, model_args[4], probas,
+                       n_resamples=n_bootstrap, seed=seed)
+    return records
+
+
+def run_benchmarks(sizes, seed=0, models=None, max_model_rows=5000, n_iter=3, n_bootstrap=10000,
+                   trace_memory=True, output_file=None):
+    """
+    Benchmark the pipeline at several data sizes and save the results as JSON.
+
+    Parameters:
+        sizes (list of int): Numbers of rows to benchmark, e.g. [1_000, 100_000, 10_000_000].
+        seed (int, optional): Random seed. Defaults to 0.
+        models, max_model_rows, n_iter, n_bootstrap, trace_memory: See `benchmark_pipeline`.
+        output_file (str, optional): JSON file to write. Defaults to None (not saved).
+
+    Returns:
+        dict: `metadata` (see `benchmark_metadata`) and the stage `results`.
+
+    Prints:
+        The time and peak memory of each stage as it finishes a size.
+
+    Examples:
+        >>> run_benchmarks([1_000, 100_000], output_file='results/benchmarks/pipeline.json')
+    """
+    report = {"metadata": benchmark_metadata(seed), "results": []}
+    for n_rows in sizes:
+        records = benchmark_pipeline(n_rows, seed=seed, models=models, max_model_rows=max_model_rows,
+                                     n_iter=n_iter, n_bootstrap=n_bootstrap, trace_memory=trace_memory)
+        report["results"].extend(records)
+        print(pd.DataFrame(records).to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+        sys.stdout.flush()
+    if output_file is not None:
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+        with open(output_file, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+def compare_benchmarks(baseline, current, threshold=1.2):
+    """
+    Compare two benchmark reports stage by stage.
+
+    Parameters:
+        baseline (dict or str): Report (or path to the JSON report) to compare against.
+        current (dict or str): The new report or its path.
+        threshold (float, optional): Time or memory ratio above which a stage counts as
+                                     a regression. Defaults to 1.2.
+
+    Returns:
+        pandas.DataFrame: For each stage and size present in both reports, the baseline
+                          and current seconds and peak memory, their ratios and a
+                          `regression` flag.
+    """
+    frames = []
+    for report in [baseline, current]:
+        if isinstance(report, str):
+            with open(report) as f:
+                report = json.load(f)
+        frames.append(pd.DataFrame(report["results"]).set_index(["stage", "size"])[["seconds", "peak_memory_mb"]].astype(float))
+    comparison = frames[0].join(frames[1], lsuffix="_baseline", rsuffix="_current", how="inner")
+    comparison["time_ratio"] = comparison["seconds_current"] / comparison["seconds_baseline"]
+    comparison["memory_ratio"] = comparison["peak_memory_mb_current"] / comparison["peak_memory_mb_baseline"]
+    comparison["regression"] = (comparison["time_ratio"] > threshold) | (comparison["memory_ratio"] > threshold)
+    return comparison.reset_index()
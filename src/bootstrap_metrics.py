@@ -0,0 +1,291 @@
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+BOOTSTRAP_METRICS = ["accuracy", "balanced_accuracy", "precision_macro", "recall_macro", "f1_macro",
+                     "roc_auc_ovr_macro"]
+
+def _ratio(numerator, denominator):
+    """Elementwise ratio, 0 where the denominator is 0."""
+    return np.divide(numerator, denominator, out=np.zeros(np.broadcast(numerator, denominator).shape),
+                     where=denominator != 0)
+
+
+def _label_metrics(true_positive, support, predicted):
+    """
+    Accuracy, balanced accuracy and macro precision, recall and F1 from class counts.
+
+    The counts have one class per entry along the last axis and any leading axes
+    (resamples, models). Macro averages are taken over the classes present in the true
+    or predicted labels, as `src.evaluate_models.score_metrics` does.
+    """
+    precision = _ratio(true_positive, predicted)
+    recall = _ratio(true_positive, support)
+    f1 = _ratio(2 * precision * recall, precision + recall)
+    present = (support > 0) | (predicted > 0)
+    macro = lambda values: (values * present).sum(axis=-1) / present.sum(axis=-1)
+    return {
+        "accuracy": true_positive.sum(axis=-1) / support.sum(axis=-1),
+        "balanced_accuracy": (recall * (support > 0)).sum(axis=-1) / (support > 0).sum(axis=-1),
+        "precision_macro": macro(precision),
+        "recall_macro": macro(recall),
+        "f1_macro": macro(f1)
+    }
+
+
+def _macro_auc(auc):
+    """Average the per-class AUCs, leaving out the classes without positives or negatives (NaN)."""
+    scored = ~np.isnan(auc)
+    return np.divide(np.where(scored, auc, 0).sum(axis=-1), scored.sum(axis=-1),
+                     out=np.full(auc.shape[:-1], np.nan), where=scored.any(axis=-1))
+
+
+def _weighted_auc(scores, positive, weights):
+    """
+    One-vs-rest ROC AUC of one score column under many row weightings.
+
+    The scores are the same under every weighting, so they are sorted and grouped into
+    ties once. Each weighting then only reweighs the tie groups: the AUC is the weighted
+    share of (positive, negative) pairs ranked correctly, ties counting half.
+
+    Parameters:
+        scores (numpy.ndarray): Scores of the n rows.
+        positive (numpy.ndarray): Whether each row belongs to the class.
+        weights (numpy.ndarray): (resamples, n) number of times each row is drawn.
+
+    Returns:
+        numpy.ndarray: The AUC of every weighting, NaN without positives or negatives.
+    """
+    order = np.argsort(scores, kind="stable")
+    sorted_scores = scores[order]
+    starts = np.flatnonzero(np.r_[True, sorted_scores[1:] != sorted_scores[:-1]])
+    sorted_weights = weights[:, order]
+    positive_weight = np.add.reduceat(sorted_weights * positive[order], starts, axis=1)
+    negative_weight = np.add.reduceat(sorted_weights * ~positive[order], starts, axis=1)
+    negatives_below = np.cumsum(negative_weight, axis=1) - negative_weight
+    correct_pairs = (positive_weight * (negatives_below + 0.5 * negative_weight)).sum(axis=1)
+    pairs = positive_weight.sum(axis=1) * negative_weight.sum(axis=1)
+    return np.divide(correct_pairs, pairs, out=np.full(len(pairs), np.nan), where=pairs > 0)
+
+
+def _weighted_metrics(true_codes, pred_codes, probas, weights):
+    """
+    The `BOOTSTRAP_METRICS` of every model under every row weighting.
+
+    The class counts of all models come from one matrix product of the weights with the
+    indicator columns of the true classes, the predicted classes and the true positives.
+
+    Parameters:
+        true_codes (numpy.ndarray): Position of each true label (n,).
+        pred_codes (numpy.ndarray): Position of each predicted label (models, n).
+        probas (numpy.ndarray): Probabilities (models, n, labels).
+        weights (numpy.ndarray): (resamples, n) number of times each row is drawn.
+
+    Returns:
+        numpy.ndarray: (resamples, models, metrics).
+    """
+    n_models, n_rows, n_labels = probas.shape
+    labels = np.arange(n_labels)
+    true_one_hot = true_codes[:, None] == labels
+    pred_one_hot = pred_codes[:, :, None] == labels
+    indicators = np.concatenate([true_one_hot[None], pred_one_hot, pred_one_hot & true_one_hot[None]])
+    counts = (weights @ indicators.transpose(1, 0, 2).reshape(n_rows, -1)).reshape(len(weights), -1, n_labels)
+    support = counts[:, :1]
+    predicted, true_positive = counts[:, 1:1 + n_models], counts[:, 1 + n_models:]
+    metrics = _label_metrics(true_positive, support, predicted)
+
+    auc = np.stack([np.stack([_weighted_auc(probas[m, :, k], true_one_hot[:, k], weights) for k in labels], axis=-1)
+                    for m in range(n_models)], axis=1)
+    metrics["roc_auc_ovr_macro"] = _macro_auc(auc)
+    return np.stack([metrics[name] for name in BOOTSTRAP_METRICS], axis=-1)
+
+
+def _bootstrap_batch(true_codes, pred_codes, probas, n_resamples, seed):
+    """Metrics of every model on `n_resamples` bootstrap resamples of the test rows."""
+    rng = np.random.default_rng(seed)
+    n_rows = len(true_codes)
+    # the number of times each row is drawn, counted with one bincount over the whole batch
+    draws = rng.integers(0, n_rows, size=(n_resamples, n_rows)) + n_rows * np.arange(n_resamples)[:, None]
+    weights = np.bincount(draws.ravel(), minlength=n_resamples * n_rows).reshape(n_resamples, n_rows)
+    return _weighted_metrics(true_codes, pred_codes, probas, weights.astype(float))
+
+
+def _stack_probas(y_true, probas):
+    """
+    Put the true labels and every model's probabilities on one sorted set of labels.
+
+    Labels a model never saw (in the test set or in the other models) get a column of
+    zero probability.
+    """
+    y_true = np.asarray(y_true)
+    labels = np.unique(np.concatenate([np.unique(y_true)] + [np.asarray(classes) for _, classes in probas.values()]))
+    stacked = np.zeros((len(probas), len(y_true), len(labels)))
+    for m, (proba, classes) in enumerate(probas.values()):
+        stacked[m][:, np.searchsorted(labels, classes)] = proba
+    return np.searchsorted(labels, y_true), stacked.argmax(axis=2), stacked
+
+
+def _batch_sizes(n, batch_size):
+    return [min(batch_size, n - start) for start in range(0, n, batch_size)]
+
+
+def bootstrap_metrics(y_true, probas, n_resamples=10000, confidence=0.95, seed=0, batch_size=1000, n_jobs=None,
+                      n_permutations=None):
+    """
+    Bootstrap confidence intervals of the test-set metrics of several models at once.
+
+    The test rows are resampled with replacement `n_resamples` times, in NumPy batches of
+    `batch_size` resamples. A resample is a vector of draw counts per row, so the class
+    counts of every model on a whole batch come from one matrix product, and the ROC AUC
+    from weighted sums over scores sorted once. All models are scored on the same
+    resamples, which pairs the intervals of their differences. Batches are seeded
+    independently from `seed`, so the results do not depend on `n_jobs`.
+
+    Parameters:
+        y_true (array-like): True test labels.
+        probas (dict): Mapping of model name to its predicted probabilities and `classes_`
+                       (see `src.evaluate_models.predict_probas`).
+        n_resamples (int, optional): Number of bootstrap resamples. Defaults to 10000.
+        confidence (float, optional): Confidence level of the intervals. Defaults to 0.95.
+        seed (int, optional): Random seed. Defaults to 0.
+        batch_size (int, optional): Resamples per batch; the memory used grows with
+                                    `batch_size` times the number of rows. Defaults to 1000.
+        n_jobs (int, optional): Number of worker processes over the batches. Starting the
+                                processes takes about a second, so this only pays off for
+                                large test sets. Defaults to None (serial).
+        n_permutations (int, optional): Number of permutations of the test of each difference
+                                        (see `permutation_test`). Defaults to None, which
+                                        uses `n_resamples`.
+
+    Returns:
+        dict: `intervals`, a DataFrame with the `estimate` on the test set, the bootstrap
+              `std_error` and the percentile interval (`ci_lower`, `ci_upper`) of each
+              `model` and `metric` (see `BOOTSTRAP_METRICS`); and `differences`, the same
+              for each pair of models (`model_a` minus `model_b`) with the two-sided
+              `p_value` of the paired `permutation_test` of the pair.
+
+    Examples:
+        >>> probas = predict_probas(best_models, X_test)
+        >>> bootstrap_metrics(y_test, probas)['intervals']
+    """
+    names = list(probas)
+    true_codes, pred_codes, stacked = _stack_probas(y_true, probas)
+    sizes = _batch_sizes(n_resamples, batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    batches = Parallel(n_jobs=n_jobs)(
+        delayed(_bootstrap_batch)(true_codes, pred_codes, stacked, size, batch_seed)
+        for size, batch_seed in zip(sizes, seeds)
+    )
+    resampled = np.concatenate(batches)
+    # the test set itself is the weighting drawing every row once
+    estimate = _weighted_metrics(true_codes, pred_codes, stacked, np.ones((1, len(true_codes))))[0]
+
+    alpha = (1 - confidence) / 2
+    intervals = []
+    for m, name in enumerate(names):
+        for j, metric in enumerate(BOOTSTRAP_METRICS):
+            values = resampled[:, m, j][~np.isnan(resampled[:, m, j])]
+            intervals.append({"model": name, "metric": metric, "estimate": estimate[m, j],
+                              "std_error": values.std(ddof=1), "ci_lower": np.quantile(values, alpha),
+                              "ci_upper": np.quantile(values, 1 - alpha)})
+    differences = []
+    for a in range(len(names)):
+        for b in range(a + 1, len(names)):
+            # resamples drawn with replacement are not centred on the null of no difference,
+            # so the p-values come from permuting the paired predictions instead
+            p_values = permutation_test(y_true, probas[names[a]], probas[names[b]],
+                                        n_permutations=n_permutations or n_resamples, seed=seed,
+                                        batch_size=batch_size, n_jobs=n_jobs)["p_value"]
+            for j, metric in enumerate(BOOTSTRAP_METRICS):
+                values = resampled[:, a, j] - resampled[:, b, j]
+                values = values[~np.isnan(values)]
+                differences.append({
+                    "model_a": names[a], "model_b": names[b], "metric": metric,
+                    "difference": estimate[a, j] - estimate[b, j], "std_error": values.std(ddof=1),
+                    "ci_lower": np.quantile(values, alpha), "ci_upper": np.quantile(values, 1 - alpha),
+                    "p_value": p_values[j]
+                })
+    return {"intervals": pd.DataFrame(intervals), "differences": pd.DataFrame(differences)}
+
+
+def _permutation_batch(true_codes, pred_codes, probas, n_permutations, seed):
+    """Metric differences of two models after swapping their predictions on random rows."""
+    rng = np.random.default_rng(seed)
+    n_rows, n_labels = len(true_codes), probas.shape[2]
+    swap = rng.random((n_permutations, n_rows)) < 0.5
+    offsets = n_labels * n_labels * np.arange(n_permutations)[:, None]
+    # the scores of a class can only take the values of the two models on each row, so each is
+    # replaced by its code among them; ties stay ties and the ranks come from counting codes
+    score_codes = []
+    for k in range(n_labels):
+        values, codes = np.unique(np.concatenate([probas[0][:, k], probas[1][:, k]]), return_inverse=True)
+        score_codes.append((codes.reshape(2, n_rows), len(values)))
+
+    differences = []
+    for first, second in [(0, 1), (1, 0)]:
+        predicted = np.where(swap, pred_codes[second], pred_codes[first])
+        # the confusion matrices of all permutations at once
+        confusion = np.bincount((offsets + true_codes * n_labels + predicted).ravel(),
+                                minlength=n_permutations * n_labels ** 2).reshape(-1, n_labels, n_labels)
+        metrics = _label_metrics(np.diagonal(confusion, axis1=1, axis2=2), confusion.sum(axis=2), confusion.sum(axis=1))
+        auc = np.stack([_ranked_auc(np.where(swap, codes[second], codes[first]), true_codes == k, n_codes)
+                        for k, (codes, n_codes) in enumerate(score_codes)], axis=-1)
+        metrics["roc_auc_ovr_macro"] = _macro_auc(auc)
+        differences.append(np.stack([metrics[name] for name in BOOTSTRAP_METRICS], axis=-1))
+    return differences[0] - differences[1]
+
+
+def _ranked_auc(codes, positive, n_codes):
+    """One-vs-rest ROC AUC of each row of score codes (permutations, n), from the mid-ranks of the codes."""
+    n_positive = positive.sum()
+    n_negative = len(positive) - n_positive
+    if n_positive == 0 or n_negative == 0:
+        return np.full(len(codes), np.nan)
+    offsets = n_codes * np.arange(len(codes))[:, None]
+    counts = np.bincount((offsets + codes).ravel(), minlength=len(codes) * n_codes).reshape(len(codes), n_codes)
+    ranks = np.cumsum(counts, axis=1) - (counts - 1) / 2
+    rank_sum = np.take_along_axis(ranks, codes[:, positive], axis=1).sum(axis=1)
+    return (rank_sum - n_positive * (n_positive + 1) / 2) / (n_positive * n_negative)
+
+
+def permutation_test(y_true, proba_a, proba_b, n_permutations=10000, seed=0, batch_size=1000, n_jobs=None):
+    """
+    Paired permutation test of the difference between two models on the same test rows.
+
+    Under the null hypothesis that both models perform alike, the two predictions of a
+    row are exchangeable. Each permutation swaps the predictions (and probabilities) of
+    the models on a random half of the rows; the p-value is the share of permutations
+    whose difference is at least as large in absolute value as the observed one. The
+    permutations are drawn in NumPy batches, as in `bootstrap_metrics`.
+
+    Parameters:
+        y_true (array-like): True test labels.
+        proba_a (tuple): Probabilities and `classes_` of the first model.
+        proba_b (tuple): Probabilities and `classes_` of the second model.
+        n_permutations (int, optional): Number of permutations. Defaults to 10000.
+        seed (int, optional): Random seed. Defaults to 0.
+        batch_size (int, optional): Permutations per batch. Defaults to 1000.
+        n_jobs (int, optional): Number of worker processes over the batches. Defaults to None.
+
+    Returns:
+        pandas.DataFrame: For each `metric` (see `BOOTSTRAP_METRICS`), the observed
+                          `difference` (first minus second model) and its two-sided `p_value`.
+
+    Examples:
+        >>> probas = predict_probas(best_models, X_test)
+        >>> permutation_test(y_test, probas['K-Nearest Neighbors'], probas['Decision Tree'])
+    """
+    true_codes, pred_codes, stacked = _stack_probas(y_true, {"a": proba_a, "b": proba_b})
+    observed = _weighted_metrics(true_codes, pred_codes, stacked, np.ones((1, len(true_codes))))[0]
+    observed = observed[0] - observed[1]
+
+    sizes = _batch_sizes(n_permutations, batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    permuted = np.concatenate(Parallel(n_jobs=n_jobs)(
+        delayed(_permutation_batch)(true_codes, pred_codes, stacked, size, batch_seed)
+        for size, batch_seed in zip(sizes, seeds)
+    ))
+    # a small tolerance keeps permutations equal to the observed difference from being lost to rounding
+    extreme = np.abs(permuted) >= np.abs(observed) - 1e-12
+    p_value = (extreme.sum(axis=0) + 1) / (n_permutations + 1)
+    return pd.DataFrame({"metric": BOOTSTRAP_METRICS, "difference": observed, "p_value": p_value})
@@ -0,0 +1,80 @@
+import os
+import json
+import hashlib
+import pandas as pd
+from deepchecks.core.check_result import BaseCheckResult
+
+def dataset_fingerprint(df):
+    """
+    Content hash of a DataFrame: its column names, dtypes, index and values.
+
+    Parameters:
+        df (pandas.DataFrame): The data to fingerprint.
+
+    Returns:
+        str: A SHA-256 hex digest that changes whenever any value, column or dtype does.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def check_cache_key(check, fingerprint, dataset_params=None):
+    """
+    Cache key of a deepchecks check run: the data fingerprint, the check's parameters
+    and conditions, and any parameters used to build the deepchecks `Dataset`.
+    """
+    conditions = [condition.name for condition in getattr(check, "_conditions", {}).values()]
+    config = {
+        "data": fingerprint,
+        "check": check.config(include_version=True),
+        "conditions": conditions,
+        "dataset": dataset_params or {},
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def run_check_cached(check, dataset, fingerprint, cache_dir=None, dataset_params=None):
+    """
+    Run a deepchecks check once and reuse its result while the data is unchanged.
+
+    The result is stored as JSON in `cache_dir` under a key derived from the data
+    fingerprint and the check configuration (see `check_cache_key`). When a result with
+    the same key exists, it is loaded instead of running the check; the loaded result
+    still supports `passed_conditions()` and `show()`.
+
+    Parameters:
+        check (deepchecks.core.BaseCheck): The check to run, with its conditions added.
+        dataset (deepchecks.tabular.Dataset): The dataset to run the check on.
+        fingerprint (str): Content hash of the data, from `dataset_fingerprint`.
+        cache_dir (str, optional): Directory for cached results. Defaults to None, which
+                                   runs the check without caching.
+        dataset_params (dict, optional): Parameters the `Dataset` was built with (label,
+                                         categorical features, ...). Defaults to None.
+
+    Returns:
+        deepchecks.core.CheckResult: The fresh or cached check result.
+
+    Examples:
+        >>> fingerprint = dataset_fingerprint(combined_df)
+        >>> ds = Dataset(combined_df, label='label')
+        >>> check = FeatureFeatureCorrelation(threshold=0.9)
+        >>> result = run_check_cached(check, ds, fingerprint, 'results/validation_cache')
+        >>> result.show()
+    """
+    if cache_dir is None:
+        return check.run(dataset=dataset)
+
+    key = check_cache_key(check, fingerprint, dataset_params)
+    cache_file = os.path.join(cache_dir, f"{type(check).__name__}_{key[:16]}.json")
+    if os.path.exists(cache_file):
+        with open(cache_file) as f:
+            print(f"Using cached {type(check).__name__} result from {cache_file}.")
+            return BaseCheckResult.from_json(f.read())
+
+    result = check.run(dataset=dataset)
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(cache_file, "w") as f:
+        f.write(result.to_json())
+    return result
@@ -0,0 +1,210 @@
+import os
+import numpy as np
+import pandas as pd
+
+FORMATS = {".csv": "csv", ".parquet": "parquet", ".feather": "feather"}
+
+def frame_format(path):
+    """
+    Infer the storage format of a data file from its extension.
+
+    Raises:
+        ValueError: If the extension is not one of .csv, .parquet or .feather.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Unsupported file format '{ext}', expected one of {list(FORMATS)}.")
+    return FORMATS[ext]
+
+
+def with_format(path, fmt):
+    """
+    Replace the extension of `path` with the one of format `fmt`.
+
+    Examples:
+        >>> with_format('data/combined_df_clean.csv', 'feather')
+        'data/combined_df_clean.feather'
+    """
+    if fmt not in FORMATS.values():
+        raise ValueError(f"Unsupported file format '{fmt}', expected one of {list(FORMATS.values())}.")
+    return f"{os.path.splitext(path)[0]}.{fmt}"
+
+
+def write_frame(df, path, index=False):
+    """
+    Write a DataFrame as CSV, Parquet or Feather, chosen by the file extension.
+
+    Parquet and Feather keep the column dtypes (including categoricals), so the next
+    pipeline stage does not have to re-parse text or repeat the casts. Feather files are
+    written uncompressed so that they can be memory-mapped by `read_frame`.
+
+    Parameters:
+        df (pandas.DataFrame): The data to write.
+        path (str): Output path ending in .csv, .parquet or .feather.
+        index (bool, optional): Keep the index as a column. Defaults to False.
+
+    Raises:
+        ValueError: If the extension is not supported.
+    """
+    fmt = frame_format(path)
+    if fmt == "csv":
+        df.to_csv(path, index=index)
+        return
+    df = df.reset_index(drop=not index)
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_feather(path, compression="uncompressed")
+
+
+def _categorical_columns(table):
+    """Names of the columns pandas stored as categoricals, from the pandas metadata of `table`."""
+    metadata = table.schema.pandas_metadata or {}
+    return [column["name"] for column in metadata.get("columns", []) if column["pandas_type"] == "categorical"]
+
+
+def _table_categories(table):
+    """Categories of every categorical column: the values found in the whole table, sorted."""
+    return {name: table[name].unique().drop_null().to_pandas().sort_values()
+            for name in _categorical_columns(table) if name in table.column_names}
+
+
+def _restore_categoricals(table, df, categories=None):
+    """
+    Re-cast columns pandas stored as categoricals (Parquet only keeps their values).
+
+    The categories are taken from `categories` (see `_table_categories`) when given, e.g.
+    those of the table `df` was taken rows from, or else from the values of `df`.
+    """
+    for name in _categorical_columns(table):
+        if name in df and df[name].dtype != "category":
+            if categories is None:
+                df[name] = df[name].astype("category")
+            else:
+                df[name] = pd.Categorical(df[name], categories=categories[name])
+    return df
+
+
+def read_frame(path, columns=None, memory_map=True, na_values=None):
+    """
+    Read a DataFrame written by `write_frame` (or any CSV, Parquet or Feather file).
+
+    Parameters:
+        path (str): Input path ending in .csv, .parquet or .feather.
+        columns (list of str, optional): Only read these columns. Defaults to all.
+        memory_map (bool, optional): Memory-map Parquet and Feather files instead of
+                                     reading them into a buffer first. Defaults to True.
+        na_values (list, optional): Extra values parsed as missing while reading a CSV
+                                    file, e.g. ['?']. Defaults to None.
+
+    Returns:
+        pandas.DataFrame: The data, with the dtypes it was written with for Parquet and
+                          Feather files.
+
+    Raises:
+        FileNotFoundError: If `path` does not exist.
+        ValueError: If the extension is not supported.
+
+    Examples:
+        >>> combined_df = read_frame('data/combined_df_clean.feather')
+        >>> combined_df['cp'].dtype
+        CategoricalDtype(categories=[1.0, 2.0, 3.0, 4.0], ordered=False, categories_dtype=float64)
+    """
+    fmt = frame_format(path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+    if fmt == "csv":
+        return pd.read_csv(path, usecols=columns, na_values=na_values)
+
+    table = _open_table(path, columns=columns, memory_map=memory_map)
+    return _restore_categoricals(table, table.to_pandas())
+
+
+def _open_table(path, columns=None, memory_map=True):
+    if frame_format(path) == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(path, columns=columns, memory_map=memory_map)
+    import pyarrow.feather as feather
+    return feather.read_table(path, columns=columns, memory_map=memory_map)
+
+
+def read_rows(path, indices, columns=None, na_values=None):
+    """
+    Read the rows at the given positions of a file written by `write_frame`.
+
+    Parquet and Feather files are memory-mapped and only the requested rows are
+    converted to pandas, so a split can be read straight from the cleaned data
+    instead of from copies of its rows. CSV files are read whole and then indexed.
+
+    Parameters:
+        path (str): Input path ending in .csv, .parquet or .feather.
+        indices (array-like of int): Row positions, in the order they are returned.
+        columns (list of str, optional): Only read these columns. Defaults to all.
+        na_values (list, optional): Extra values parsed as missing in a CSV file.
+
+    Returns:
+        pandas.DataFrame: The selected rows, with a fresh index.
+
+    Raises:
+        FileNotFoundError: If `path` does not exist.
+        IndexError: If a position is out of range.
+
+    Examples:
+        >>> train_df = read_rows('data/combined_df_clean.feather', np.load('data/train_idx.npy'))
+    """
+    fmt = frame_format(path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+    indices = np.asarray(indices)
+    if fmt == "csv":
+        return read_frame(path, columns=columns, na_values=na_values).iloc[indices].reset_index(drop=True)
+    table = _open_table(path, columns=columns)
+    if len(indices) and (indices.min() < 0 or indices.max() >= table.num_rows):
+        raise IndexError(f"Row positions out of range for {path} ({table.num_rows} rows).")
+    rows = table.take(indices)
+    return _restore_categoricals(rows, rows.to_pandas(), categories=_table_categories(table))
+
+
+def iter_rows(path, indices, chunksize, columns=None, na_values=None):
+    """
+    Yield the rows at the given positions in chunks of at most `chunksize` rows.
+
+    Rows are yielded in file order, whatever the order of `indices`: Parquet and
+    Feather rows are taken from the memory-mapped table one chunk at a time, and a
+    CSV file is read in a single pass of `chunksize` rows at a time, so only one
+    chunk is held in memory.
+
+    Parameters:
+        path (str): Input path ending in .csv, .parquet or .feather.
+        indices (array-like of int): Row positions to read.
+        chunksize (int): Maximum number of rows per chunk.
+        columns (list of str, optional): Only read these columns. Defaults to all.
+        na_values (list, optional): Extra values parsed as missing in a CSV file.
+
+    Yields:
+        pandas.DataFrame: Consecutive chunks of the selected rows.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+    indices = np.sort(np.asarray(indices))
+    if frame_format(path) != "csv":
+        table = _open_table(path, columns=columns)
+        if len(indices) and (indices[0] < 0 or indices[-1] >= table.num_rows):
+            raise IndexError(f"Row positions out of range for {path} ({table.num_rows} rows).")
+        # the categories come from the whole table, so every chunk gets the same ones
+        categories = _table_categories(table)
+        for start in range(0, len(indices), chunksize):
+            chunk = indices[start:start + chunksize]
+            # take works on the whole table it is given, so each chunk takes from a zero-copy
+            # slice spanning its (sorted) rows only
+            rows = table.slice(chunk[0], chunk[-1] - chunk[0] + 1).take(chunk - chunk[0])
+            yield _restore_categoricals(rows, rows.to_pandas(), categories=categories)
+        return
+    offset = 0
+    for chunk in pd.read_csv(path, usecols=columns, na_values=na_values, chunksize=chunksize):
+        selected = indices[(indices >= offset) & (indices < offset + len(chunk))] - offset
+        offset += len(chunk)
+        if len(selected):
+            yield chunk.iloc[selected].reset_index(drop=True)
+    if len(indices) and (indices[0] < 0 or indices[-1] >= offset):
+        raise IndexError(f"Row positions out of range for {path} ({offset} rows).")
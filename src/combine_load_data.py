@@ -1,4 +1,10 @@
 import pandas as pd
+from src.columnar_io import frame_format
+
+# CSV output writes missing values back as the '?' sentinel of the site files, and floats
+# with enough digits to round-trip, so both ways of combining the files write the same bytes
+NA_REP = "?"
+FLOAT_FORMAT = "%.15g"
 
 def combine_load_data(file_paths, col_names):
     """
@@ -33,4 +39,130 @@ def combine_load_data(file_paths, col_names):
     except FileNotFoundError as e:
         raise FileNotFoundError(f"File not found: {e}")
 
-    return combined_df
\ No newline at end of file
+    return combined_df
+
+
+def parse_missing(df, columns, dtype="float64", na_values="?"):
+    """
+    Parse the `?` sentinel as missing and cast columns to `dtype`.
+
+    This gives the frame returned by `combine_load_data` (or `load_sources`) the values
+    and dtypes `combine_load_data_chunks` parses while reading, so that both write the
+    same file with `write_chunks`.
+
+    Parameters:
+        df (pandas.DataFrame): Data as read from the site files.
+        columns (list of str): Columns to parse; others (e.g. a site column) are kept as is.
+        dtype (str, optional): Dtype of the parsed columns. Defaults to "float64".
+        na_values (str or list of str, optional): Values parsed as missing. Defaults to "?".
+
+    Returns:
+        pandas.DataFrame: A copy of `df` with the parsed columns.
+
+    Examples:
+        >>> df = parse_missing(combine_load_data(file_paths, col_names), col_names)
+        >>> write_chunks([df], 'data/combined_df.csv')
+    """
+    na_values = [na_values] if isinstance(na_values, str) else list(na_values)
+    df = df.copy()
+    parsed = df[columns].mask(df[columns].isin(na_values))
+    df[columns] = parsed.apply(pd.to_numeric).astype(dtype)
+    return df
+
+
+def combine_load_data_chunks(file_paths, col_names, chunksize=100000, dtype="float64", na_values="?"):
+    """
+    Stream data from multiple CSV files as fixed-size DataFrame chunks.
+
+    This is the streaming counterpart of `combine_load_data`. Instead of reading every
+    file whole and concatenating them, the files are read lazily and re-chunked so that
+    every yielded chunk has exactly `chunksize` rows (except the last one), whichever file
+    its rows come from. The `?` sentinel is parsed as missing and every column is parsed
+    straight to `dtype`, so no later replace or cast over the whole frame is needed.
+
+    Parameters:
+        file_paths (list of str): A list containing file paths to CSV files.
+        col_names (list of str): A list of column names to apply to the loaded data.
+        chunksize (int, optional): Number of rows per chunk. Defaults to 100000.
+        dtype (str or dict, optional): Dtype of every column, or a mapping of column name
+                                       to dtype. Defaults to "float64".
+        na_values (str or list of str, optional): Values parsed as missing. Defaults to "?".
+
+    Yields:
+        pandas.DataFrame: Chunks with a running index across all files, as if the files
+                          had been concatenated with `ignore_index=True`.
+
+    Raises:
+        FileNotFoundError: If any of the specified file paths cannot be found.
+
+    Examples:
+        >>> chunks = combine_load_data_chunks(['data/file1.csv', 'data/file2.csv'],
+        ...                                   ['column1', 'column2'], chunksize=1000)
+        >>> write_chunks(chunks, 'data/combined_df.csv')
+        2400
+    """
+    pending = []
+    n_pending = 0
+    start = 0
+    for fp in file_paths:
+        try:
+            reader = pd.read_csv(fp, index_col=False, names=col_names, dtype=dtype,
+                                 na_values=na_values, chunksize=chunksize)
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"File not found: {e}")
+
+        with reader:
+            for piece in reader:
+                pending.append(piece)
+                n_pending += len(piece)
+                while n_pending >= chunksize:
+                    buffer = pd.concat(pending, ignore_index=True)
+                    chunk, rest = buffer.iloc[:chunksize], buffer.iloc[chunksize:]
+                    chunk.index = pd.RangeIndex(start, start + chunksize)
+                    yield chunk
+                    start += chunksize
+                    pending, n_pending = [rest], len(rest)
+
+    if n_pending:
+        chunk = pd.concat(pending, ignore_index=True)
+        chunk.index = pd.RangeIndex(start, start + n_pending)
+        yield chunk
+
+
+def write_chunks(chunks, output_file):
+    """
+    Write DataFrame chunks to a single CSV, Parquet or Feather file as they arrive.
+
+    The output format is chosen by the file extension (see `src.columnar_io`). Only
+    one chunk is held in memory at a time. CSV files write missing values as `NA_REP`
+    and floats with `FLOAT_FORMAT`.
+
+    Parameters:
+        chunks (iterable of pandas.DataFrame): Chunks with identical columns and dtypes,
+                                               e.g. from `combine_load_data_chunks`.
+        output_file (str): Path to the output file.
+
+    Returns:
+        int: Number of rows written.
+    """
+    fmt = frame_format(output_file)
+    n_rows = 0
+    writer = None
+    try:
+        for chunk in chunks:
+            if fmt == "csv":
+                chunk.to_csv(output_file, mode="a" if n_rows else "w", header=not n_rows, index=False,
+                             na_rep=NA_REP, float_format=FLOAT_FORMAT)
+            else:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = (pq.ParquetWriter(output_file, table.schema) if fmt == "parquet"
+                              else pa.ipc.new_file(output_file, table.schema))
+                writer.write_table(table)
+            n_rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n_rows
@@ -0,0 +1,203 @@
+import itertools
+import numpy as np
+import pandas as pd
+
+_FNV_PRIME = np.uint64(0x100000001B3)
+
+def _column_hashes(values):
+    """
+    Hash one column by value: numbers hash as float64 whatever their dtype (1, 1.0 and
+    '1' give the same hash), other values hash as their string.
+    """
+    if values.dtype == "category":
+        values = values.astype(object)
+    numeric = pd.to_numeric(values, errors="coerce")
+    hashes = pd.util.hash_array(numeric.to_numpy(dtype="float64", na_value=np.nan))
+    text = (values.notna() & numeric.isna()).to_numpy()
+    if text.any():
+        hashes[text] = pd.util.hash_array(values[text].astype(str).to_numpy(dtype=object))
+    return hashes
+
+
+def _buckets(values, tolerance):
+    """Index of the width-`tolerance` bucket holding every value (NaN for missing values)."""
+    if values.dtype == "category":
+        values = values.astype(object)
+    numeric = pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    return np.floor(numeric / tolerance)
+
+
+def _combine(row_hashes, column_hashes):
+    with np.errstate(over="ignore"):
+        return row_hashes * _FNV_PRIME ^ column_hashes
+
+
+def _contains(sorted_hashes, hashes):
+    """Mask of the `hashes` found in the sorted array `sorted_hashes`, by binary search."""
+    positions = np.searchsorted(sorted_hashes, hashes)
+    found = positions < len(sorted_hashes)
+    found[found] = sorted_hashes[positions[found]] == hashes[found]
+    return found
+
+
+def _probe_hashes(df, columns=None, tolerances=None):
+    """
+    Row hashes of `df` with every combination of -1, 0 and +1 bucket offsets on the
+    tolerance columns. The first array uses no offset and is the row's own hash.
+    """
+    tolerances = tolerances or {}
+    columns = list(df.columns if columns is None else columns)
+    missing_columns = [column for column in tolerances if column not in columns]
+    if missing_columns:
+        raise KeyError(f"Tolerance columns not found among the hashed columns: {missing_columns}")
+
+    exact = np.zeros(len(df), dtype=np.uint64)
+    for column in columns:
+        if column not in tolerances:
+            exact = _combine(exact, _column_hashes(df[column]))
+    if not tolerances:
+        return [exact]
+
+    buckets = [_buckets(df[column], tolerance) for column, tolerance in tolerances.items()]
+    probes = []
+    for offsets in itertools.product((0, -1, 1), repeat=len(buckets)):
+        row_hashes = exact
+        for bucket, offset in zip(buckets, offsets):
+            row_hashes = _combine(row_hashes, pd.util.hash_array(bucket + offset))
+        probes.append(row_hashes)
+    return probes
+
+
+def hash_rows(df, columns=None, tolerances=None):
+    """
+    Hash every row of a DataFrame to a 64-bit fingerprint in one vectorized pass.
+
+    Columns are normalized before hashing: numbers hash by value whatever their dtype,
+    so the same data parsed as int, float or text gives the same fingerprints. Columns
+    with a tolerance hash the index of their width-`tolerance` bucket instead of the
+    value, so rows whose values fall in the same bucket share a fingerprint.
+
+    Parameters:
+        df (pandas.DataFrame): The data to hash.
+        columns (list of str, optional): Columns included in the hash. Defaults to all.
+        tolerances (dict, optional): Mapping of column name to bucket width, for columns
+                                     compared approximately. Defaults to None (exact).
+
+    Returns:
+        numpy.ndarray: One uint64 hash per row.
+
+    Raises:
+        KeyError: If a tolerance column is not among the hashed columns.
+
+    Examples:
+        >>> hash_rows(pd.DataFrame({'A': [1, 1.0, '1']}))[0] == hash_rows(pd.DataFrame({'A': ['1']}))[0]
+        True
+    """
+    return _probe_hashes(df, columns, tolerances)[0]
+
+
+class DedupIndex:
+    """
+    Index of row hashes for finding duplicate rows in O(n) memory.
+
+    Rows are added batch by batch with `add`, which reports the rows that duplicate a
+    row added before (in an earlier batch or earlier in the same batch). Without
+    tolerances the rows are compared exactly, through `hash_rows`. With tolerances, a
+    row is a near-duplicate of an earlier row that matches it exactly on the other
+    columns and lies in the same or an adjacent bucket on every tolerance column; this
+    is found by probing the index with the 3**k bucket offsets of the k tolerance
+    columns. Every pair of rows within the tolerance is caught, and rows up to twice
+    the tolerance apart may be matched as well. The hashes of earlier batches are kept
+    as a sorted uint64 array and looked up by binary search, so an index of n rows
+    takes 16 bytes per row (the hashes in the order added and sorted).
+
+    Parameters:
+        columns (list of str, optional): Columns compared. Defaults to all.
+        tolerances (dict, optional): Mapping of column name to tolerance, for columns
+                                     compared approximately. Defaults to None (exact).
+        hashes (array-like, optional): Row hashes of previously seen rows, e.g. the
+                                       `hashes` of an earlier index. Defaults to None.
+
+    Examples:
+        >>> index = DedupIndex(tolerances={'oldpeak': 0.1})
+        >>> index.add(pd.DataFrame({'age': [63, 63, 41], 'oldpeak': [2.3, 2.35, 1.0]}))
+        array([False,  True, False])
+        >>> index.add(pd.DataFrame({'age': [41], 'oldpeak': [1.0]}))
+        array([ True])
+    """
+
+    def __init__(self, columns=None, tolerances=None, hashes=None):
+        self.columns = columns
+        self.tolerances = tolerances
+        self._hashes = [] if hashes is None else [np.asarray(hashes, dtype=np.uint64)]
+        self._seen = np.unique(self.hashes)
+
+    def __len__(self):
+        return sum(len(hashes) for hashes in self._hashes)
+
+    @property
+    def hashes(self):
+        """Hashes of all added rows, in the order they were added."""
+        return np.concatenate(self._hashes) if self._hashes else np.empty(0, dtype=np.uint64)
+
+    def add(self, df):
+        """
+        Add the rows of `df` to the index.
+
+        Returns:
+            numpy.ndarray: Boolean mask, True for rows duplicating an earlier row.
+        """
+        probes = _probe_hashes(df, self.columns, self.tolerances)
+        own = probes[0]
+        positions = np.arange(len(df))
+        first = pd.Series(positions).groupby(own).min()
+        lookup = pd.Index(first.index)
+
+        duplicated = np.zeros(len(df), dtype=bool)
+        for probe in probes:
+            found = lookup.get_indexer(probe)
+            earlier = np.zeros(len(df), dtype=bool)
+            earlier[found >= 0] = first.to_numpy()[found[found >= 0]] < positions[found >= 0]
+            if len(self._seen):
+                earlier |= _contains(self._seen, probe)
+            duplicated |= earlier
+
+        self._hashes.append(own)
+        # both parts are sorted, so the stable sort (a merge of the two runs) takes linear time
+        seen = np.concatenate([self._seen, np.unique(own)])
+        seen.sort(kind="stable")
+        self._seen = seen
+        return duplicated
+
+
+def duplicated_rows(df, columns=None, tolerances=None):
+    """
+    Mark rows that duplicate an earlier row, like `df.duplicated()` (see `DedupIndex`).
+
+    Returns:
+        numpy.ndarray: Boolean mask, True for every occurrence after the first.
+    """
+    return DedupIndex(columns, tolerances).add(df)
+
+
+def drop_duplicate_rows(df, columns=None, tolerances=None):
+    """
+    Drop the rows that duplicate an earlier row (exactly or within the tolerances).
+
+    Parameters:
+        df (pandas.DataFrame): The data to deduplicate.
+        columns (list of str, optional): Columns compared. Defaults to all.
+        tolerances (dict, optional): Mapping of column name to tolerance, for columns
+                                     compared approximately. Defaults to None (exact).
+
+    Returns:
+        tuple: The deduplicated DataFrame (with its original index) and the index
+               labels of the dropped rows.
+
+    Examples:
+        >>> combined_df, dropped = drop_duplicate_rows(combined_df)
+        >>> dropped.tolist()
+        [102, 907]
+    """
+    duplicated = duplicated_rows(df, columns, tolerances)
+    return df[~duplicated], df.index[duplicated]
@@ -0,0 +1,203 @@
+import os
+from math import ceil, sqrt
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import altair as alt
+from altair_ally import get_label_angle
+
+def _bandwidth(values):
+    """Scott's rule bandwidth, computed as Vega's density transform does."""
+    quartiles = np.percentile(values, [25, 75])
+    deviation = values.std(ddof=1) if len(values) > 1 else 0.0
+    spread = min(deviation, (quartiles[1] - quartiles[0]) / 1.34) or deviation or abs(quartiles[0]) or 1.0
+    return 1.06 * spread * len(values) ** -0.2
+
+
+def _kde(values, grid, grid_bins):
+    """Gaussian kernel density of `values` at the points of `grid`."""
+    bandwidth = _bandwidth(values)
+    centers, weights = np.unique(values, return_counts=True)
+    if len(centers) > grid_bins:
+        # many distinct values: bin them far more finely than the kernel width
+        weights, edges = np.histogram(values, bins=grid_bins)
+        centers = (edges[:-1] + edges[1:]) / 2
+    z = (grid[:, None] - centers[None, :]) / bandwidth
+    density = (np.exp(-0.5 * z ** 2) @ weights) / (len(values) * bandwidth * np.sqrt(2 * np.pi))
+    return density
+
+
+def _color(df, color):
+    """The nominal color encoding altair_ally uses, ordered by group size."""
+    order = df[color].value_counts().index.tolist()
+    return alt.Color(field=color, type="nominal", title=None, legend={"orient": "top"}, sort=order), order
+
+
+def _group_values(df, column, color):
+    """Yield the non-missing values of `column` for each group of `color`."""
+    values = df[column].to_numpy(dtype="float64", na_value=np.nan)
+    groups = df[color]
+    for group in groups.dropna().unique():
+        group_values = values[(groups == group).to_numpy()]
+        yield group, group_values[np.isfinite(group_values)]
+
+
+def density_frame(df, column, color="label", steps=200, grid_bins=4096):
+    """
+    Pre-aggregate the density curve of one numeric column for each color group.
+
+    The curves are the Gaussian kernel density estimates Vega computes for
+    `altair_ally.dist` (Scott's rule bandwidth per group, evaluated at `steps` points
+    over the range shared by all groups), so only `steps` points per group are
+    embedded in the chart instead of every row. Missing values are left out, whereas
+    Vega counts them as zeros.
+
+    Parameters:
+        df (pandas.DataFrame): The data.
+        column (str): Numeric column to estimate the density of.
+        color (str, optional): Grouping column. Defaults to 'label'.
+        steps (int, optional): Number of points on each curve. Defaults to 200.
+        grid_bins (int, optional): Above this many distinct values, values are binned
+                                   into this many bins before the kernel is applied.
+                                   Defaults to 4096.
+
+    Returns:
+        pandas.DataFrame: Columns `value`, `density` and `color`, without rows if the
+                          column has no values.
+    """
+    grid = np.linspace(df[column].min(), df[column].max(), steps)
+    frames = []
+    for group, values in _group_values(df, column, color):
+        if len(values):
+            density = _kde(values, grid, grid_bins)
+            frames.append(pd.DataFrame({"value": grid, "density": density, color: group}))
+    if not frames:
+        return pd.DataFrame({"value": pd.Series(dtype="float64"), "density": pd.Series(dtype="float64"),
+                             color: pd.Series(dtype=df[color].dtype)})
+    return pd.concat(frames, ignore_index=True)
+
+
+def rug_frame(df, column, color="label", max_points=5000, bins=800):
+    """
+    The observations drawn as a rug under a density curve.
+
+    Data with at most `max_points` rows is kept as is. Larger data is reduced to the
+    distinct (position, group) pairs after rounding the values to `bins` positions
+    over the column's range, which is finer than the chart is wide.
+
+    Returns:
+        pandas.DataFrame: Columns `column` and `color`.
+    """
+    rug = df[[column, color]].dropna()
+    if len(rug) <= max_points:
+        return rug
+    values = rug[column].to_numpy(dtype="float64")
+    low, high = values.min(), values.max()
+    step = (high - low) / bins or 1.0
+    rug = rug.assign(**{column: low + np.round((values - low) / step) * step})
+    return rug.drop_duplicates(ignore_index=True)
+
+
+def category_counts(df, column, color="label"):
+    """Count the rows for each value of `column` and each color group, missing values included."""
+    keys = [column] if column == color else [column, color]
+    counts = df.groupby(keys, observed=True, dropna=False).size()
+    return counts[counts > 0].rename("count").reset_index()
+
+
+def numerical_chart(df, color="label", steps=200, max_rug_points=5000):
+    """
+    Density plots with a rug of the numeric columns, as `altair_ally.dist(df, color=color)` draws them.
+
+    Densities, rugs and counts are pre-aggregated with NumPy and pandas, so the chart
+    embeds a bounded number of points however many rows `df` has.
+
+    Parameters:
+        df (pandas.DataFrame): The data.
+        color (str, optional): Column used to color the groups. Defaults to 'label'.
+        steps (int, optional): Number of points on each density curve. Defaults to 200.
+        max_rug_points (int, optional): Rows above which the rug is thinned (see
+                                        `rug_frame`). Defaults to 5000.
+
+    Returns:
+        altair.ConcatChart: One chart per numeric column.
+
+    Examples:
+        >>> numerical_chart(train_df).save('results/numerical_chart.png', format='png')
+    """
+    encoding, _ = _color(df, color)
+    columns = df.select_dtypes(include="number").columns
+    charts = []
+    for column in columns:
+        density = alt.Chart(density_frame(df, column, color, steps),
+                            mark={"type": "area", "opacity": 0.2}, width=200, height=120).encode(
+            x=alt.X("value:Q").title(column).axis(grid=False, offset=8),
+            y=alt.Y("density:Q").stack(None).title("Density"),
+            color=encoding
+        )
+        rug = alt.Chart(rug_frame(df, column, color, max_rug_points)).mark_tick(
+            opacity=0.3, yOffset=5, height=7
+        ).encode(
+            x=alt.X(field=column, type="quantitative").axis(grid=False, offset=8),
+            y=alt.datum(0),
+            tooltip=alt.value("Individual observations"),
+            color=encoding
+        )
+        charts.append(density + density.mark_line(opacity=0.9, strokeWidth=2) + rug)
+    return _grid(charts)
+
+
+def categorical_chart(df, color="label"):
+    """
+    Bar charts of the category counts of the categorical columns, as
+    `altair_ally.dist(df, dtype='category', color=color)` draws them, from counts
+    computed with pandas instead of one row per observation.
+
+    Returns:
+        altair.ConcatChart: One chart per categorical column, fewest categories first.
+    """
+    encoding, order = _color(df, color)
+    offset = alt.XOffset(field=color, type="nominal").scale(paddingInner=0.1).sort(order)
+    columns = df.select_dtypes(include="category")
+    charts = []
+    for column in columns.nunique().sort_values(kind="stable").index:
+        sort = "-y"
+        if columns[column].cat.ordered:
+            sort = columns[column].cat.categories.tolist()
+        angle = get_label_angle(df[column].unique(), df[color].nunique(dropna=False))
+        charts.append(alt.Chart(category_counts(df, column, color), mark={"type": "bar"}, height=120).encode(
+            x=alt.X(field=column, type="nominal").sort(sort).axis(labelAngle=angle),
+            y=alt.Y("sum(count):Q").title("Count"),
+            color=encoding,
+            xOffset=offset
+        ))
+    return _grid(charts)
+
+
+def _grid(charts):
+    columns = len(charts) if len(charts) <= 3 else ceil(sqrt(len(charts)))
+    return alt.concat(*charts, columns=columns).configure_view(stroke=None)
+
+
+def _save_chart(chart, path):
+    chart.save(path, format=os.path.splitext(path)[1][1:])
+    return path
+
+
+def save_charts(charts, max_workers=None):
+    """
+    Render and save several charts concurrently.
+
+    The charts are converted to images on a thread pool; the renderer releases the
+    GIL, so they are rendered at the same time rather than one after the other.
+
+    Parameters:
+        charts (dict): Mapping of output path (e.g. a .png file) to Altair chart.
+        max_workers (int, optional): Size of the pool. Defaults to one thread per chart.
+
+    Returns:
+        list of str: The saved paths.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers or len(charts)) as executor:
+        futures = [executor.submit(_save_chart, chart, path) for path, chart in charts.items()]
+        return [future.result() for future in futures]
@@ -0,0 +1,255 @@
+import os
+import json
+import joblib
+import numpy as np
+import pandas as pd
+from scipy.stats import rankdata
+from joblib import Parallel, delayed
+from sklearn.pipeline import Pipeline
+from sklearn.metrics import classification_report
+
+SCALAR_METRICS = ["accuracy", "balanced_accuracy", "precision_macro", "recall_macro", "f1_macro",
+                  "precision_weighted", "recall_weighted", "f1_weighted", "roc_auc_ovr_macro",
+                  "roc_auc_ovr_weighted", "log_loss", "brier_score", "expected_calibration_error"]
+
+def _divide(numerator, denominator):
+    """Elementwise ratio, 0 where the denominator is 0 (as `zero_division=0` in scikit-learn)."""
+    numerator, denominator = np.asarray(numerator, dtype=float), np.asarray(denominator, dtype=float)
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator != 0)
+
+
+def _roc_auc_ovr(true_codes, proba):
+    """One-vs-rest ROC AUC of every column, from the ranks of the scores (NaN without both classes)."""
+    n_rows, n_labels = proba.shape
+    positive = true_codes[:, None] == np.arange(n_labels)
+    n_positive = positive.sum(axis=0)
+    n_negative = n_rows - n_positive
+    # Mann-Whitney U: the rank sum of the positives, with ties sharing their average rank
+    rank_sum = (rankdata(proba, axis=0) * positive).sum(axis=0)
+    auc = (rank_sum - n_positive * (n_positive + 1) / 2) / np.maximum(n_positive * n_negative, 1)
+    return np.where((n_positive > 0) & (n_negative > 0), auc, np.nan)
+
+
+def align_probabilities(y_true, proba, classes):
+    """
+    Put predicted probabilities and true labels on one sorted set of labels.
+
+    Test labels the model never saw get a column of zero probability.
+
+    Parameters:
+        y_true (array-like): True labels.
+        proba (numpy.ndarray): Predicted probabilities, one column per class.
+        classes (array-like): The class of each column (the model's `classes_`).
+
+    Returns:
+        tuple: The sorted `labels`, the probabilities with one column per label and the
+               position of each true label in `labels`.
+    """
+    y_true = np.asarray(y_true)
+    classes = np.asarray(classes)
+    proba = np.asarray(proba, dtype=float)
+    labels = np.union1d(classes, np.unique(y_true))
+    if len(labels) > len(classes):
+        full = np.zeros((len(proba), len(labels)))
+        full[:, np.searchsorted(labels, classes)] = proba
+        proba = full
+    return labels, proba, np.searchsorted(labels, y_true)
+
+
+def score_metrics(y_true, proba, classes, n_bins=10):
+    """
+    Compute every test-set metric from one array of predicted class probabilities.
+
+    The predictions are the most probable classes. Precision, recall and F1 come from a
+    single confusion matrix, averaged over the labels present in `y_true` or the
+    predictions (as `classification_report` does). ROC AUC is one-vs-rest and
+    computed for all classes at once from the ranks of the probabilities. Calibration is
+    summarised by the expected calibration error of the top-class probability over
+    `n_bins` equal-width bins.
+
+    Parameters:
+        y_true (array-like): True labels.
+        proba (numpy.ndarray): Predicted probabilities, one column per class.
+        classes (array-like): The class of each column (the model's `classes_`).
+        n_bins (int, optional): Number of confidence bins for calibration. Defaults to 10.
+
+    Returns:
+        dict: `metrics` (the `SCALAR_METRICS`), `labels`, per-label `per_class` precision,
+              recall, F1, support and ROC AUC, the `confusion_matrix` (rows are true labels),
+              the `calibration` bins and the `classification_report` text.
+
+    Examples:
+        >>> proba = model.predict_proba(X_test)
+        >>> score_metrics(y_test, proba, model.classes_)['metrics']['roc_auc_ovr_macro']
+    """
+    y_true = np.asarray(y_true)
+    labels, proba, true_codes = align_probabilities(y_true, proba, classes)
+    pred_codes = proba.argmax(axis=1)
+    y_pred = labels[pred_codes]
+    n_rows, n_labels = proba.shape
+
+    confusion = np.bincount(true_codes * n_labels + pred_codes, minlength=n_labels ** 2).reshape(n_labels, n_labels)
+    true_positive = np.diag(confusion)
+    support, predicted = confusion.sum(axis=1), confusion.sum(axis=0)
+    precision = _divide(true_positive, predicted)
+    recall = _divide(true_positive, support)
+    f1 = _divide(2 * precision * recall, precision + recall)
+    present = (support > 0) | (predicted > 0)
+    auc = _roc_auc_ovr(true_codes, proba)
+    scored = ~np.isnan(auc)
+
+    true_proba = np.clip(proba[np.arange(n_rows), true_codes], 1e-15, 1)
+    one_hot = true_codes[:, None] == np.arange(n_labels)
+    confidence = proba[np.arange(n_rows), pred_codes]
+    correct = pred_codes == true_codes
+    bins = np.minimum((confidence * n_bins).astype(int), n_bins - 1)
+    bin_count = np.bincount(bins, minlength=n_bins)
+    bin_confidence = np.bincount(bins, weights=confidence, minlength=n_bins)
+    bin_correct = np.bincount(bins, weights=correct, minlength=n_bins)
+
+    metrics = {
+        "accuracy": correct.mean(),
+        "balanced_accuracy": recall[support > 0].mean(),
+        "precision_macro": precision[present].mean(),
+        "recall_macro": recall[present].mean(),
+        "f1_macro": f1[present].mean(),
+        "precision_weighted": np.average(precision, weights=support),
+        "recall_weighted": np.average(recall, weights=support),
+        "f1_weighted": np.average(f1, weights=support),
+        "roc_auc_ovr_macro": auc[scored].mean() if scored.any() else np.nan,
+        "roc_auc_ovr_weighted": np.average(auc[scored], weights=support[scored]) if scored.any() else np.nan,
+        "log_loss": -np.log(true_proba).mean(),
+        "brier_score": ((proba - one_hot) ** 2).sum(axis=1).mean(),
+        "expected_calibration_error": np.abs(bin_correct - bin_confidence).sum() / n_rows
+    }
+    return {
+        "metrics": {name: float(value) for name, value in metrics.items()},
+        "labels": labels.tolist(),
+        "per_class": pd.DataFrame({"precision": precision, "recall": recall, "f1": f1, "support": support,
+                                   "roc_auc": auc}, index=labels.astype(str)).to_dict(orient="index"),
+        "confusion_matrix": confusion.tolist(),
+        "calibration": {
+            "count": bin_count.tolist(),
+            "mean_confidence": _divide(bin_confidence, bin_count).tolist(),
+            "accuracy": _divide(bin_correct, bin_count).tolist()
+        },
+        "classification_report": classification_report(y_true, y_pred, zero_division=0)
+    }
+
+
+def _split_preprocessing(model):
+    """Split a pipeline into its preprocessing steps and final estimator."""
+    if isinstance(model, Pipeline) and len(model.steps) > 1:
+        return model[:-1], model.steps[-1][1]
+    return None, model
+
+
+def _transform_and_score(preprocessing, estimators, X_test):
+    X = X_test if preprocessing is None else preprocessing.transform(X_test)
+    return [(estimator.predict_proba(X), estimator.classes_) for estimator in estimators]
+
+
+def predict_probas(models, X_test, n_jobs=None):
+    """
+    Predict the class probabilities of fitted classifiers on shared test data.
+
+    Pipelines whose fitted preprocessing steps are identical (as returned by
+    `tune_models`, where each holds a copy of one preprocessor fitted on the training
+    data) transform the test data once for all of them.
+
+    Parameters:
+        models (dict): Mapping of model name to fitted classifier or pipeline with
+                       `predict_proba` and `classes_`.
+        X_test (pandas.DataFrame or numpy.ndarray): Test features.
+        n_jobs (int, optional): Number of threads transforming and scoring the groups of
+                                models sharing a preprocessor. Defaults to None (serial).
+
+    Returns:
+        dict: Mapping of model name to its probabilities and `classes_`.
+    """
+    groups = {}
+    for name, model in models.items():
+        preprocessing, estimator = _split_preprocessing(model)
+        key = None if preprocessing is None else joblib.hash(preprocessing)
+        if key not in groups:
+            groups[key] = (preprocessing, [])
+        groups[key][1].append((name, estimator))
+
+    outputs = Parallel(n_jobs=n_jobs, prefer="threads")(
+        delayed(_transform_and_score)(preprocessing, [estimator for _, estimator in members], X_test)
+        for preprocessing, members in groups.values()
+    )
+    scores = {name: output for (_, members), group_outputs in zip(groups.values(), outputs)
+              for (name, _), output in zip(members, group_outputs)}
+    return {name: scores[name] for name in models}
+
+
+def evaluate_models(models, X_test, y_test, n_bins=10, n_jobs=None, probas=None):
+    """
+    Evaluate fitted classifiers on shared test data, with one `predict_proba` call per model.
+
+    The probabilities come from `predict_probas` and every metric is computed from them
+    (see `score_metrics`).
+
+    Parameters:
+        models (dict): Mapping of model name to fitted classifier or pipeline with
+                       `predict_proba` and `classes_`.
+        X_test (pandas.DataFrame or numpy.ndarray): Test features.
+        y_test (pandas.Series or numpy.ndarray): Test labels.
+        n_bins (int, optional): Number of calibration bins. Defaults to 10.
+        n_jobs (int, optional): Number of threads predicting (see `predict_probas`).
+                                Defaults to None (serial).
+        probas (dict, optional): Probabilities already returned by `predict_probas`, which
+                                 are used instead of predicting again. Defaults to None.
+
+    Returns:
+        dict: Mapping of model name to its evaluation (see `score_metrics`).
+
+    Examples:
+        >>> evaluations = evaluate_models(best_models, X_test, y_test)
+        >>> metrics_table(evaluations)
+    """
+    if probas is None:
+        probas = predict_probas(models, X_test, n_jobs=n_jobs)
+    return {name: score_metrics(y_test, *probas[name], n_bins=n_bins) for name in models}
+
+
+def metrics_table(evaluations):
+    """
+    The scalar metrics of every model as one table.
+
+    Parameters:
+        evaluations (dict): Mapping of model name to evaluation, from `evaluate_models`.
+
+    Returns:
+        pandas.DataFrame: One row per model (indexed by `model`), one column per metric.
+    """
+    table = pd.DataFrame({name: evaluation["metrics"] for name, evaluation in evaluations.items()}).T
+    return table[SCALAR_METRICS].rename_axis("model")
+
+
+def write_evaluation(evaluations, output_dir):
+    """
+    Save the evaluation of every model: one JSON file with all metrics, confusion matrices
+    and calibration bins, one CSV table of the scalar metrics, and the classification
+    report of each model as `classification_report_<model>.txt`.
+
+    Parameters:
+        evaluations (dict): Mapping of model name to evaluation, from `evaluate_models`.
+        output_dir (str): Folder to write to.
+
+    Returns:
+        dict: Paths of the `json` and `csv` files and of each model's `reports`.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {"json": os.path.join(output_dir, "model_evaluation.json"),
+             "csv": os.path.join(output_dir, "model_evaluation.csv"), "reports": {}}
+    with open(paths["json"], "w") as f:
+        json.dump(evaluations, f, indent=2, default=str)
+    metrics_table(evaluations).to_csv(paths["csv"])
+    for name, evaluation in evaluations.items():
+        path = os.path.join(output_dir, f"classification_report_{name.replace(' ', '_')}.txt")
+        with open(path, "w") as f:
+            f.write(evaluation["classification_report"])
+        paths["reports"][name] = path
+    return paths
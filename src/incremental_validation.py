@@ -0,0 +1,308 @@
+import os
+import json
+import warnings
+import numpy as np
+import pandas as pd
+import pandera as pa
+from src.validate_data import VALUE_RULES, _describe_rule, _value_violations
+from src.dedup_index import DedupIndex, hash_rows
+
+STATE_FILE = "state.json"
+ARRAYS_FILE = "state.npz"
+
+def _numeric_matrix(df, na_values=("?",)):
+    """Convert every column to float64 (the `?` sentinel and unparsable values become NaN)."""
+    matrix = np.empty((len(df), df.shape[1]), dtype="float64")
+    for j, column in enumerate(df.columns):
+        values = df[column]
+        if values.dtype == "category":
+            values = values.astype(values.cat.categories.dtype)
+        values = values.mask(values.isin(na_values))
+        matrix[:, j] = pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    return matrix
+
+
+def _empty_state(df, rules):
+    n_columns = df.shape[1]
+    return {
+        "n_rows": 0,
+        "columns": [str(column) for column in df.columns],
+        "empty_rows": 0,
+        "missing_counts": np.zeros(n_columns, dtype="int64"),
+        "duplicate_index": [],
+        "value_violations": {column: [] for column in rules},
+        "label_counts": {},
+        "row_hashes": np.empty(0, dtype=np.uint64),
+        # pairwise-complete statistics of the Pearson correlation matrix: entry (i, j) is
+        # over the rows where columns i and j are both present, with the mean and sum of
+        # squared deviations of column i, and the co-moment of columns i and j
+        "pair_count": np.zeros((n_columns, n_columns)),
+        "pair_mean": np.zeros((n_columns, n_columns)),
+        "pair_m2": np.zeros((n_columns, n_columns)),
+        "comoment": np.zeros((n_columns, n_columns)),
+        "min": np.full(n_columns, np.inf),
+        "max": np.full(n_columns, -np.inf),
+    }
+
+
+def load_validation_state(state_dir):
+    """
+    Load the state saved by `save_validation_state`, or None if there is none yet.
+    """
+    state_file = os.path.join(state_dir, STATE_FILE)
+    if not os.path.exists(state_file):
+        return None
+    with open(state_file) as f:
+        state = json.load(f)
+    with np.load(os.path.join(state_dir, ARRAYS_FILE)) as arrays:
+        state.update({name: arrays[name] for name in arrays.files})
+    return state
+
+
+def save_validation_state(state, state_dir):
+    """
+    Save the validated state: counts and indices as JSON, hashes and statistics as NumPy arrays.
+
+    The arrays are written first, so an interrupted save leaves the previous JSON in
+    place and is detected on the next load by the mismatching number of row hashes.
+    """
+    os.makedirs(state_dir, exist_ok=True)
+    arrays = {name: value for name, value in state.items() if isinstance(value, np.ndarray)}
+    np.savez(os.path.join(state_dir, ARRAYS_FILE), **arrays)
+    scalars = {name: value for name, value in state.items() if name not in arrays}
+    with open(os.path.join(state_dir, STATE_FILE), "w") as f:
+        json.dump(scalars, f, indent=2)
+
+
+def _is_prefix(state, df, verify_rows=1000):
+    """
+    Whether `df` starts with the rows (and columns) the state was built from.
+
+    Only up to `verify_rows` of the validated rows are hashed again and compared with
+    the stored hashes (the first, the last and a random sample of the others; all of
+    them if `verify_rows` is None), so the check does not grow with the history.
+    """
+    if state is None or "comoment" not in state or state["columns"] != [str(column) for column in df.columns]:
+        return False
+    n_rows = state["n_rows"]
+    if len(df) < n_rows or len(state["row_hashes"]) != n_rows:
+        return False
+    if verify_rows is None or verify_rows >= n_rows:
+        positions = np.arange(n_rows)
+    else:
+        sample = np.random.default_rng().choice(np.arange(1, n_rows - 1), size=max(verify_rows - 2, 0),
+                                                replace=False)
+        positions = np.unique(np.r_[0, n_rows - 1, sample])
+    return bool(np.array_equal(hash_rows(df.iloc[positions]), state["row_hashes"][positions]))
+
+
+def _update_state(state, delta, rules, label, na_values):
+    """Fold the appended rows into the running aggregates of `state`."""
+    state["n_rows"] += len(delta)
+    state["empty_rows"] += int(delta.isna().all(axis=1).sum())
+    state["missing_counts"] = state["missing_counts"] + delta.isna().sum().to_numpy()
+
+    dedup_index = DedupIndex(hashes=state["row_hashes"])
+    state["duplicate_index"] += delta.index[dedup_index.add(delta)].tolist()
+    state["row_hashes"] = dedup_index.hashes
+
+    violations = _value_violations(delta, rules, na_values)
+    for j, column in enumerate(rules):
+        state["value_violations"][column] += delta.index[violations[:, j]].tolist()
+
+    if label in delta.columns:
+        for value, count in delta[label].astype(str).value_counts().items():
+            state["label_counts"][value] = state["label_counts"].get(value, 0) + int(count)
+
+    values = _numeric_matrix(delta, na_values)
+    present = (~np.isnan(values)).astype("float64")
+    # the new rows are shifted by their column means, so the sums below do not cancel
+    with warnings.catch_warnings():
+        # columns without a value in the new rows are not shifted
+        warnings.simplefilter("ignore", RuntimeWarning)
+        shift = np.nan_to_num(np.nanmean(values, axis=0))
+    centred = np.nan_to_num(values - shift)
+    count = present.T @ present
+    total = centred.T @ present
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(count > 0, total / count, 0)
+    m2 = (centred ** 2).T @ present - count * mean ** 2
+    comoment = centred.T @ centred - count * mean * mean.T
+
+    # merge with the earlier rows (Chan et al.'s pairwise update of the mean and co-moments)
+    old_count = state["pair_count"]
+    new_count = old_count + count
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weight = np.where(new_count > 0, old_count * count / new_count, 0)
+        delta_mean = mean + shift[:, None] - state["pair_mean"]
+        state["pair_mean"] = state["pair_mean"] + np.where(new_count > 0, delta_mean * count / new_count, 0)
+    state["pair_m2"] = state["pair_m2"] + m2 + delta_mean ** 2 * weight
+    state["comoment"] = state["comoment"] + comoment + delta_mean * delta_mean.T * weight
+    state["pair_count"] = new_count
+    with np.errstate(invalid="ignore"):
+        state["min"] = np.fmin(state["min"], np.nanmin(values, axis=0, initial=np.inf))
+        state["max"] = np.fmax(state["max"], np.nanmax(values, axis=0, initial=-np.inf))
+    return state
+
+
+def _correlation(state):
+    """Pairwise-complete Pearson correlation matrix, as `DataFrame.corr()` computes it."""
+    n = state["pair_count"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = state["comoment"] / np.sqrt(state["pair_m2"] * state["pair_m2"].T)
+    corr[n < 2] = np.nan
+    return pd.DataFrame(np.clip(corr, -1, 1), index=state["columns"], columns=state["columns"])
+
+
+def _column_stats(state):
+    n = np.diag(state["pair_count"])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(n > 0, np.diag(state["pair_mean"]), np.nan)
+        std = np.sqrt(np.maximum(np.diag(state["pair_m2"]), 0) / (n - 1))
+    return pd.DataFrame({
+        "count": n.astype("int64"), "mean": mean, "std": std,
+        "min": np.where(n > 0, state["min"], np.nan), "max": np.where(n > 0, state["max"], np.nan)
+    }, index=state["columns"])
+
+
+def _build_report(state, rules, label, corr_threshold):
+    n_rows = state["n_rows"]
+    missing_prop = pd.Series(state["missing_counts"] / max(n_rows, 1), index=state["columns"])
+    value_ranges = {
+        column: {"rule": _describe_rule(column, rule),
+                 "violations": len(state["value_violations"][column]),
+                 "rows": np.asarray(state["value_violations"][column])}
+        for column, rule in rules.items()
+    }
+    corr = _correlation(state)
+    features = [column for column in state["columns"] if column != label]
+    upper = np.triu(np.ones((len(features), len(features)), dtype=bool), k=1)
+    feature_corr = corr.loc[features, features].where(upper).stack()
+    label_corr = corr.loc[features, label] if label in corr.columns else pd.Series(dtype="float64")
+    label_counts = pd.Series(state["label_counts"], dtype="int64").sort_values(ascending=False)
+    return {
+        "n_rows": n_rows,
+        "empty_rows": state["empty_rows"],
+        "missing_prop": missing_prop,
+        "duplicate_rows": len(state["duplicate_index"]),
+        "duplicate_index": np.asarray(state["duplicate_index"]),
+        "value_ranges": value_ranges,
+        "class_proportions": label_counts / max(label_counts.sum(), 1),
+        "column_stats": _column_stats(state),
+        "correlation": corr,
+        "high_feature_correlations": feature_corr[feature_corr.abs() > corr_threshold],
+        "high_label_correlations": label_corr[label_corr.abs() > corr_threshold],
+    }
+
+
+def _print_report(report, threshold, corr_threshold):
+    if report["empty_rows"]:
+        print(f"Warning: There are {report['empty_rows']} completely empty rows in dataset.")
+    else:
+        print("No missing row found.")
+    for col, prop in report["missing_prop"].items():
+        if prop > threshold:
+            print(f"Warning: There're too many missing values in column '{col}'.")
+        else:
+            print(f"Column '{col}' passed the test of missingness.")
+    if report["duplicate_rows"]:
+        print(f"Warning: There're {report['duplicate_rows']} duplicate rows at index {report['duplicate_index'].tolist()}.")
+    else:
+        print("No duplicate rows found.")
+    violated = [result for result in report["value_ranges"].values() if result["violations"]]
+    if not violated:
+        print("No outlier or anomalous value found.")
+    for result in violated:
+        print(f"Warning: {result['violations']} value(s) violate '{result['rule']}'.")
+    print("Class proportions are", report["class_proportions"])
+    for (first, second), value in report["high_feature_correlations"].items():
+        print(f"Warning: Correlation between '{first}' and '{second}' is {value:.2f}, above {corr_threshold}.")
+    for feature, value in report["high_label_correlations"].items():
+        print(f"Warning: Correlation between '{feature}' and the target is {value:.2f}, above {corr_threshold}.")
+    if report["high_feature_correlations"].empty and report["high_label_correlations"].empty:
+        print(f"No correlation above {corr_threshold} found.")
+
+
+def validate_incremental(combined_df, state_dir, threshold=0.05, corr_threshold=0.9, rules=None,
+                         label="label", na_values=("?",), schema=None, verify_rows=1000):
+    """
+    Validate only the rows appended since the last run and merge them into the stored report.
+
+    The state saved in `state_dir` holds everything the checks need from the rows
+    already validated: the row count, a 64-bit hash per row, the empty-row, missing,
+    duplicate and rule-violation counts with their row indices, the class counts, the
+    running minimum and maximum of every column, and the pairwise-complete counts, means,
+    sums of squared deviations and co-moments of the correlation matrix, merged with
+    those of the new rows by Chan et al.'s update (so they stay accurate on large or
+    offset values). On each run a sample of the stored row hashes (see `verify_rows`) is
+    compared with the first rows of `combined_df`; if they match, only the rows after
+    them are checked, and duplicates are looked up in the stored hash index. If the
+    columns changed or earlier rows were edited or removed, the state is discarded and
+    the whole DataFrame is validated.
+
+    Correlations are Pearson coefficients computed from these statistics, so they match
+    `combined_df.corr()` but not the deepchecks predictive power score used by the full
+    validation.
+
+    Parameters:
+        combined_df (pandas.DataFrame): The full data, whose first rows were validated
+                                        by a previous run.
+        state_dir (str): Directory holding the validation state. It is created if needed.
+        threshold (float, optional): Acceptable proportion of missing values in a column.
+                                     Defaults to 0.05.
+        corr_threshold (float, optional): Absolute correlation above which a pair of
+                                          columns is reported. Defaults to 0.9.
+        rules (dict, optional): Value rules, as in `check_value_ranges`.
+                                Defaults to `VALUE_RULES`.
+        label (str, optional): Name of the target column. Defaults to "label".
+        na_values (tuple, optional): Values treated as missing. Defaults to ("?",).
+        schema (pandera.DataFrameSchema, optional): Schema the new rows are validated
+                                                    against. Defaults to None.
+        verify_rows (int, optional): Number of validated rows hashed again to check that
+                                     they are unchanged: the first, the last and a random
+                                     sample of the others. Edits to rows outside the
+                                     sample go unnoticed; None checks every row (as
+                                     costly as the first run). Defaults to 1000.
+
+    Returns:
+        dict: The merged report over all rows: `n_rows`, `new_rows`, `empty_rows`,
+              `missing_prop`, `duplicate_rows`, `duplicate_index`, `value_ranges` (as
+              returned by `check_value_ranges`), `class_proportions`, `column_stats`
+              (count, mean, std, min and max per column), `correlation`,
+              `high_feature_correlations` and `high_label_correlations`.
+
+    Prints:
+        The same messages as the full validation checks, for all rows, and the data type
+        check of the new rows when a `schema` is given.
+
+    Examples:
+        >>> combined_df = read_frame('data/combined_df.csv')
+        >>> report = validate_incremental(combined_df, 'results/validation_state')
+        Validating 920 new row(s) (0 already validated).
+        ...
+    """
+    if rules is None:
+        rules = VALUE_RULES
+    state = load_validation_state(state_dir)
+    if not _is_prefix(state, combined_df, verify_rows):
+        if state is not None:
+            print("Stored validation state does not match the data; validating all rows.")
+        state = _empty_state(combined_df, rules)
+
+    validated = state["n_rows"]
+    delta = combined_df.iloc[validated:]
+    print(f"Validating {len(delta)} new row(s) ({validated} already validated).")
+    if schema is not None and len(delta):
+        try:
+            schema.validate(delta)
+            print("All columns have correct data types.")
+        except pa.errors.SchemaError as e:
+            print(f"Warning: Validation failed: {e}")
+    if len(delta):
+        state = _update_state(state, delta, rules, label, na_values)
+        save_validation_state(state, state_dir)
+
+    report = _build_report(state, rules, label, corr_threshold)
+    report["new_rows"] = len(delta)
+    _print_report(report, threshold, corr_threshold)
+    return report
@@ -0,0 +1,182 @@
+import os
+import re
+import glob
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import pandas as pd
+from src.combine_load_data import combine_load_data
+
+def _site_name(path):
+    """Derive a site name from a file name, e.g. 'processed.hungarian.data' -> 'hungarian'."""
+    name = os.path.basename(path)
+    name = re.sub(r"^processed\.", "", name)
+    return os.path.splitext(name)[0]
+
+
+def resolve_sources(config_path=None, pattern=None):
+    """
+    Build the list of site files to ingest from a JSON config file or a glob pattern.
+
+    The config file is either a list or an object with a `sources` list, whose entries
+    are file paths or objects with a `path` and optionally a `site` name and a `sha256`
+    checksum. Relative paths in the config are resolved against the current directory.
+
+    Parameters:
+        config_path (str, optional): Path to a JSON source config file.
+        pattern (str, optional): Glob pattern matching the site files, e.g.
+                                 'data/processed.*.data'. Matches are sorted by path.
+
+    Returns:
+        list of dict: One `{'site': ..., 'path': ..., 'sha256': ...}` entry per source,
+                      with `sha256` set to None when no checksum is known.
+
+    Raises:
+        ValueError: If neither or both of `config_path` and `pattern` are given, or if
+                    the sources resolve to an empty list.
+
+    Examples:
+        >>> resolve_sources(pattern='data/processed.*.data')[0]
+        {'site': 'cleveland', 'path': 'data/processed.cleveland.data', 'sha256': None}
+    """
+    if (config_path is None) == (pattern is None):
+        raise ValueError("Specify exactly one of a source config file or a glob pattern.")
+
+    if pattern is not None:
+        entries = sorted(glob.glob(pattern))
+    else:
+        with open(config_path) as f:
+            config = json.load(f)
+        entries = config["sources"] if isinstance(config, dict) else config
+
+    sources = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"path": entry}
+        sources.append({
+            "site": entry.get("site", _site_name(entry["path"])),
+            "path": entry["path"],
+            "sha256": entry.get("sha256"),
+        })
+    if not sources:
+        raise ValueError(f"No source files found for {config_path or pattern}.")
+    return sources
+
+
+def file_sha256(path, block_size=1 << 20):
+    """Compute the SHA-256 hex digest of a file, reading it in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _expected_sha256(source, mirror_path):
+    if source.get("sha256"):
+        return source["sha256"]
+    sidecar = f"{mirror_path}.sha256"
+    if os.path.exists(sidecar):
+        with open(sidecar) as f:
+            return f.read().split()[0]
+    return None
+
+
+def copy_from_mirror(source, mirror_dir, block_size=1 << 20):
+    """
+    Copy one source file from a local mirror directory, resuming interrupted copies.
+
+    The copy is written to `<path>.part` and only renamed to `path` once it is complete
+    and its checksum matches, so an interrupted run resumes from the bytes already
+    copied. The expected checksum is the source's `sha256` or, failing that, the first
+    word of a `<file>.sha256` sidecar in the mirror. Files already present with the
+    expected checksum are not copied again.
+
+    Parameters:
+        source (dict): A source entry from `resolve_sources`.
+        mirror_dir (str): Directory holding the mirrored site files under the same names.
+        block_size (int, optional): Number of bytes copied at a time. Defaults to 1 MiB.
+
+    Returns:
+        str: "skipped" if the file was already up to date, otherwise "copied".
+
+    Raises:
+        FileNotFoundError: If the file is missing from the mirror.
+        ValueError: If the copied file does not match the expected checksum.
+    """
+    mirror_path = os.path.join(mirror_dir, os.path.basename(source["path"]))
+    if not os.path.exists(mirror_path):
+        raise FileNotFoundError(f"File not found in mirror: {mirror_path}")
+    expected = _expected_sha256(source, mirror_path)
+
+    if os.path.exists(source["path"]):
+        if expected is None or file_sha256(source["path"]) == expected:
+            return "skipped"
+
+    os.makedirs(os.path.dirname(source["path"]) or ".", exist_ok=True)
+    part_path = f"{source['path']}.part"
+    copied = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    if copied > os.path.getsize(mirror_path):
+        copied = 0
+    with open(mirror_path, "rb") as src, open(part_path, "ab" if copied else "wb") as dst:
+        src.seek(copied)
+        for block in iter(lambda: src.read(block_size), b""):
+            dst.write(block)
+
+    if expected is not None and file_sha256(part_path) != expected:
+        os.remove(part_path)
+        raise ValueError(f"Checksum mismatch for {mirror_path}; the partial copy was removed.")
+    os.replace(part_path, source["path"])
+    return "copied"
+
+
+def sync_from_mirror(sources, mirror_dir, max_workers=None):
+    """
+    Copy every source file from a local mirror in parallel (see `copy_from_mirror`).
+
+    Returns:
+        dict: Mapping of site name to "copied" or "skipped".
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        statuses = executor.map(lambda source: copy_from_mirror(source, mirror_dir), sources)
+        return {source["site"]: status for source, status in zip(sources, statuses)}
+
+
+def _load_source(path, col_names, site, site_column):
+    df = combine_load_data([path], col_names)
+    if site_column is not None:
+        df[site_column] = site
+    return df
+
+
+def load_sources(sources, col_names, max_workers=None, site_column=None, use_processes=False):
+    """
+    Load many site files in parallel and combine them into a single DataFrame.
+
+    Each file is read through `combine_load_data` on a thread (or process) pool; the
+    results are concatenated in source order, so the output does not depend on which
+    file finishes loading first.
+
+    Parameters:
+        sources (list of dict): Source entries from `resolve_sources`.
+        col_names (list of str): Column names to apply to the loaded data.
+        max_workers (int, optional): Size of the pool. Defaults to the executor's default.
+        site_column (str, optional): Name of a column added to tag each row with its
+                                     source site. Defaults to None (no tagging).
+        use_processes (bool, optional): Use a process pool instead of threads.
+                                        Defaults to False.
+
+    Returns:
+        pandas.DataFrame: The combined data with a fresh index.
+
+    Raises:
+        FileNotFoundError: If any of the source files cannot be found.
+    """
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_class(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_load_source, source["path"], col_names, source["site"], site_column)
+            for source in sources
+        ]
+        dataframes = [future.result() for future in futures]
+    return pd.concat(dataframes, ignore_index=True)
@@ -0,0 +1,287 @@
+import os
+import sys
+import json
+import time
+import cProfile
+import threading
+import contextlib
+from collections import Counter
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Instrumentation is configured through environment variables, so that the stages run by
+# `make` (one process per script) and by `run_pipeline` (one thread per stage) follow the
+# same settings. See `configure_instrumentation`.
+TRACE_LOG_ENV = "HEART_TRACE_LOG"
+PROFILER_ENV = "HEART_PROFILER"
+PROFILE_STAGES_ENV = "HEART_PROFILE_STAGES"
+PROFILE_DIR_ENV = "HEART_PROFILE_DIR"
+DEFAULT_PROFILE_DIR = "results/profiles"
+PROFILERS = ["cprofile", "sampling"]
+
+_log_lock = threading.Lock()
+
+def configure_instrumentation(log_file=None, profiler=None, profile_stages=None, profile_dir=DEFAULT_PROFILE_DIR):
+    """
+    Set where stage timings are logged and which stages are profiled.
+
+    The settings are stored in environment variables, so they also apply to the scripts
+    started from this process.
+
+    Parameters:
+        log_file (str, optional): JSON-lines file the stage records are appended to.
+                                  Defaults to None, which logs nothing.
+        profiler (str, optional): 'cprofile' to record every function call, 'sampling' to
+                                  sample the call stack every few milliseconds (much lower
+                                  overhead on long stages). Defaults to None (no profiling).
+        profile_stages (list of str, optional): Names of the stages to profile; a name also
+                                  matches the stages starting with it followed by a dot
+                                  ('model' matches 'model.tune'). Defaults to all stages.
+        profile_dir (str, optional): Folder for the profiles. Defaults to "results/profiles".
+
+    Raises:
+        ValueError: If `profiler` is not one of `PROFILERS`.
+
+    Examples:
+        >>> configure_instrumentation('results/trace.jsonl', profiler='sampling', profile_stages=['preprocess'])
+    """
+    if profiler is not None and profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler: {profiler}. Expected one of {PROFILERS}.")
+    settings = {TRACE_LOG_ENV: log_file, PROFILER_ENV: profiler,
+                PROFILE_STAGES_ENV: ",".join(profile_stages) if profile_stages else None,
+                PROFILE_DIR_ENV: profile_dir}
+    for name, value in settings.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+
+def _profiler_for(stage):
+    profiler = os.environ.get(PROFILER_ENV)
+    stages = os.environ.get(PROFILE_STAGES_ENV)
+    if profiler is None or stages is None:
+        return profiler
+    selected = any(stage == name or stage.startswith(name + ".") for name in stages.split(","))
+    return profiler if selected else None
+
+
+def _peak_rss_mb():
+    """Highest resident set size of this process so far (None where unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+class SamplingProfiler:
+    """
+    Sample the call stack of one thread at a fixed interval.
+
+    Unlike cProfile, nothing is traced while the code runs: a background thread reads the
+    current frame of the sampled thread, so the overhead does not grow with the number
+    of function calls. The stacks are written in the "folded" format read by
+    flame graph tools (one `outer;inner;leaf count` line per distinct stack).
+
+    Parameters:
+        interval (float, optional): Seconds between samples. Defaults to 0.005.
+        thread_id (int, optional): Thread to sample. Defaults to the thread calling `start`.
+    """
+    def __init__(self, interval=0.005, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def write(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _json_default(value):
+    # NumPy scalars (e.g. row counts from len of an array) and anything else as a string
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+def write_trace_records(records, log_file=None):
+    """
+    Append records to the JSON-lines trace log.
+
+    Parameters:
+        records (list of dict): The records, one JSON object per line.
+        log_file (str, optional): Log file. Defaults to the configured log (see
+                                  `configure_instrumentation`); nothing is written if
+                                  neither is set.
+    """
+    log_file = log_file or os.environ.get(TRACE_LOG_ENV)
+    if log_file is None or not records:
+        return
+    lines = "".join(json.dumps(record, default=_json_default) + "\n" for record in records)
+    with _log_lock:
+        os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+        with open(log_file, "a") as f:
+            f.write(lines)
+
+
+@contextlib.contextmanager
+def stage_timer(stage, rows=None, log_file=None, profiler=None, **fields):
+    """
+    Measure a pipeline stage and log it as one JSON line.
+
+    Usable as a context manager, which yields the record so that the stage can fill in
+    the rows it processed once they are known, or as a decorator. The record holds the
+    wall time, the status ('ok' or 'failed', with the error type), the given fields and:
+
+    - `cpu_time`: CPU time of the thread running the stage, so stages run concurrently
+      by `run_pipeline` do not count each other's work. Work the stage hands to other
+      threads (e.g. BLAS or joblib threads) is not included.
+    - `process_cpu_time`: CPU time of the whole process over the stage, all threads
+      included.
+    - `peak_rss_mb`: peak resident set size of the whole process. It is a high-water
+      mark, so it only grows, and it covers every stage running at the same time;
+      `peak_rss_growth_mb` is how much it rose while this stage ran.
+
+    Failed stages are logged too and the error is raised.
+
+    Parameters:
+        stage (str): Name of the stage, e.g. 'clean' or 'model.tune'.
+        rows (int, optional): Number of rows processed. Defaults to None.
+        log_file (str, optional): JSON-lines file to append the record to. Defaults to
+                                  the configured log (see `configure_instrumentation`).
+        profiler (str, optional): 'cprofile' or 'sampling' to profile this stage, written to
+                                  `<profile dir>/<stage>.prof` (read with `pstats`) or
+                                  `<stage>.folded`. Defaults to the configured profiler if the
+                                  stage is selected for profiling.
+        **fields: Further values to log with the record.
+
+    Yields:
+        dict: The record, logged when the stage ends.
+
+    Examples:
+        >>> with stage_timer('clean') as record:
+        ...     df = clean_frame(df)
+        ...     record['rows'] = len(df)
+
+        >>> @stage_timer('validate')
+        ... def validate(df):
+        ...     ...
+    """
+    record = {"stage": stage, "rows": rows, **fields}
+    profiler = profiler or _profiler_for(stage)
+    if profiler is not None and profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler: {profiler}. Expected one of {PROFILERS}.")
+    profile = cProfile.Profile() if profiler == "cprofile" else SamplingProfiler() if profiler else None
+
+    rss_start = _peak_rss_mb()
+    start, cpu_start, process_cpu_start = time.perf_counter(), time.thread_time(), time.process_time()
+    if profiler == "cprofile":
+        profile.enable()
+    elif profile is not None:
+        profile.start()
+    try:
+        yield record
+        record["status"] = "ok"
+    except BaseException as exc:
+        record["status"] = "failed"
+        record["error"] = type(exc).__name__
+        raise
+    finally:
+        if profiler == "cprofile":
+            profile.disable()
+        elif profile is not None:
+            profile.stop()
+        record["wall_time"] = time.perf_counter() - start
+        record["cpu_time"] = time.thread_time() - cpu_start
+        record["process_cpu_time"] = time.process_time() - process_cpu_start
+        rss_end = _peak_rss_mb()
+        record["peak_rss_mb"] = rss_end
+        record["peak_rss_growth_mb"] = None if rss_end is None else rss_end - rss_start
+        record["pid"] = os.getpid()
+        record["timestamp"] = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        if profile is not None:
+            profile_dir = os.environ.get(PROFILE_DIR_ENV, DEFAULT_PROFILE_DIR)
+            os.makedirs(profile_dir, exist_ok=True)
+            if profiler == "cprofile":
+                path = os.path.join(profile_dir, f"{stage}.prof")
+                profile.dump_stats(path)
+            else:
+                path = os.path.join(profile_dir, f"{stage}.folded")
+                profile.write(path)
+            record["profile"] = path
+        write_trace_records([record], log_file)
+
+
+def cv_split_records(model_name, cv_results, rows=None):
+    """
+    One record per candidate and CV split with its fit and score times.
+
+    Parameters:
+        model_name (str): Name of the model.
+        cv_results (dict): A `cv_results_`-style dictionary (from `RandomizedSearchCV` or
+                           `tune_models`) with `splitK_fit_time`, `splitK_score_time` and
+                           `splitK_test_score` entries.
+        rows (int, optional): Number of training rows. Defaults to None.
+
+    Returns:
+        list of dict: Records with `stage` ('model.cv'), `model`, `candidate`, `split`,
+                      `fit_time`, `score_time`, `test_score` and `params`. Splits a
+                      candidate did not reach (successive halving) are left out.
+    """
+    records = []
+    n_splits = sum(key.startswith("split") and key.endswith("_fit_time") for key in cv_results)
+    for k in range(n_splits):
+        fit_times = np.asarray(cv_results[f"split{k}_fit_time"])
+        score_times = np.asarray(cv_results[f"split{k}_score_time"])
+        scores = np.asarray(cv_results[f"split{k}_test_score"])
+        for i in range(len(scores)):
+            if np.isnan(scores[i]) and fit_times[i] == 0:
+                continue
+            records.append({"stage": "model.cv", "model": model_name, "candidate": i, "split": k, "rows": rows,
+                            "fit_time": float(fit_times[i]), "score_time": float(score_times[i]),
+                            "test_score": None if np.isnan(scores[i]) else float(scores[i]),
+                            "params": cv_results["params"][i]})
+    return records
+
+
+def read_trace_log(log_file):
+    """
+    Read a JSON-lines trace log.
+
+    Parameters:
+        log_file (str): Path to the log.
+
+    Returns:
+        pandas.DataFrame: One row per record, with the union of the record fields as columns.
+    """
+    return pd.read_json(log_file, lines=True)
@@ -0,0 +1,118 @@
+import os
+import struct
+import zipfile
+import numpy as np
+from scipy import sparse
+
+MATRIX_FORMATS = {".npy": "dense", ".npz": "sparse"}
+
+def matrix_format(path):
+    """
+    Infer whether a matrix file holds a dense (.npy) or sparse (.npz) matrix.
+
+    Raises:
+        ValueError: If the extension is neither .npy nor .npz.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in MATRIX_FORMATS:
+        raise ValueError(f"Unsupported matrix format '{ext}', expected one of {list(MATRIX_FORMATS)}.")
+    return MATRIX_FORMATS[ext]
+
+
+def matrix_nbytes(X):
+    """Memory used by the values of a dense array or a sparse matrix (with its index arrays)."""
+    if sparse.issparse(X):
+        X = X.tocsr()
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return np.asarray(X).nbytes
+
+
+def save_matrix(X, path):
+    """
+    Save a transformed feature matrix in a binary format that can be memory-mapped.
+
+    Dense arrays are written as .npy files and sparse matrices as uncompressed CSR
+    .npz files, keeping their dtype (e.g. float32).
+
+    Parameters:
+        X (numpy.ndarray or scipy.sparse matrix): The matrix to save.
+        path (str): Output path ending in .npy (dense) or .npz (sparse).
+
+    Raises:
+        ValueError: If the extension does not match the kind of matrix.
+    """
+    fmt = matrix_format(path)
+    if fmt == "sparse":
+        if not sparse.issparse(X):
+            raise ValueError(f"Cannot save a dense array to {path}; use a .npy path.")
+        sparse.save_npz(path, sparse.csr_matrix(X), compressed=False)
+    else:
+        if sparse.issparse(X):
+            raise ValueError(f"Cannot save a sparse matrix to {path}; use a .npz path.")
+        np.save(path, np.asarray(X))
+
+
+def _npz_member(path, name, mmap_mode):
+    """Memory-map one array stored uncompressed in a .npz archive."""
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo(f"{name}.npy")
+    if info.compress_type != zipfile.ZIP_STORED:
+        with np.load(path) as arrays:
+            return arrays[name]
+    with open(path, "rb") as f:
+        # skip the zip local file header to reach the .npy header of the member
+        f.seek(info.header_offset)
+        header = struct.unpack("<4s5H3L2H", f.read(30))
+        f.seek(info.header_offset + 30 + header[-2] + header[-1])
+        version = np.lib.format.read_magic(f)
+        read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                       else np.lib.format.read_array_header_2_0)
+        shape, fortran_order, dtype = read_header(f)
+        offset = f.tell()
+    if dtype.hasobject or not shape or 0 in shape:
+        with np.load(path) as arrays:
+            return arrays[name]
+    return np.memmap(path, dtype=dtype, mode=mmap_mode, offset=offset, shape=shape,
+                     order="F" if fortran_order else "C")
+
+
+def load_matrix(path, mmap_mode="r"):
+    """
+    Load a matrix written by `save_matrix`, memory-mapped by default.
+
+    Dense .npy files are opened with `np.load(..., mmap_mode=...)`. For sparse .npz files
+    the CSR `data`, `indices` and `indptr` arrays are memory-mapped from the archive
+    (which `save_matrix` writes uncompressed), so only the pages actually used are read.
+
+    Parameters:
+        path (str): Path to a .npy or .npz file.
+        mmap_mode (str, optional): Memory-map mode, or None to read the matrix into
+                                   memory. Defaults to 'r' (read-only).
+
+    Returns:
+        numpy.ndarray or scipy.sparse.csr_matrix: The matrix.
+
+    Raises:
+        FileNotFoundError: If `path` does not exist.
+        ValueError: If the extension is not supported.
+
+    Examples:
+        >>> X_train = load_matrix('data/processed_X_train.npz')
+        >>> X_train.dtype
+        dtype('float32')
+    """
+    fmt = matrix_format(path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+    if fmt == "dense":
+        return np.load(path, mmap_mode=mmap_mode)
+    if mmap_mode is None:
+        return sparse.load_npz(path).tocsr()
+    with np.load(path) as arrays:
+        shape = tuple(arrays["shape"])
+        stored_format = arrays["format"].item()
+    stored_format = stored_format.decode() if isinstance(stored_format, bytes) else stored_format
+    if stored_format != "csr":
+        return sparse.load_npz(path).tocsr()
+    data, indices, indptr = (_npz_member(path, name, mmap_mode) for name in ("data", "indices", "indptr"))
+    return sparse.csr_matrix((data, indices, indptr), shape=shape, copy=False)
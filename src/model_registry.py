@@ -0,0 +1,138 @@
+import os
+import re
+import json
+from datetime import datetime, timezone
+import joblib
+import numpy as np
+
+MANIFEST_FILE = "manifest.json"
+
+def _to_json(value):
+    """Fallback serializer for numpy scalars and other objects found in metadata."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def _model_file(model_name):
+    return f"{model_name.replace(' ', '_')}.joblib"
+
+
+def list_versions(registry_dir):
+    """
+    List the model versions stored in a registry directory, oldest first.
+
+    Parameters:
+        registry_dir (str): Path to the model registry directory.
+
+    Returns:
+        list of str: Version directory names such as ['v1', 'v2'].
+    """
+    if not os.path.isdir(registry_dir):
+        return []
+    versions = [d for d in os.listdir(registry_dir)
+                if re.fullmatch(r"v\d+", d) and os.path.isdir(os.path.join(registry_dir, d))]
+    return sorted(versions, key=lambda d: int(d[1:]))
+
+
+def save_models(models, registry_dir, metadata=None):
+    """
+    Save fitted models as a new version of a model registry.
+
+    Each model is written with `joblib` without compression, so that its numpy arrays
+    (support vectors, neighbour sets, coefficients, ...) can be memory-mapped when the
+    model is loaded again. A `manifest.json` records the model files, the creation time
+    and any extra metadata such as the seed or the best hyperparameters.
+
+    Parameters:
+        models (dict): Mapping of model name to a fitted estimator or pipeline.
+        registry_dir (str): Path to the model registry directory. Created if missing.
+        metadata (dict, optional): Extra JSON-serializable information to store in the
+                                   manifest. Defaults to None.
+
+    Returns:
+        str: Path to the newly created version directory.
+
+    Examples:
+        >>> version_dir = save_models(best_models, 'models', metadata={'seed': 123})
+        >>> print(version_dir)
+        models/v3
+    """
+    versions = list_versions(registry_dir)
+    version = f"v{int(versions[-1][1:]) + 1 if versions else 1}"
+    version_dir = os.path.join(registry_dir, version)
+    os.makedirs(version_dir)
+
+    for model_name, model in models.items():
+        joblib.dump(model, os.path.join(version_dir, _model_file(model_name)))
+
+    manifest = {
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "models": {model_name: _model_file(model_name) for model_name in models},
+        "metadata": metadata or {},
+    }
+    with open(os.path.join(version_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2, default=_to_json)
+
+    return version_dir
+
+
+def load_manifest(registry_dir, version=None):
+    """
+    Read the manifest of a registry version.
+
+    Parameters:
+        registry_dir (str): Path to the model registry directory.
+        version (str, optional): Version to read, e.g. 'v2'. Defaults to the latest.
+
+    Returns:
+        dict: The manifest, with keys `version`, `created_at`, `models` and `metadata`.
+
+    Raises:
+        FileNotFoundError: If the registry or the requested version does not exist.
+    """
+    if version is None:
+        versions = list_versions(registry_dir)
+        if not versions:
+            raise FileNotFoundError(f"No model versions found in registry: {registry_dir}")
+        version = versions[-1]
+    manifest_path = os.path.join(registry_dir, version, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        raise FileNotFoundError(f"Model version not found: {os.path.join(registry_dir, version)}")
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def load_model(registry_dir, model_name, version=None, mmap_mode="r"):
+    """
+    Load one model from the registry.
+
+    Parameters:
+        registry_dir (str): Path to the model registry directory.
+        model_name (str): Name the model was saved under, e.g. 'Logistic Regression'.
+        version (str, optional): Version to load from. Defaults to the latest.
+        mmap_mode (str, optional): Memory-map mode passed to `joblib.load`; use None to
+                                   read the arrays fully into memory. Defaults to 'r'.
+
+    Returns:
+        object: The fitted estimator or pipeline.
+
+    Raises:
+        FileNotFoundError: If the version does not exist.
+        KeyError: If the version does not contain `model_name`.
+
+    Examples:
+        >>> model = load_model('models', 'Support Vector Machine')
+        >>> model.predict(X_new)
+    """
+    manifest = load_manifest(registry_dir, version)
+    if model_name not in manifest["models"]:
+        raise KeyError(
+            f"Model '{model_name}' not found in version {manifest['version']}. "
+            f"Available models: {list(manifest['models'])}"
+        )
+    model_path = os.path.join(registry_dir, manifest["version"], manifest["models"][model_name])
+    return joblib.load(model_path, mmap_mode=mmap_mode)
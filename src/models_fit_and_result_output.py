@@ -1,29 +1,31 @@
-import click
 import os
 import numpy as np
-import pandas as pd
 from scipy import stats
 from sklearn.pipeline import make_pipeline
-from sklearn.model_selection import RandomizedSearchCV, GridSearchCV
-from sklearn.metrics import confusion_matrix, classification_report
-#from sklearn.metrics import precision_score, recall_score, f1_score
-from sklearn.metrics import make_scorer, roc_auc_score
-from sklearn.compose import ColumnTransformer
 from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.svm import SVC
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.neighbors import KNeighborsClassifier
-import pickle
+from src.tune_models import tune_models
+from src.transform_cache import TransformCache
+from src.model_registry import save_models
+from src.instrumentation import stage_timer, cv_split_records, write_trace_records
+from src.evaluate_models import predict_probas, evaluate_models, metrics_table, write_evaluation
+from src.bootstrap_metrics import bootstrap_metrics
 
-def models_fit_and_result_output(preprocessor,X_train,y_train,X_test,y_test,output_file_dir,seed=999):
+def models_fit_and_result_output(preprocessor,X_train,y_train,X_test,y_test,output_file_dir,seed=999,n_jobs=None,
+                                 search="random",n_iter=10,transform_cache=None,registry_dir=None,model_names=None,
+                                 n_bootstrap=10000,trial_store=None):
     """
     Train and evaluate multiple machine learning models with hyperparameter tuning.
 
     This function trains multiple models using a pipeline that includes a specified preprocessor
-    and performs hyperparameter tuning using `RandomizedSearchCV`. The best model for each 
-    algorithm is evaluated on the test set, and classification reports are generated and 
-    saved to the specified output file.
+    and performs hyperparameter tuning using a randomized search, optionally with successive
+    halving over CV folds. The candidate fits of all models are scheduled over one shared
+    worker pool (see `src.tune_models.tune_models`); the random search gives the same best
+    estimators as running `RandomizedSearchCV` for each model in turn. The best model for
+    each algorithm is evaluated on the test set, and classification reports are generated
+    and saved to the specified output folder.
 
     Parameters:
         preprocessor (sklearn.pipeline.Pipeline): A preprocessing pipeline to be applied 
@@ -32,7 +34,31 @@ def models_fit_and_result_output(preprocessor,X_train,y_train,X_test,y_test,outp
         y_train (pandas.Series or numpy.ndarray): Target labels for training.
         X_test (pandas.DataFrame or numpy.ndarray): Feature data for testing.
         y_test (pandas.Series or numpy.ndarray): Target labels for testing.
-        output_file_path (str): File path to save the classification reports for all models.
+        output_file_dir (str): Folder to save the classification reports and metrics of all models.
+        seed (int, optional): Random seed for candidate sampling. Defaults to 999.
+        n_jobs (int, optional): Number of worker processes shared by all models during tuning.
+                                `None` runs serially, -1 uses all cores. Defaults to None.
+        search (str, optional): Search strategy, "random" to evaluate every candidate on every
+                                fold or "halving" to drop weak candidates after partial
+                                evaluation by successive halving over folds. Defaults to "random".
+        n_iter (int, optional): Number of candidates sampled per model. Defaults to 10.
+        transform_cache (src.transform_cache.TransformCache, optional): Cache in which the
+                                preprocessor is fitted and applied once per CV fold and shared
+                                by every candidate of every model. Defaults to None, which uses
+                                a fresh in-memory cache.
+        registry_dir (str, optional): Model registry directory in which the best pipelines are
+                                saved as a new version (see `src.model_registry.save_models`).
+                                Defaults to None, which keeps them in memory only.
+        model_names (list of str, optional): Only tune and evaluate these models (see Models
+                                below). Defaults to None, which uses all of them.
+        n_bootstrap (int, optional): Number of bootstrap resamples of the test set for the
+                                confidence intervals of the metrics and of their differences
+                                between models (see `src.bootstrap_metrics`). 0 skips them.
+                                Defaults to 10000.
+        trial_store (src.trial_store.TrialStore, optional): Store of the (candidate, fold) fits
+                                of earlier searches: the pairs already evaluated on the same
+                                training data are reused instead of refitted, and the new ones
+                                are added. Defaults to None.
 
     Models:
         - Logistic Regression
@@ -42,18 +68,30 @@ def models_fit_and_result_output(preprocessor,X_train,y_train,X_test,y_test,outp
     
     Hyperparameter Search:
         - Hyperparameters for each model are defined in the `param_distributions` dictionary.
-        - RandomizedSearchCV is used to search over the hyperparameter space.
+        - A randomized search (equivalent to RandomizedSearchCV) is used to search over the
+          hyperparameter space, with all models sharing one pool of `n_jobs` workers.
+        - With `search="halving"`, candidates are scored on a subset of folds first and only
+          the best third are evaluated on the remaining folds.
 
     Output:
         - Prints the best hyperparameters for each model after hyperparameter tuning.
         - Prints and saves classification reports for each model's performance on the test set.
-        - Saves the classification reports to the specified output file.
+        - Saves the classification reports, and a JSON file and CSV table with every test-set metric
+          of every model (accuracy, precision/recall/F1, ROC AUC, log loss, Brier score and
+          calibration), to `output_file_dir` (see `src.evaluate_models.write_evaluation`).
+        - Prints and saves 95% bootstrap confidence intervals of the main metrics of each model
+          and of the differences between models to `model_metric_intervals.csv` and
+          `model_metric_differences.csv` in `output_file_dir`.
+        - Saves the best pipelines to a new version of the model registry if `registry_dir` is given.
+        - Logs the tuning and test-set prediction times, and the fit and score time of every
+          CV split, to the trace log if one is configured (see `src.instrumentation`).
 
     Returns:
-        None
+        dict: Mapping of model name to its best fitted pipeline.
     
     Raises:
-        FileNotFoundError: If the specified `output_file_path` is invalid.
+        FileNotFoundError: If the specified `output_file_dir` is invalid.
+        ValueError: If `model_names` contains an unknown model.
 
     Examples:
         >>> from sklearn.preprocessing import StandardScaler
@@ -74,17 +112,19 @@ def models_fit_and_result_output(preprocessor,X_train,y_train,X_test,y_test,outp
         >>> preprocessor = ColumnTransformer([('scaler', StandardScaler(), X.columns)], remainder='passthrough')
 
         # Run function
-        >>> models_fit_and_output(preprocessor, X_train, y_train, X_test, y_test, 'output_reports.txt')
+        >>> best_models = models_fit_and_result_output(preprocessor, X_train, y_train, X_test, y_test, 'results')
+        >>> best_models['Decision Tree'].predict(X_test)
 
     Notes:
-        - The function assumes that `RandomizedSearchCV` is suitable for the problem at hand.
+        - All candidates of all models are sampled up front and fitted on one shared worker pool;
+          with `search="halving"` the best models may differ from a full `RandomizedSearchCV`.
         - It uses `accuracy` as the scoring metric during hyperparameter tuning.
         - The random seed ensures reproducibility.
     """
     np.random.seed(seed)
     models = {
         'Logistic Regression': LogisticRegression(random_state = 123, max_iter=1000),
-        'Decision Tree': DecisionTreeClassifier(),
+        'Decision Tree': DecisionTreeClassifier(random_state = 123),
         'Support Vector Machine': SVC(random_state = 123, probability=True),
         'K-Nearest Neighbors': KNeighborsClassifier()
     }
@@ -106,43 +146,88 @@ def models_fit_and_result_output(preprocessor,X_train,y_train,X_test,y_test,outp
             'kneighborsclassifier__weights': ['uniform', 'distance']
         }
     }
-    #RandomizedSearchCV allows for searching over a large hyperparameter space by sampling random values,
-    #making it efficient compared to grid search.
+    if model_names is not None:
+        unknown = set(model_names) - set(models)
+        if unknown:
+            raise ValueError(f"Unknown models: {sorted(unknown)}. Expected names from {list(models)}.")
+        models = {name: models[name] for name in model_names}
+        param_distributions = {name: param_distributions[name] for name in model_names}
+    #Random sampling of candidates searches a large hyperparameter space efficiently compared to grid search,
+    #and one worker pool shared by all models (optionally with successive halving) keeps every core busy.
     
     #Classification reports and confusion matrices provide insight into model performance,
     #including how well the model distinguishes between classes.
     best_models = {}
 
-    best_models = {}
-    
-    for model_name, model in models.items():
-        print(f"Tuning hyperparameters for {model_name} using RandomizedSearchCV...")
-        
-        clf_pipe = make_pipeline(preprocessor, model)
-        
-        random_search = RandomizedSearchCV(
-            estimator=clf_pipe,
-            param_distributions=param_distributions[model_name],
-            scoring="accuracy",
-            n_iter=10, 
+    pipelines = {model_name: make_pipeline(preprocessor, model) for model_name, model in models.items()}
+    for model_name in pipelines:
+        print(f"Tuning hyperparameters for {model_name} using {search} search...")
+
+    if transform_cache is None:
+        transform_cache = TransformCache()
+    # all models are tuned together on one worker pool, so the time of each model comes from
+    # the fit and score times of its (candidate, split) fits, logged one record per split
+    with stage_timer("model.tune", rows=len(X_train), models=list(pipelines), n_iter=n_iter, search=search):
+        search_results = tune_models(
+            pipelines,
+            param_distributions,
+            X_train,
+            y_train,
+            n_iter=n_iter,
             cv=5,
-            random_state=seed
+            scoring="accuracy",
+            seed=seed,
+            n_jobs=n_jobs,
+            search=search,
+            transform_cache=transform_cache,
+            trial_store=trial_store
         )
-        
-        random_search.fit(X_train, y_train)
-        
-        best_models[model_name] = random_search.best_estimator_
-        
-        print(f"Best parameters for {model_name}: {random_search.best_params_}")
+    print(f"Transform cache: {transform_cache.hits} hits, {transform_cache.misses} misses")
+    if trial_store is not None:
+        print(f"Trial store: {trial_store.hits} fits reused, {trial_store.misses} fitted")
+    for model_name, result in search_results.items():
+        write_trace_records(cv_split_records(model_name, result["cv_results"], rows=len(X_train)))
+
+    for model_name, result in search_results.items():
+        best_models[model_name] = result["best_estimator"]
+
+        print(f"Best parameters for {model_name}: {result['best_params']}")
         print("-" * 40)
     
-    for model_name, model in best_models.items():
+    # every model predicts the test probabilities once; all metrics are computed from them
+    with stage_timer("model.evaluate", rows=len(X_test), models=list(best_models)):
+        probas = predict_probas(best_models, X_test, n_jobs=n_jobs)
+        evaluations = evaluate_models(best_models, X_test, y_test, probas=probas)
+    for model_name, evaluation in evaluations.items():
         print(f"Evaluating {model_name} on test set...")
-        y_pred = model.predict(X_test)
-        
-        report = classification_report(y_test, y_pred,zero_division=0)
         print("Classification Report:")
-        print(report)
-        output_file = os.path.join(output_file_dir, f"classification_report_{model_name.replace(' ', '_')}.txt")
-        with open(output_file, "w") as f:
-            f.write(report)
\ No newline at end of file
+        print(evaluation["classification_report"])
+    print(metrics_table(evaluations).round(3).to_string())
+    write_evaluation(evaluations, output_file_dir)
+
+    # the test set is small, so the intervals show which differences between models are real
+    if n_bootstrap:
+        with stage_timer("model.bootstrap", rows=len(X_test), n_resamples=n_bootstrap):
+            bootstrap = bootstrap_metrics(y_test, probas, n_resamples=n_bootstrap, seed=seed)
+        intervals = bootstrap["intervals"]
+        labels = [f"{row.estimate:.3f} [{row.ci_lower:.3f}, {row.ci_upper:.3f}]" for row in intervals.itertuples()]
+        print(f"Test metrics with 95% bootstrap confidence intervals ({n_bootstrap} resamples):")
+        print(intervals.assign(interval=labels).pivot(index="model", columns="metric", values="interval").to_string())
+        intervals.to_csv(os.path.join(output_file_dir, "model_metric_intervals.csv"), index=False)
+        bootstrap["differences"].to_csv(os.path.join(output_file_dir, "model_metric_differences.csv"), index=False)
+
+    if registry_dir is not None:
+        version_dir = save_models(
+            best_models,
+            registry_dir,
+            metadata={
+                "seed": seed,
+                "search": search,
+                "n_iter": n_iter,
+                "best_params": {name: result["best_params"] for name, result in search_results.items()},
+                "best_cv_score": {name: result["best_score"] for name, result in search_results.items()}
+            }
+        )
+        print(f"Best models saved to {version_dir}")
+
+    return best_models
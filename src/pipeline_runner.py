@@ -0,0 +1,249 @@
+import os
+import glob
+import json
+import time
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from src.artifact_cache import DEFAULT_MANIFEST_DIR, artifact_key, is_up_to_date, record_artifacts
+from src.columnar_io import with_format
+
+# the scripts do their work through the modules of this package, so their sources are part of
+# every stage's key by default: editing one of them reruns the stages instead of reporting them up to date
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_REPORTS = ["Logistic_Regression", "Decision_Tree", "Support_Vector_Machine", "K-Nearest_Neighbors"]
+
+class Stage:
+    """
+    One step of the pipeline: the click command of a script, run with fixed arguments.
+
+    Parameters:
+        name (str): Name of the stage.
+        script (str): Path of the script defining the command.
+        args (list of str): Command-line arguments passed to the command.
+        inputs (list of str): Files the stage reads. The stages writing them run first.
+        outputs (list of str): Files the stage writes.
+        command (str, optional): Name of the click command in the script. Defaults to 'main'.
+        sources (list of str, optional): Source files the results depend on besides the
+                                         script. Defaults to None, which uses every module
+                                         in `SOURCE_DIR` (the `src` package).
+    """
+    def __init__(self, name, script, args, inputs, outputs, command="main", sources=None):
+        self.name = name
+        self.script = script
+        self.args = list(args)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.command = command
+        self.sources = None if sources is None else list(sources)
+
+    def source_files(self):
+        """The script and the source files the stage's results depend on."""
+        sources = self.sources if self.sources is not None else sorted(glob.glob(os.path.join(SOURCE_DIR, "*.py")))
+        return [self.script, *sources]
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, {self.script!r})"
+
+
+def default_stages(fmt="csv"):
+    """
+    The stages of the heart disease pipeline, with the arguments the Makefile uses.
+
+    Parameters:
+        fmt (str, optional): Storage format of the intermediate data files: 'csv',
+                             'parquet' or 'feather'. Defaults to 'csv'.
+
+    Returns:
+        list of Stage: combine, validate, clean, split, eda, preprocess and model.
+    """
+    data = lambda name: with_format(os.path.join("data", name), fmt)
+    raw_files = [f"data/processed.{site}.data" for site in ["hungarian", "switzerland", "cleveland", "va"]]
+    combined, clean = data("combined_df.csv"), data("combined_df_clean.csv")
+    split = ["data/train_idx.npy", "data/test_idx.npy"]
+    preprocessed = [data(f"{name}.csv") for name in ["x_train", "x_test", "y_train", "y_test"]]
+    return [
+        Stage("combine", "scripts/download_data.py", ["--output", combined], raw_files, [combined]),
+        Stage("validate", "scripts/data_validation_script.py", ["--input", combined], [combined], []),
+        Stage("clean", "scripts/data_cleaning_script.py", ["--input", combined, "--output", clean],
+              [combined], [clean]),
+        Stage("split", "scripts/split_data.py", ["--input", clean, "--output-folder", "data"], [clean], split),
+        Stage("eda", "scripts/EDA_script.py", ["--format", fmt], [clean, split[0]],
+              ["results/numerical_chart.png", "results/categorical_chart.png"]),
+        Stage("preprocess", "scripts/preprocessor.py",
+              ["--data-folder", "data", "--output-folder", "data", "--format", fmt], [clean, *split],
+              ["data/preprocessor.pkl", data("processed_X_train.csv"), data("processed_X_test.csv"), *preprocessed],
+              command="preprocess"),
+        Stage("model", "scripts/models_and_results.py", ["--format", fmt, "--data-folder", "data"],
+              ["data/preprocessor.pkl", *preprocessed],
+              [f"results/classification_report_{name}.txt" for name in MODEL_REPORTS]
+              + ["results/model_evaluation.json", "results/model_evaluation.csv",
+                 "results/model_metric_intervals.csv", "results/model_metric_differences.csv"]),
+    ]
+
+
+def _dependencies(stages):
+    """
+    Map each stage name to the names of the stages writing its inputs.
+
+    Raises:
+        ValueError: If stage names or outputs are not unique, or the stages form a cycle.
+    """
+    names = [stage.name for stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Stage names are not unique: {names}")
+    producers = {}
+    for stage in stages:
+        for output in stage.outputs:
+            if output in producers:
+                raise ValueError(f"{output} is written by both {producers[output]} and {stage.name}.")
+            producers[output] = stage.name
+    dependencies = {stage.name: {producers[path] for path in stage.inputs if path in producers} - {stage.name}
+                    for stage in stages}
+
+    # Kahn's algorithm: stages left over once no stage is free of dependencies form a cycle
+    remaining = {name: set(deps) for name, deps in dependencies.items()}
+    while remaining:
+        free = [name for name, deps in remaining.items() if not deps]
+        if not free:
+            raise ValueError(f"The stages form a cycle: {sorted(remaining)}")
+        for name in free:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(free)
+    return dependencies
+
+
+def _with_ancestors(targets, dependencies):
+    selected, pending = set(), list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in dependencies:
+            raise ValueError(f"Unknown stage: {name}")
+        if name not in selected:
+            selected.add(name)
+            pending.extend(dependencies[name])
+    return selected
+
+
+_commands = {}
+_commands_lock = threading.Lock()
+
+def _load_command(stage):
+    """Import the script of a stage once per interpreter and return its click command."""
+    with _commands_lock:
+        if stage.script not in _commands:
+            module_name = "pipeline_" + os.path.splitext(os.path.basename(stage.script))[0]
+            spec = importlib.util.spec_from_file_location(module_name, stage.script)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _commands[stage.script] = module
+        return getattr(_commands[stage.script], stage.command)
+
+
+def _run_stage(stage, force, manifest_dir):
+    """Run one stage unless its outputs are up to date; returns 'ran' or 'skipped'."""
+    step = f"pipeline.{stage.name}"
+    key = artifact_key(stage.inputs + stage.source_files(), config={"args": stage.args})
+    if not force and is_up_to_date(step, key, stage.outputs, manifest_dir):
+        return "skipped"
+    command = _load_command(stage)
+    args = list(stage.args)
+    if force and any(param.name == "force" for param in command.params):
+        args.append("--force")
+    command.main(args=args, prog_name=stage.name, standalone_mode=False)
+    record_artifacts(step, key, stage.outputs, manifest_dir)
+    return "ran"
+
+
+def _print_timings(timings, wall_time):
+    width = max([len("Stage")] + [len(timing["stage"]) for timing in timings])
+    print(f"{'Stage':<{width}}  {'Status':<8}  {'Seconds':>8}")
+    for timing in timings:
+        seconds = "" if timing["seconds"] is None else f"{timing['seconds']:.2f}"
+        print(f"{timing['stage']:<{width}}  {timing['status']:<8}  {seconds:>8}")
+    total = sum(timing["seconds"] or 0 for timing in timings)
+    print(f"Wall time: {wall_time:.2f}s (sum of stage times: {total:.2f}s)")
+
+
+def run_pipeline(stages=None, targets=None, max_workers=None, force=False,
+                 manifest_dir=DEFAULT_MANIFEST_DIR, timings_file=None):
+    """
+    Run the pipeline stages in dependency order, in parallel, inside this interpreter.
+
+    The order follows from the declared files: a stage runs after the stages writing
+    its inputs. A stage is skipped when the content hash of its input files, script,
+    source modules (see `Stage`) and arguments matches its last run and its outputs are
+    unchanged (see `artifact_cache`),
+    so nothing is re-imported or recomputed for it. Stages whose dependencies are done
+    run concurrently on a thread pool, sharing the modules already imported. If a stage
+    fails, no further stages are started and the error is raised once the running
+    stages have finished.
+
+    Parameters:
+        stages (list of Stage, optional): The stages. Defaults to `default_stages()`.
+        targets (list of str, optional): Only run these stages and the stages they
+                                         depend on. Defaults to all stages.
+        max_workers (int, optional): Maximum number of stages running at the same time.
+                                     Defaults to the executor's default.
+        force (bool, optional): Run every selected stage even if it is up to date, and
+                                pass --force to the scripts accepting it. Defaults to False.
+        manifest_dir (str, optional): Directory holding the stage manifests.
+                                      Defaults to ".artifact_cache".
+        timings_file (str, optional): JSON file to write the timings to. Defaults to None.
+
+    Returns:
+        list of dict: For each stage in the order it finished, its `stage` name, its
+                      `status` ('ran', 'skipped', 'failed' or 'not run') and the
+                      `seconds` it took (None if it did not run).
+
+    Raises:
+        ValueError: If the stages are inconsistent (see `_dependencies`) or a target is unknown.
+
+    Prints:
+        A table with the status and time of each stage.
+
+    Examples:
+        >>> timings = run_pipeline(default_stages('feather'), targets=['eda'])
+    """
+    if stages is None:
+        stages = default_stages()
+    dependencies = _dependencies(stages)
+    selected = _with_ancestors(targets, dependencies) if targets else set(dependencies)
+    by_name = {stage.name: stage for stage in stages if stage.name in selected}
+    waiting = {name: set(dependencies[name]) for name in by_name}
+
+    timings, running, error = [], {}, None
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while waiting or running:
+            if error is None:
+                for name in [name for name, deps in waiting.items() if not deps]:
+                    del waiting[name]
+                    future = executor.submit(_run_stage, by_name[name], force, manifest_dir)
+                    running[future] = (name, time.perf_counter())
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, started = running.pop(future)
+                seconds = time.perf_counter() - started
+                try:
+                    status = future.result()
+                except Exception as exc:
+                    status, error = "failed", error or exc
+                timings.append({"stage": name, "status": status, "seconds": seconds})
+                if status != "failed":
+                    for deps in waiting.values():
+                        deps.discard(name)
+    timings.extend({"stage": name, "status": "not run", "seconds": None} for name in waiting)
+    wall_time = time.perf_counter() - start
+
+    _print_timings(timings, wall_time)
+    if timings_file is not None:
+        os.makedirs(os.path.dirname(timings_file) or ".", exist_ok=True)
+        with open(timings_file, "w") as f:
+            json.dump({"wall_time": wall_time, "stages": timings}, f, indent=2)
+    if error is not None:
+        raise error
+    return timings
@@ -0,0 +1,313 @@
+import asyncio
+import json
+import time
+from collections import deque
+import numpy as np
+import pandas as pd
+from src.batch_score import predict_batch
+
+class LatencyTracker:
+    """
+    Keep the latencies of the most recent requests and report percentiles and throughput.
+
+    Parameters:
+        window (int, optional): Number of most recent requests the percentiles are
+                                computed over. Defaults to 10000.
+    """
+
+    def __init__(self, window=10000):
+        self._latencies = deque(maxlen=window)
+        self._started = time.perf_counter()
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+
+    def record(self, latency, rows=1):
+        """Record the latency (in seconds) of one request scoring `rows` patients."""
+        self._latencies.append(latency)
+        self.requests += 1
+        self.rows += rows
+
+    def summary(self):
+        """
+        Summarize the recorded latencies.
+
+        Returns:
+            dict: `requests`, `rows` and `batches` counts, `p50_ms`, `p99_ms` and
+                  `mean_ms` latencies, and `requests_per_s` / `rows_per_s` throughput
+                  since the tracker was created.
+        """
+        elapsed = time.perf_counter() - self._started
+        latencies = np.asarray(self._latencies) * 1000
+        return {
+            "requests": self.requests,
+            "rows": self.rows,
+            "batches": self.batches,
+            "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else None,
+            "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else None,
+            "mean_ms": float(latencies.mean()) if len(latencies) else None,
+            "requests_per_s": self.requests / elapsed if elapsed > 0 else 0.0,
+            "rows_per_s": self.rows / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+class MicroBatcher:
+    """
+    Group prediction requests that arrive close together into one vectorized call.
+
+    The first pending request waits at most `max_delay` seconds for others to arrive;
+    all requests collected in that window (up to `max_batch_size` rows) are concatenated
+    and scored with a single `predict_proba` call through
+    `src.batch_score.predict_batch`, and each caller gets back its own rows. Scoring runs
+    in a worker thread, so the event loop keeps accepting requests meanwhile.
+
+    Each request is checked against the columns the model was fitted on before it is
+    queued, so every batch holds the same columns. If a batch still fails (e.g. one
+    request has a value the model cannot handle), its requests are scored one by one and
+    only the failing ones get the error.
+
+    Parameters:
+        model (sklearn estimator): A fitted classifier or pipeline, loaded once and kept
+                                   in memory for the lifetime of the batcher.
+        max_batch_size (int, optional): Maximum number of rows scored per call. Defaults to 256.
+        max_delay (float, optional): Maximum time in seconds a request waits for others to
+                                     batch with. Defaults to 0.002.
+
+    Examples:
+        >>> async def score():
+        ...     async with MicroBatcher(model) as batcher:
+        ...         return await batcher.predict(pd.DataFrame([patient]))
+        >>> asyncio.run(score())
+    """
+
+    def __init__(self, model, max_batch_size=256, max_delay=0.002):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.stats = LatencyTracker()
+        self.columns = getattr(model, "feature_names_in_", None)
+        self._queue = None
+        self._worker = None
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def predict(self, X):
+        """
+        Score one patient or a micro-batch of patients.
+
+        Parameters:
+            X (pandas.DataFrame): Feature data, one row per patient.
+
+        Returns:
+            pandas.DataFrame: The output of `predict_batch` for the rows of `X`.
+
+        Raises:
+            ValueError: If `X` lacks some of the columns the model was fitted on.
+        """
+        X = self._check_columns(X)
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((X, future))
+        predictions = await future
+        self.stats.record(time.perf_counter() - start, rows=len(X))
+        return predictions
+
+    def _check_columns(self, X):
+        """Select the model's columns of a request in the fitted order, or raise if some are missing."""
+        if self.columns is None:
+            return X
+        missing = [column for column in self.columns if column not in X.columns]
+        if missing:
+            raise ValueError(f"Missing columns: {missing}")
+        return X[list(self.columns)]
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        n_rows = len(batch[0][0])
+        deadline = asyncio.get_running_loop().time() + self.max_delay
+        while n_rows < self.max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            n_rows += len(item[0])
+        return batch
+
+    def _score(self, frames):
+        """Score the requests of one batch together, or one by one if that fails."""
+        if all(X.columns.equals(frames[0].columns) for X in frames):
+            try:
+                predictions = predict_batch(self.model, pd.concat(frames, ignore_index=True))
+                bounds = np.cumsum([0] + [len(X) for X in frames])
+                return [predictions.iloc[start:end].reset_index(drop=True)
+                        for start, end in zip(bounds[:-1], bounds[1:])]
+            except Exception:
+                pass
+        # a request that cannot be scored only fails itself, not the others of its batch
+        outputs = []
+        for X in frames:
+            try:
+                outputs.append(predict_batch(self.model, X).reset_index(drop=True))
+            except Exception as e:
+                outputs.append(e)
+        return outputs
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            outputs = await loop.run_in_executor(None, self._score, [X for X, _ in batch])
+            self.stats.batches += 1
+
+            for (_, future), output in zip(batch, outputs):
+                if future.done():
+                    continue
+                if isinstance(output, Exception):
+                    future.set_exception(output)
+                else:
+                    future.set_result(output)
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _response(status, body):
+    payload = json.dumps(body, default=_json_default).encode()
+    reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}[status]
+    head = (
+        f"HTTP/1.1 {status} {reason}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n\r\n"
+    )
+    return head.encode() + payload
+
+
+async def handle_request(batcher, method, path, body):
+    """
+    Route one HTTP request to the prediction service.
+
+    Routes:
+        - `POST /predict`: JSON object (one patient) or list of objects (micro-batch);
+          returns `{"predictions": [...]}` with the predicted label and class probabilities.
+        - `GET /stats`: latency percentiles and throughput (see `LatencyTracker.summary`).
+        - `GET /health`: `{"status": "ok"}`.
+
+    Returns:
+        bytes: The full HTTP response.
+    """
+    if method == "GET" and path == "/health":
+        return _response(200, {"status": "ok"})
+    if method == "GET" and path == "/stats":
+        return _response(200, batcher.stats.summary())
+    if method != "POST" or path != "/predict":
+        return _response(404, {"error": f"No route for {method} {path}"})
+
+    try:
+        records = json.loads(body or b"null")
+        if isinstance(records, dict):
+            records = [records]
+        if not isinstance(records, list) or not records or not all(isinstance(record, dict) for record in records):
+            raise ValueError("Expected a JSON object or a non-empty list of objects.")
+        X = pd.DataFrame.from_records(records)
+    except ValueError as e:
+        return _response(400, {"error": str(e)})
+
+    try:
+        predictions = await batcher.predict(X)
+    except ValueError as e:
+        # missing columns or values the model cannot score
+        return _response(400, {"error": str(e)})
+    except Exception as e:
+        return _response(500, {"error": repr(e)})
+    return _response(200, {"predictions": predictions.to_dict(orient="records")})
+
+
+async def _handle_connection(batcher, reader, writer):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            method, path, _ = request_line.decode().split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode().partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+            writer.write(await handle_request(batcher, method, path, body))
+            await writer.drain()
+            if headers.get("connection", "").lower() == "close":
+                break
+    except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(batcher, host="127.0.0.1", port=8000):
+    """
+    Start the HTTP server for an already started `MicroBatcher`.
+
+    Returns:
+        asyncio.Server: The listening server (use port 0 to pick a free port).
+    """
+    return await asyncio.start_server(
+        lambda reader, writer: _handle_connection(batcher, reader, writer), host, port
+    )
+
+
+def serve(model, host="127.0.0.1", port=8000, max_batch_size=256, max_delay=0.002):
+    """
+    Serve a fitted model over HTTP until interrupted.
+
+    Parameters:
+        model (sklearn estimator): A fitted classifier or pipeline, e.g. from
+                                   `src.model_registry.load_model`.
+        host (str, optional): Interface to listen on. Defaults to "127.0.0.1".
+        port (int, optional): Port to listen on. Defaults to 8000.
+        max_batch_size (int, optional): Maximum number of rows scored per call. Defaults to 256.
+        max_delay (float, optional): Maximum time in seconds a request waits for others to
+                                     batch with. Defaults to 0.002.
+
+    Examples:
+        >>> serve(load_model('models', 'Logistic Regression'), port=8000)
+        $ curl -X POST localhost:8000/predict -d '{"age": 63, "sex": 1, "cp": 1, ...}'
+    """
+    async def main():
+        async with MicroBatcher(model, max_batch_size, max_delay) as batcher:
+            server = await start_server(batcher, host, port)
+            print(f"Serving predictions on http://{host}:{port}/predict")
+            async with server:
+                await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
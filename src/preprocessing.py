@@ -0,0 +1,305 @@
+import numpy as np
+import pandas as pd
+from sklearn.compose import make_column_transformer
+from sklearn.pipeline import Pipeline, make_pipeline
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, FunctionTransformer
+from sklearn.impute import SimpleImputer
+from src.combine_load_data import write_chunks
+
+NUMERIC_FEATURES = ['age', 'trestbps', 'chol', 'thalach', 'oldpeak']
+CATEGORICAL_FEATURES = ['cp', 'restecg']
+BINARY_FEATURES = ['sex', 'exang', 'fbs']
+DROP_FEATURES = ['thal', 'ca', 'slope']
+
+def _as_float32(X):
+    """Cast a dense array or sparse matrix to float32 (module-level so it can be pickled)."""
+    return X.astype(np.float32)
+
+
+def build_preprocessor(dtype="float64", sparse=False):
+    """
+    Build the (unfitted) column transformer applied to the heart disease features.
+
+    Numeric features are median-imputed and standardized, categorical features are
+    imputed with their most frequent value and one-hot encoded, binary features are
+    imputed with their most frequent value, and thal, ca and slope are dropped.
+
+    Parameters:
+        dtype (str, optional): "float64", or "float32" to halve the size of the
+                               transformed matrix; every block is cast so that the
+                               models are fitted on float32 data. Defaults to "float64".
+        sparse (bool, optional): Output a sparse CSR matrix, with the one-hot blocks
+                                 encoded sparsely, instead of a dense array.
+                                 Defaults to False.
+
+    Returns:
+        sklearn.compose.ColumnTransformer: The unfitted preprocessor.
+
+    Raises:
+        ValueError: If `dtype` is not "float64" or "float32".
+    """
+    if dtype not in ("float64", "float32"):
+        raise ValueError(f"Unsupported dtype '{dtype}', expected 'float64' or 'float32'.")
+    cast = [FunctionTransformer(_as_float32, accept_sparse=True, feature_names_out="one-to-one")] \
+        if dtype == "float32" else []
+
+    numeric_transformer_pipe = make_pipeline(
+        SimpleImputer(strategy='median'),
+        StandardScaler(),
+        *cast
+    )
+    categorical_transformer_pipe = make_pipeline(
+        SimpleImputer(strategy='most_frequent'),
+        OneHotEncoder(drop='if_binary', sparse_output=sparse, dtype=np.dtype(dtype).type)
+    )
+    binary_transformer = make_pipeline(SimpleImputer(strategy='most_frequent'), *cast) \
+        if cast else SimpleImputer(strategy='most_frequent')
+
+    return make_column_transformer(
+        (numeric_transformer_pipe, NUMERIC_FEATURES),
+        (categorical_transformer_pipe, CATEGORICAL_FEATURES),
+        (binary_transformer, BINARY_FEATURES),
+        ("drop", DROP_FEATURES),
+        sparse_threshold=1.0 if sparse else 0.3
+    )
+
+
+def feature_names(preprocessor):
+    """
+    Column names of the transformed data: the numeric features, the one-hot columns
+    (e.g. 'cp_1.0') and the binary features.
+    """
+    return (
+        NUMERIC_FEATURES +
+        preprocessor.named_transformers_['pipeline-2'].get_feature_names_out().tolist() +
+        BINARY_FEATURES
+    )
+
+
+class QuantileSketch:
+    """
+    Mergeable histogram sketch of a numeric column for approximate quantiles.
+
+    The sketch keeps weighted centroids. While a column has at most `max_bins` distinct
+    values they are its exact values and counts, so `quantile(0.5)` equals `np.median`;
+    beyond that, neighbouring centroids are merged into `max_bins` groups of roughly
+    equal weight after each update, which bounds the memory whatever the data size.
+
+    Parameters:
+        max_bins (int, optional): Maximum number of centroids kept. Defaults to 2048.
+    """
+
+    def __init__(self, max_bins=2048):
+        self.max_bins = max_bins
+        self.centroids = np.empty(0)
+        self.counts = np.empty(0)
+
+    def update(self, values):
+        """Add the non-missing values of an array to the sketch."""
+        values = np.asarray(values, dtype="float64")
+        values, counts = np.unique(values[~np.isnan(values)], return_counts=True)
+        self._merge(values, counts.astype("float64"))
+        return self
+
+    def _merge(self, centroids, counts):
+        centroids = np.concatenate([self.centroids, centroids])
+        counts = np.concatenate([self.counts, counts])
+        centroids, inverse = np.unique(centroids, return_inverse=True)
+        counts = np.bincount(inverse, weights=counts)
+        if len(centroids) > self.max_bins:
+            midpoints = np.cumsum(counts) - counts / 2
+            groups = np.minimum((midpoints / counts.sum() * self.max_bins).astype(int), self.max_bins - 1)
+            merged = np.bincount(groups, weights=counts)
+            kept = merged > 0
+            centroids = (np.bincount(groups, weights=counts * centroids)[kept] / merged[kept])
+            counts = merged[kept]
+        self.centroids, self.counts = centroids, counts
+
+    def quantile(self, q):
+        """
+        Estimate the `q`-quantile, interpolating between order statistics like `np.quantile`.
+
+        Returns:
+            float: The estimate, or NaN if the sketch is empty.
+        """
+        n = self.counts.sum()
+        if n == 0:
+            return np.nan
+        position = q * (n - 1)
+        cumulative = np.cumsum(self.counts)
+        lower = self.centroids[np.searchsorted(cumulative, np.floor(position), side='right')]
+        upper = self.centroids[np.searchsorted(cumulative, np.ceil(position), side='right')]
+        return lower + (upper - lower) * (position - np.floor(position))
+
+
+def _as_numeric(values):
+    if values.dtype == "category":
+        values = values.astype(values.cat.categories.dtype)
+    return pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _steps(transformer):
+    return [step for _, step in transformer.steps] if isinstance(transformer, Pipeline) else [transformer]
+
+
+def _first_imputer_strategy(transformer):
+    first = _steps(transformer)[0]
+    if not isinstance(first, SimpleImputer) or first.strategy not in ("median", "most_frequent"):
+        raise ValueError(f"Streaming fit needs a median or most_frequent SimpleImputer first, got {first}.")
+    return first.strategy
+
+
+class _ColumnStats:
+    """Running statistics of the columns of one transformer, updated chunk by chunk."""
+
+    def __init__(self, strategy, n_columns, max_bins):
+        self.strategy = strategy
+        self.n = np.zeros(n_columns)
+        self.n_missing = np.zeros(n_columns)
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+        self.sketches = [QuantileSketch(max_bins) for _ in range(n_columns)]
+        self.counts = [{} for _ in range(n_columns)]
+
+    def update(self, chunk):
+        for j, column in enumerate(chunk.columns):
+            values = _as_numeric(chunk[column])
+            present = values[~np.isnan(values)]
+            self.n_missing[j] += len(values) - len(present)
+            if self.strategy == "most_frequent":
+                for value, count in zip(*np.unique(present, return_counts=True)):
+                    self.counts[j][value] = self.counts[j].get(value, 0) + int(count)
+                continue
+            # Chan et al. parallel update of the mean and the sum of squared deviations
+            n_b = len(present)
+            if n_b:
+                mean_b = present.mean()
+                delta = mean_b - self.mean[j]
+                total = self.n[j] + n_b
+                self.m2[j] += ((present - mean_b) ** 2).sum() + delta ** 2 * self.n[j] * n_b / total
+                self.mean[j] += delta * n_b / total
+                self.n[j] = total
+            self.sketches[j].update(present)
+
+    def statistics(self):
+        """Imputation value of every column (median or most frequent, ties to the smallest)."""
+        if self.strategy == "median":
+            return np.array([sketch.quantile(0.5) for sketch in self.sketches])
+        return np.array([min(counts, key=lambda value: (-counts[value], value)) if counts else np.nan
+                         for counts in self.counts])
+
+    def vocabulary(self, j):
+        return sorted(self.counts[j])
+
+    def imputed_moments(self, statistics):
+        """Mean and (population) variance of every column after imputing the missing values."""
+        total = self.n + self.n_missing
+        delta = statistics - self.mean
+        mean = self.mean + delta * self.n_missing / total
+        m2 = self.m2 + delta ** 2 * self.n * self.n_missing / total
+        return mean, m2 / total, total
+
+
+def fit_preprocessor_streaming(chunks, preprocessor=None, max_bins=2048):
+    """
+    Fit a column transformer in one streaming pass over chunks of the training data.
+
+    Only running statistics are kept between chunks: for median-imputed columns the
+    count, mean and sum of squared deviations (for the scaler) and a `QuantileSketch`
+    (for the median), and for most_frequent-imputed columns the count of every value
+    (for the mode and the one-hot vocabulary). After the pass, the transformer is fitted
+    on a small synthetic frame holding every observed category, so that all its fitted
+    attributes and one-hot vocabularies are set up, and the imputer and scaler
+    statistics are then replaced by the ones computed from the stream.
+
+    The result transforms data like a transformer fitted in memory with `fit`. Medians
+    are exact while a column has at most `max_bins` distinct values, and approximate
+    beyond that.
+
+    Parameters:
+        chunks (iterable of pandas.DataFrame): Chunks of the training features, e.g.
+                                               from `src.columnar_io.iter_rows`.
+        preprocessor (sklearn.compose.ColumnTransformer, optional): Unfitted transformer
+            whose transformers start with a median or most_frequent `SimpleImputer`,
+            optionally followed by a `StandardScaler` (after a median imputer), a
+            `OneHotEncoder` (after a most_frequent imputer) or a stateless
+            `FunctionTransformer` such as the float32 cast. Defaults to
+            `build_preprocessor()`.
+        max_bins (int, optional): Size of the median sketches. Defaults to 2048.
+
+    Returns:
+        sklearn.compose.ColumnTransformer: The fitted transformer.
+
+    Raises:
+        ValueError: If there are no chunks or the transformer has an unsupported step.
+
+    Examples:
+        >>> train_idx = np.load('data/train_idx.npy')
+        >>> chunks = (chunk.drop(columns=['label'])
+        ...           for chunk in iter_rows('data/combined_df_clean.csv', train_idx, 100000))
+        >>> preprocessor = fit_preprocessor_streaming(chunks)
+        >>> X_test_transformed = preprocessor.transform(X_test)
+    """
+    if preprocessor is None:
+        preprocessor = build_preprocessor()
+    groups = [(name, transformer, list(columns)) for name, transformer, columns in preprocessor.transformers
+              if transformer not in ("drop", "passthrough")]
+    stats = {}
+    for name, transformer, columns in groups:
+        for step in _steps(transformer)[1:]:
+            if not isinstance(step, (StandardScaler, OneHotEncoder, FunctionTransformer)):
+                raise ValueError(f"Streaming fit does not support {type(step).__name__} in '{name}'.")
+        stats[name] = _ColumnStats(_first_imputer_strategy(transformer), len(columns), max_bins)
+
+    first_chunk = None
+    for chunk in chunks:
+        if first_chunk is None:
+            first_chunk = chunk.iloc[:1]
+        for name, _, columns in groups:
+            stats[name].update(chunk[columns])
+    if first_chunk is None:
+        raise ValueError("Cannot fit a preprocessor on an empty stream of chunks.")
+
+    # synthetic frame with every observed category, to set up the fitted attributes
+    n_rows = max([1] + [len(stats[name].vocabulary(j)) for name, _, columns in groups
+                        if stats[name].strategy == "most_frequent" for j in range(len(columns))])
+    skeleton = first_chunk.iloc[np.zeros(n_rows, dtype=int)].reset_index(drop=True)
+    for name, _, columns in groups:
+        for j, column in enumerate(columns):
+            values = stats[name].vocabulary(j) if stats[name].strategy == "most_frequent" else [0.0, 1.0]
+            skeleton[column] = np.resize(np.asarray(values or [0.0], dtype="float64"), n_rows)
+    preprocessor.fit(skeleton)
+
+    for name, _, _ in groups:
+        steps = _steps(preprocessor.named_transformers_[name])
+        statistics = stats[name].statistics()
+        steps[0].statistics_ = statistics
+        for step in steps[1:]:
+            if isinstance(step, StandardScaler):
+                if stats[name].strategy != "median":
+                    raise ValueError(f"Streaming fit supports StandardScaler only after a median imputer in '{name}'.")
+                mean, var, n_samples = stats[name].imputed_moments(statistics)
+                step.mean_ = mean if step.with_mean else None
+                step.var_ = var
+                step.scale_ = np.where(var > 0, np.sqrt(var), 1.0) if step.with_std else None
+                step.n_samples_seen_ = int(n_samples[0])
+    return preprocessor
+
+
+def transform_chunks(preprocessor, chunks, output_file):
+    """
+    Transform chunks with a fitted preprocessor and stream the result to a file.
+
+    Parameters:
+        preprocessor (sklearn.compose.ColumnTransformer): The fitted transformer.
+        chunks (iterable of pandas.DataFrame): Chunks of features to transform.
+        output_file (str): Path to a CSV, Parquet or Feather file.
+
+    Returns:
+        int: Number of rows written.
+    """
+    names = feature_names(preprocessor)
+    return write_chunks(
+        (pd.DataFrame(preprocessor.transform(chunk), columns=names) for chunk in chunks),
+        output_file
+    )
@@ -0,0 +1,84 @@
+import os
+import numpy as np
+from sklearn.model_selection import train_test_split, GroupShuffleSplit
+
+SPLIT_FILES = {"train": "train_idx.npy", "test": "test_idx.npy"}
+
+def split_indices(n_rows, test_size=0.3, random_state=123, stratify=None, groups=None):
+    """
+    Split the row positions of a dataset into train and test positions.
+
+    Without `stratify` or `groups` this gives the same rows, in the same order, as
+    `train_test_split(df, test_size=test_size, random_state=random_state)`.
+
+    Parameters:
+        n_rows (int): Number of rows in the dataset.
+        test_size (float, optional): Proportion of the rows in the test split, or of the
+                                     groups when `groups` is given. Defaults to 0.3.
+        random_state (int, optional): Seed of the shuffle. Defaults to 123.
+        stratify (array-like, optional): Class labels to keep in the same proportions
+                                         in both splits. Defaults to None.
+        groups (array-like, optional): Group of each row (e.g. the site it was collected
+                                       at); every group ends up entirely in one split.
+                                       Defaults to None.
+
+    Returns:
+        tuple of numpy.ndarray: The train and test positions as int32 arrays.
+
+    Raises:
+        ValueError: If both `stratify` and `groups` are given, or if their length
+                    is not `n_rows`.
+
+    Examples:
+        >>> train_idx, test_idx = split_indices(len(combined_df), stratify=combined_df['label'])
+    """
+    if stratify is not None and groups is not None:
+        raise ValueError("A split cannot be both stratified and grouped.")
+    for name, values in [("stratify", stratify), ("groups", groups)]:
+        if values is not None and len(values) != n_rows:
+            raise ValueError(f"`{name}` has {len(values)} values for {n_rows} rows.")
+    positions = np.arange(n_rows, dtype=np.int32)
+    if groups is not None:
+        splitter = GroupShuffleSplit(n_splits=1, test_size=test_size, random_state=random_state)
+        train_idx, test_idx = next(splitter.split(positions, groups=np.asarray(groups)))
+        return positions[train_idx], positions[test_idx]
+    train_idx, test_idx = train_test_split(positions, test_size=test_size, random_state=random_state,
+                                           stratify=stratify)
+    return train_idx, test_idx
+
+
+def save_split(train_idx, test_idx, output_folder):
+    """
+    Save train and test positions as int32 .npy files (`train_idx.npy` and `test_idx.npy`).
+
+    Returns:
+        dict: Mapping of split name to the saved path.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    paths = {}
+    for name, indices in [("train", train_idx), ("test", test_idx)]:
+        paths[name] = os.path.join(output_folder, SPLIT_FILES[name])
+        np.save(paths[name], np.asarray(indices, dtype=np.int32))
+    return paths
+
+
+def load_split(folder, mmap_mode="r"):
+    """
+    Load the train and test positions saved by `save_split`, memory-mapped by default.
+
+    Parameters:
+        folder (str): Folder holding `train_idx.npy` and `test_idx.npy`.
+        mmap_mode (str, optional): Memory-map mode, or None to read the arrays into
+                                   memory. Defaults to 'r'.
+
+    Returns:
+        tuple of numpy.ndarray: The train and test positions.
+
+    Raises:
+        FileNotFoundError: If either file is missing.
+    """
+    paths = [os.path.join(folder, SPLIT_FILES[name]) for name in ("train", "test")]
+    for path in paths:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"File not found: {path}")
+    return tuple(np.load(path, mmap_mode=mmap_mode) for path in paths)
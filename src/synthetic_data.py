@@ -0,0 +1,94 @@
+import os
+import numpy as np
+import pandas as pd
+
+COLUMNS = ['age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg',
+           'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal', 'label']
+
+# proportion of missing ('?') values per column in the combined UCI data
+MISSING_RATES = {
+    'trestbps': 0.064, 'chol': 0.032, 'fbs': 0.098, 'restecg': 0.002, 'thalach': 0.06,
+    'exang': 0.06, 'oldpeak': 0.068, 'slope': 0.334, 'ca': 0.663, 'thal': 0.527
+}
+
+SITES = ['hungarian', 'switzerland', 'cleveland', 'va']
+
+def synthetic_heart_data(n_rows, seed=0, duplicate_rate=0.001):
+    """
+    Generate heart-disease-shaped data with the 14 columns of the UCI files.
+
+    Each column follows the range and frequencies of the combined UCI data, with the
+    same proportion of missing values. Chest pain type, maximum heart rate, exercise
+    angina and ST depression depend on the label, so that the models have something
+    to learn, and a small share of rows are exact duplicates of others.
+
+    Parameters:
+        n_rows (int): Number of rows.
+        seed (int, optional): Random seed. Defaults to 0.
+        duplicate_rate (float, optional): Proportion of rows copied from another row.
+                                          Defaults to 0.001.
+
+    Returns:
+        pandas.DataFrame: The `COLUMNS`, as floats with NaN for missing values (the
+                          label is an integer).
+
+    Examples:
+        >>> df = synthetic_heart_data(100_000, seed=1)
+        >>> df.shape
+        (100000, 14)
+    """
+    rng = np.random.default_rng(seed)
+    label = rng.choice(5, n_rows, p=[0.447, 0.289, 0.118, 0.115, 0.031])
+    severity = label / 4 + rng.normal(0, 0.15, n_rows)
+
+    df = pd.DataFrame({
+        'age': np.clip(rng.normal(53.5 + 4 * severity, 9), 28, 77).round(),
+        'sex': (rng.random(n_rows) < 0.7 + 0.2 * np.clip(severity, 0, 1)).astype(float),
+        'cp': np.where(rng.random(n_rows) < 0.3 + 0.5 * np.clip(severity, 0, 1), 4.0,
+                       rng.choice([1.0, 2.0, 3.0], n_rows, p=[0.1, 0.43, 0.47])),
+        'trestbps': np.clip(rng.normal(132, 18, n_rows), 80, 200).round(),
+        'chol': np.where(rng.random(n_rows) < 0.18, 0.0, np.clip(rng.normal(245, 55, n_rows), 85, 603).round()),
+        'fbs': (rng.random(n_rows) < 0.17).astype(float),
+        'restecg': rng.choice([0.0, 1.0, 2.0], n_rows, p=[0.6, 0.19, 0.21]),
+        'thalach': np.clip(rng.normal(150 - 30 * severity, 22), 60, 202).round(),
+        'exang': (rng.random(n_rows) < 0.15 + 0.6 * np.clip(severity, 0, 1)).astype(float),
+        'oldpeak': np.clip(rng.gamma(1.0, 0.4 + 1.6 * np.clip(severity, 0, 1)), 0, 6.2).round(1),
+        'slope': rng.choice([1.0, 2.0, 3.0], n_rows, p=[0.33, 0.57, 0.1]),
+        'ca': rng.choice([0.0, 1.0, 2.0, 3.0], n_rows, p=[0.59, 0.22, 0.13, 0.06]),
+        'thal': rng.choice([3.0, 6.0, 7.0], n_rows, p=[0.45, 0.11, 0.44]),
+        'label': label
+    }, columns=COLUMNS)
+    for column, rate in MISSING_RATES.items():
+        df.loc[rng.random(n_rows) < rate, column] = np.nan
+
+    n_duplicates = int(n_rows * duplicate_rate)
+    if n_duplicates:
+        targets = rng.choice(n_rows, n_duplicates, replace=False)
+        df.iloc[targets] = df.iloc[rng.choice(n_rows, n_duplicates)].to_numpy()
+    return df
+
+
+def write_site_files(df, folder, sites=None):
+    """
+    Write data in the format of the UCI site files: one headerless CSV file per site,
+    with '?' for missing values.
+
+    The rows are split into consecutive, nearly equal parts, one per site.
+
+    Parameters:
+        df (pandas.DataFrame): Data with the `COLUMNS`, e.g. from `synthetic_heart_data`.
+        folder (str): Output folder.
+        sites (list of str, optional): Site names, giving `processed.<site>.data` files.
+                                       Defaults to the four UCI sites.
+
+    Returns:
+        list of str: The paths written, in site order.
+    """
+    sites = sites or SITES
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    for site, part in zip(sites, np.array_split(np.arange(len(df)), len(sites))):
+        path = os.path.join(folder, f"processed.{site}.data")
+        df.iloc[part].to_csv(path, header=False, index=False, na_rep='?')
+        paths.append(path)
+    return paths
@@ -0,0 +1,113 @@
+import os
+from collections import OrderedDict
+import joblib
+import numpy as np
+from scipy import sparse
+
+# keeps the folds of the usual runs in memory, but not every fold at the benchmark sizes
+DEFAULT_MAX_BYTES = 2 ** 30
+
+def _nbytes(value):
+    """Approximate memory footprint of a cached value (arrays and sparse matrices only)."""
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    if sparse.issparse(value):
+        value = value.tocsr()
+        return value.data.nbytes + value.indices.nbytes + value.indptr.nbytes
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, "memory_usage"):
+        return int(np.sum(value.memory_usage(deep=True)))
+    return 0
+
+
+class TransformCache:
+    """
+    Memory-bounded cache of fitted preprocessors and their transformed CV folds.
+
+    The preprocessing part of a pipeline only depends on the fold it is fitted on, not
+    on the model or hyperparameters that follow it. `src.tune_models.tune_models` uses
+    this cache to fit and apply the preprocessor once per fold and reuse the result for
+    every candidate of every model. Entries are evicted least-recently-used first once
+    `max_bytes` is exceeded, and are optionally persisted in `cache_dir` so that later
+    runs on the same data and folds skip preprocessing altogether.
+
+    Parameters:
+        max_bytes (int, optional): Upper bound on the size of the transformed arrays kept
+                                   in memory. `None` keeps every entry. Defaults to
+                                   `DEFAULT_MAX_BYTES` (1 GiB).
+        cache_dir (str, optional): Directory in which entries are also stored on disk with
+                                   `joblib`. Defaults to None (memory only).
+
+    Attributes:
+        hits (int): Number of lookups served from memory or disk.
+        misses (int): Number of lookups that had to compute the transform.
+        evictions (int): Number of entries dropped from memory to stay under `max_bytes`.
+
+    Examples:
+        >>> cache = TransformCache(max_bytes=500_000_000, cache_dir='data/transform_cache')
+        >>> results = tune_models(pipelines, params, X_train, y_train, transform_cache=cache)
+        >>> print(cache.hits, cache.misses)
+        195 5
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, cache_dir=None):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        """Total size of the entries currently held in memory."""
+        return sum(self._sizes.values())
+
+    def get(self, key, compute):
+        """
+        Return the cached value for `key`, calling `compute()` to create it on a miss.
+
+        Parameters:
+            key (str): Content-derived key identifying the preprocessor, data and fold.
+            compute (callable): Zero-argument function producing the value on a miss.
+
+        Returns:
+            object: The cached or freshly computed value.
+        """
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        path = None if self.cache_dir is None else os.path.join(self.cache_dir, f"{key}.joblib")
+        if path is not None and os.path.exists(path):
+            self.hits += 1
+            value = joblib.load(path)
+        else:
+            self.misses += 1
+            value = compute()
+            if path is not None:
+                joblib.dump(value, path)
+
+        self._store(key, value)
+        return value
+
+    def _store(self, key, value):
+        self._entries[key] = value
+        self._sizes[key] = _nbytes(value)
+        while self.max_bytes is not None and len(self._entries) > 1 and self.nbytes > self.max_bytes:
+            oldest, _ = self._entries.popitem(last=False)
+            del self._sizes[oldest]
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every in-memory entry (files in `cache_dir` are kept)."""
+        self._entries.clear()
+        self._sizes.clear()
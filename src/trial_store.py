@@ -0,0 +1,190 @@
+import os
+import json
+import uuid
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+TRIAL_COLUMNS = ["data_hash", "seed", "model", "estimator_hash", "scoring", "fold", "fold_hash", "params",
+                 "score", "fit_time", "score_time", "timestamp"]
+
+def _json_default(value):
+    return value.item() if isinstance(value, np.generic) else repr(value)
+
+
+def params_key(params):
+    """
+    Canonical text of a candidate's parameters, used to match it across runs.
+
+    The parameters are written as JSON with sorted keys; NumPy scalars are written as
+    plain numbers (floats round-trip exactly) and other objects by their `repr`.
+
+    Parameters:
+        params (dict): Parameters of one candidate.
+
+    Returns:
+        str: The JSON text.
+    """
+    return json.dumps(params, sort_keys=True, default=_json_default)
+
+
+class TrialStore:
+    """
+    Columnar store of the (candidate, fold) fits of hyperparameter searches.
+
+    Every fit evaluated by `src.tune_models.tune_models` is recorded with its score, fit
+    and score times, keyed by the hash of the training data, the hash of the unfitted
+    pipeline (with the scikit-learn version), the candidate's parameters, the scoring and
+    the CV fold; the search seed is
+    recorded too. A later search on the same data looks up its (candidate, fold) pairs
+    and only fits the ones not stored yet: the result of a fit is fully determined by
+    that key, so pairs are reused across seeds and across changes of `n_iter`. The test
+    indices of each fold are stored once per fold, so past searches can be compared and
+    re-plotted without refitting anything (see `load`).
+
+    Each run appends one Parquet file to `store_dir/trials` (and `store_dir/folds`), so
+    runs never rewrite earlier files; `compact` merges them.
+
+    Parameters:
+        store_dir (str): Directory of the store.
+
+    Attributes:
+        hits (int): Number of (candidate, fold) fits found in the store.
+        misses (int): Number of fits that had to be run.
+
+    Examples:
+        >>> store = TrialStore('results/trial_store')
+        >>> results = tune_models(pipelines, params, X_train, y_train, trial_store=store)
+        >>> print(store.hits, store.misses)
+        200 0
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        self.hits = 0
+        self.misses = 0
+        for table in ["trials", "folds"]:
+            os.makedirs(os.path.join(store_dir, table), exist_ok=True)
+
+    def _read(self, table, filters=None):
+        folder = os.path.join(self.store_dir, table)
+        if not any(name.endswith(".parquet") for name in os.listdir(folder)):
+            return None
+        return pd.read_parquet(folder, filters=filters)
+
+    def _append(self, table, df):
+        name = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.parquet"
+        df.to_parquet(os.path.join(self.store_dir, table, name), index=False)
+
+    def lookup(self, data_hash, fold_hashes, seed=None):
+        """
+        The stored fits on the given data and folds.
+
+        Parameters:
+            data_hash (str): Hash of the training data.
+            fold_hashes (list of str): Hashes of the CV folds.
+            seed (int, optional): Seed of the search looking the fits up. Defaults to None.
+
+        Returns:
+            dict: Mapping of (estimator hash, scoring, fold hash, params key) to the score,
+                  fit time and score time of the fit, and whether it is stored under `seed`.
+        """
+        trials = self._read("trials", filters=[("data_hash", "==", data_hash)])
+        if trials is None:
+            return {}
+        trials = trials[trials["fold_hash"].isin(fold_hashes)]
+        # a record stored under the given seed comes last and wins
+        trials = trials.assign(has_seed=trials["seed"] == seed).sort_values("has_seed", kind="stable")
+        keys = zip(trials["estimator_hash"], trials["scoring"], trials["fold_hash"], trials["params"])
+        values = zip(trials["score"], trials["fit_time"], trials["score_time"], trials["has_seed"])
+        return dict(zip(keys, values))
+
+    def save(self, trials, folds=None):
+        """
+        Append new fits (and the folds they were evaluated on) to the store.
+
+        Parameters:
+            trials (list of dict): One record per fit with the `TRIAL_COLUMNS` but the timestamp.
+            folds (list of dict, optional): One record per fold with `data_hash`, `fold`,
+                                            `fold_hash`, `n_train` and `test_indices`.
+                                            Folds already stored are skipped.
+        """
+        if trials:
+            df = pd.DataFrame(trials).assign(timestamp=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+            self._append("trials", df[TRIAL_COLUMNS])
+        if folds:
+            stored = self._read("folds")
+            known = set() if stored is None else set(zip(stored["data_hash"], stored["fold_hash"]))
+            new = [fold for fold in folds if (fold["data_hash"], fold["fold_hash"]) not in known]
+            if new:
+                self._append("folds", pd.DataFrame(new))
+
+    def load(self, data_hash=None, seed=None, model=None):
+        """
+        Read the stored fits, e.g. to compare models without refitting.
+
+        Parameters:
+            data_hash (str, optional): Only the fits on this training data.
+            seed (int, optional): Only the fits of searches run with this seed.
+            model (str, optional): Only the fits of this model.
+
+        Returns:
+            pandas.DataFrame: One row per fit with the `TRIAL_COLUMNS` (the parameters as
+                              JSON text), the latest record of each fit only.
+        """
+        filters = [(column, "==", value) for column, value in
+                   [("data_hash", data_hash), ("seed", seed), ("model", model)] if value is not None]
+        trials = self._read("trials", filters=filters or None)
+        if trials is None:
+            return pd.DataFrame(columns=TRIAL_COLUMNS)
+        key = ["data_hash", "seed", "model", "estimator_hash", "scoring", "fold_hash", "params"]
+        return trials.sort_values("timestamp").drop_duplicates(key, keep="last").reset_index(drop=True)
+
+    def load_folds(self, data_hash):
+        """
+        The CV folds stored for some training data.
+
+        Returns:
+            pandas.DataFrame: One row per fold with its `fold` number, `fold_hash`,
+                              `n_train` and `test_indices`.
+        """
+        folds = self._read("folds", filters=[("data_hash", "==", data_hash)])
+        return pd.DataFrame(columns=["data_hash", "fold", "fold_hash", "n_train", "test_indices"]) \
+            if folds is None else folds.drop_duplicates("fold_hash").sort_values("fold").reset_index(drop=True)
+
+    def summary(self, data_hash=None, seed=None):
+        """
+        Mean CV score and fit time of every stored candidate, best first within each model.
+
+        Parameters:
+            data_hash (str, optional): Only the fits on this training data.
+            seed (int, optional): Only the fits of searches run with this seed.
+
+        Returns:
+            pandas.DataFrame: One row per model and parameters with `mean_score`,
+                              `std_score`, `n_folds` and `mean_fit_time`.
+        """
+        trials = self.load(data_hash=data_hash, seed=seed)
+        trials = trials.drop_duplicates(["data_hash", "model", "estimator_hash", "scoring", "fold_hash", "params"])
+        summary = trials.groupby(["model", "params"]).agg(
+            mean_score=("score", "mean"), std_score=("score", lambda scores: scores.std(ddof=0)),
+            n_folds=("fold", "nunique"), mean_fit_time=("fit_time", "mean")
+        ).reset_index()
+        return summary.sort_values(["model", "mean_score"], ascending=[True, False]).reset_index(drop=True)
+
+    def compact(self):
+        """Merge the Parquet files of each table into one, keeping the latest record of each fit."""
+        for table in ["trials", "folds"]:
+            df = self._read(table)
+            if df is None:
+                continue
+            if table == "trials":
+                df = df.sort_values("timestamp").drop_duplicates(
+                    ["data_hash", "seed", "model", "estimator_hash", "scoring", "fold_hash", "params"], keep="last")
+            else:
+                df = df.drop_duplicates(["data_hash", "fold_hash"])
+            folder = os.path.join(self.store_dir, table)
+            old_files = [name for name in os.listdir(folder) if name.endswith(".parquet")]
+            self._append(table, df)
+            for name in old_files:
+                os.remove(os.path.join(folder, name))
@@ -0,0 +1,342 @@
+import copy
+import time
+import warnings
+import joblib
+import numpy as np
+import sklearn
+from joblib import Parallel, delayed
+from scipy.stats import rankdata
+from sklearn.base import clone
+from sklearn.exceptions import FitFailedWarning
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterSampler, check_cv
+from sklearn.pipeline import Pipeline
+from sklearn.utils import _safe_indexing
+from sklearn.utils.validation import _num_samples
+from src.transform_cache import TransformCache
+from src.trial_store import params_key
+
+def _fit_and_score(estimator, X_fit, y_fit, X_val, y_val, params, scorer):
+    """
+    Fit one candidate of one model on one CV fold and score it on the held-out part.
+
+    Failed fits are scored as NaN (mirroring `RandomizedSearchCV(error_score=np.nan)`)
+    so that a single bad candidate does not abort the whole search.
+    """
+    estimator = clone(estimator).set_params(**clone(params, safe=False))
+
+    start = time.perf_counter()
+    try:
+        estimator.fit(X_fit, y_fit)
+    except Exception as e:
+        warnings.warn(f"Fitting failed for parameters {params}: {e!r}", FitFailedWarning)
+        return np.nan, time.perf_counter() - start, 0.0
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    score = scorer(estimator, X_val, y_val)
+    return score, fit_time, time.perf_counter() - start
+
+
+def _refit(estimator, X, y, params):
+    """Refit the best candidate of a model on the full training data."""
+    return clone(estimator).set_params(**clone(params, safe=False)).fit(X, y)
+
+
+def _fit_transform(preprocessor, X, y, train, test):
+    """Fit the preprocessing steps on one fold and transform both of its parts."""
+    preprocessor = clone(preprocessor)
+    X_fit = preprocessor.fit_transform(_safe_indexing(X, train), _safe_indexing(y, train))
+    X_val = preprocessor.transform(_safe_indexing(X, test)) if len(test) else None
+    return preprocessor, X_fit, X_val
+
+
+def _split_pipeline(pipeline, candidates):
+    """
+    Split a pipeline into its preprocessing steps and final estimator when every
+    candidate only tunes the final estimator, so that preprocessing can be shared.
+    Returns None when the preprocessing has to be refitted for each candidate.
+    """
+    if not isinstance(pipeline, Pipeline) or len(pipeline.steps) < 2:
+        return None
+    final_name, final_estimator = pipeline.steps[-1]
+    prefix = f"{final_name}__"
+    if not all(key.startswith(prefix) for params in candidates for key in params):
+        return None
+    return pipeline[:-1], final_name, final_estimator
+
+
+def _strip_prefix(params, final_name):
+    return {key[len(final_name) + 2:]: value for key, value in params.items()}
+
+
+def _rank(scores, n_folds=None):
+    """
+    Rank mean scores the way `RandomizedSearchCV` does (1 = best, NaN = worst).
+
+    When `n_folds` is given (successive halving), candidates evaluated on more folds
+    always rank ahead of candidates that were dropped in an earlier round.
+    """
+    scores = np.asarray(scores, dtype=float)
+    if np.isnan(scores).all():
+        scores = np.zeros(len(scores))
+    scores = np.where(np.isnan(scores), np.nanmin(scores) - 1, scores)
+    if n_folds is None:
+        return rankdata(-scores, method="min").astype(np.int32)
+
+    n_folds = np.asarray(n_folds)
+    order = np.lexsort((-scores, -n_folds))
+    changed = np.r_[True, (np.diff(scores[order]) != 0) | (np.diff(n_folds[order]) != 0)]
+    ranks = np.empty(len(scores), dtype=np.int32)
+    ranks[order] = np.maximum.accumulate(np.where(changed, np.arange(1, len(scores) + 1), 0))
+    return ranks
+
+
+def _halving_schedule(n_candidates, n_splits, factor):
+    """
+    Number of CV folds each round of successive halving evaluates up to.
+
+    The last round always uses every fold; each earlier round uses `factor` times fewer
+    folds, and there are only as many rounds as there are candidates to halve.
+    """
+    n_rounds = 1
+    while factor ** n_rounds <= min(n_candidates, n_splits):
+        n_rounds += 1
+    return [max(1, n_splits // factor ** (n_rounds - 1 - r)) for r in range(n_rounds)]
+
+
+def _cv_results(candidates, scores, fit_times, score_times, evaluated):
+    """Assemble a `cv_results_`-style dictionary from (candidate, fold) arrays."""
+    n_splits = scores.shape[1]
+    n_folds = evaluated.sum(axis=1)
+    results = {"params": candidates}
+    for k in range(n_splits):
+        results[f"split{k}_test_score"] = scores[:, k]
+        results[f"split{k}_fit_time"] = fit_times[:, k]
+        results[f"split{k}_score_time"] = score_times[:, k]
+    # candidates dropped by successive halving are averaged over the folds they reached
+    results["n_folds"] = n_folds
+    results["mean_test_score"] = np.where(evaluated, scores, 0).sum(axis=1) / n_folds
+    results["std_test_score"] = np.sqrt(
+        np.where(evaluated, (scores - results["mean_test_score"][:, None]) ** 2, 0).sum(axis=1) / n_folds
+    )
+    results["rank_test_score"] = _rank(results["mean_test_score"], n_folds)
+    results["mean_fit_time"] = fit_times.sum(axis=1) / n_folds
+    results["mean_score_time"] = score_times.sum(axis=1) / n_folds
+    return results
+
+
+def tune_models(pipelines, param_distributions, X_train, y_train, n_iter=10, cv=5,
+                scoring="accuracy", seed=999, n_jobs=None, search="random", halving_factor=3,
+                transform_cache=None, trial_store=None):
+    """
+    Tune the hyperparameters of several pipelines over one shared worker pool.
+
+    Instead of running one `RandomizedSearchCV` after another, this function samples
+    the candidates of every model up front and dispatches all (model, candidate, fold)
+    fits as independent tasks to a single `joblib` pool. The candidates, CV splits,
+    scoring and tie-breaking are the same as `RandomizedSearchCV(random_state=seed)`,
+    so with `search="random"` the best estimator of each model is identical to the
+    serial search.
+
+    With `search="halving"`, candidates are evaluated by successive halving over CV
+    folds: every candidate is first scored on a few folds, only the best
+    `1 / halving_factor` of them are scored on more folds, and so on until the
+    survivors have been evaluated on all folds. Weak candidates are dropped after
+    partial evaluation, so `n_iter` can grow without a matching rise in fits.
+
+    When a pipeline's candidates only tune its final step, the preceding preprocessing
+    steps are fitted and applied once per fold through `transform_cache` and shared by
+    every candidate (and every model built on the same preprocessor), instead of being
+    refitted for each (candidate, fold) pair. Each returned pipeline holds its own copy of
+    the fitted preprocessor.
+
+    With a `trial_store`, the (candidate, fold) pairs already evaluated on the same data
+    by an earlier search are read from the store instead of being fitted again, and the
+    new fits are added to it. The results are the same as without the store.
+
+    Parameters:
+        pipelines (dict): Mapping of model name to an unfitted estimator or pipeline.
+        param_distributions (dict): Mapping of model name to the parameter distributions
+                                    to sample from, as accepted by `ParameterSampler`.
+        X_train (pandas.DataFrame or numpy.ndarray): Feature data for training.
+        y_train (pandas.Series or numpy.ndarray): Target labels for training.
+        n_iter (int, optional): Number of candidates sampled per model. Defaults to 10.
+        cv (int or cross-validation generator, optional): CV strategy. Defaults to 5
+                                                          (stratified folds).
+        scoring (str, optional): Scorer name used to rank candidates. Defaults to "accuracy".
+        seed (int, optional): Random state for candidate sampling. Defaults to 999.
+        n_jobs (int, optional): Number of worker processes. `None` runs serially,
+                                -1 uses all cores. Defaults to None.
+        search (str, optional): Search strategy, either "random" (every candidate on
+                                every fold) or "halving". Defaults to "random".
+        halving_factor (int, optional): Proportion of candidates dropped in each round
+                                        of successive halving. Defaults to 3.
+        transform_cache (src.transform_cache.TransformCache, optional): Cache for the
+                                        per-fold preprocessing. Defaults to None, which
+                                        uses a fresh in-memory cache.
+        trial_store (src.trial_store.TrialStore, optional): Store of the fits of earlier
+                                        searches to reuse and extend. Defaults to None.
+
+    Returns:
+        dict: Mapping of model name to a dictionary with keys `best_estimator`,
+              `best_params`, `best_score` and `cv_results`.
+
+    Raises:
+        ValueError: If `search` is not a known strategy or `halving_factor` is below 2.
+
+    Examples:
+        >>> from sklearn.linear_model import LogisticRegression
+        >>> from sklearn.tree import DecisionTreeClassifier
+        >>> pipelines = {'lr': LogisticRegression(), 'tree': DecisionTreeClassifier()}
+        >>> params = {'lr': {'C': [0.1, 1, 10]}, 'tree': {'max_depth': [3, 5]}}
+        >>> results = tune_models(pipelines, params, X_train, y_train, n_iter=3, n_jobs=-1)
+        >>> results['lr']['best_params']
+        {'C': 1}
+    """
+    if search not in ("random", "halving"):
+        raise ValueError(f"Unknown search strategy '{search}', expected 'random' or 'halving'.")
+    if search == "halving" and halving_factor < 2:
+        raise ValueError("halving_factor must be at least 2.")
+
+    cv = check_cv(cv, y_train, classifier=True)
+    splits = list(cv.split(X_train, y_train))
+    n_splits = len(splits)
+    scorer = get_scorer(scoring)
+    candidates = {
+        name: list(ParameterSampler(param_distributions[name], n_iter, random_state=seed))
+        for name in pipelines
+    }
+    schedules = {
+        name: [n_splits] if search == "random"
+        else _halving_schedule(len(candidates[name]), n_splits, halving_factor)
+        for name in pipelines
+    }
+
+    shape = {name: (len(candidates[name]), n_splits) for name in pipelines}
+    scores = {name: np.full(shape[name], np.nan) for name in pipelines}
+    fit_times = {name: np.zeros(shape[name]) for name in pipelines}
+    score_times = {name: np.zeros(shape[name]) for name in pipelines}
+    evaluated = {name: np.zeros(shape[name], dtype=bool) for name in pipelines}
+    survivors = {name: np.arange(len(candidates[name])) for name in pipelines}
+
+    if transform_cache is None:
+        transform_cache = TransformCache()
+    shared = {name: _split_pipeline(pipelines[name], candidates[name]) for name in pipelines}
+    data_key = joblib.hash((X_train, y_train))
+
+    if trial_store is not None:
+        fold_hashes = [joblib.hash((train, test)) for train, test in splits]
+        # fits of another scikit-learn version may differ, so the version is part of the key
+        estimator_hashes = {name: joblib.hash((pipelines[name], sklearn.__version__)) for name in pipelines}
+        param_keys = {name: [params_key(params) for params in candidates[name]] for name in pipelines}
+        scoring_key = scoring if isinstance(scoring, str) else joblib.hash(scoring)
+        trial_key = lambda name, i, k: (estimator_hashes[name], scoring_key, fold_hashes[k], param_keys[name][i])
+        stored = trial_store.lookup(data_key, fold_hashes, seed=seed)
+        trial_store.save([], folds=[
+            {"data_hash": data_key, "fold": k, "fold_hash": fold_hashes[k], "n_train": len(train),
+             "test_indices": np.asarray(test, dtype=np.int32)}
+            for k, (train, test) in enumerate(splits)
+        ])
+
+    def transformed(name, train, test):
+        preprocessor = shared[name][0]
+        key = joblib.hash((preprocessor, data_key, train, test))
+        return transform_cache.get(
+            key, lambda: _fit_transform(preprocessor, X_train, y_train, train, test)
+        )
+
+    def fit_and_score_task(name, i, k):
+        train, test = splits[k]
+        y_fit, y_val = _safe_indexing(y_train, train), _safe_indexing(y_train, test)
+        if shared[name] is None:
+            X_fit, X_val = _safe_indexing(X_train, train), _safe_indexing(X_train, test)
+            return delayed(_fit_and_score)(
+                pipelines[name], X_fit, y_fit, X_val, y_val, candidates[name][i], scorer
+            )
+        _, X_fit, X_val = transformed(name, train, test)
+        _, final_name, final_estimator = shared[name]
+        return delayed(_fit_and_score)(
+            final_estimator, X_fit, y_fit, X_val, y_val,
+            _strip_prefix(candidates[name][i], final_name), scorer
+        )
+
+    def refit_task(name, params):
+        if shared[name] is None:
+            return delayed(_refit)(pipelines[name], X_train, y_train, params)
+        _, X_fit, _ = transformed(name, np.arange(_num_samples(X_train)), np.array([], dtype=int))
+        _, final_name, final_estimator = shared[name]
+        return delayed(_refit)(final_estimator, X_fit, y_train, _strip_prefix(params, final_name))
+
+    with Parallel(n_jobs=n_jobs) as parallel:
+        for r in range(max(len(schedule) for schedule in schedules.values())):
+            # every round dispatches the pending folds of all models' survivors at once
+            tasks = [
+                (name, i, k)
+                for name in pipelines if r < len(schedules[name])
+                for i in survivors[name]
+                for k in range(schedules[name][r - 1] if r else 0, schedules[name][r])
+            ]
+            if trial_store is not None:
+                # pairs evaluated by an earlier search are read back instead of refitted
+                reused = [(name, i, k) for name, i, k in tasks if trial_key(name, i, k) in stored]
+                for name, i, k in reused:
+                    scores[name][i, k], fit_times[name][i, k], score_times[name][i, k], _ = stored[trial_key(name, i, k)]
+                    evaluated[name][i, k] = True
+                tasks = [task for task in tasks if trial_key(*task) not in stored]
+                trial_store.hits += len(reused)
+                trial_store.misses += len(tasks)
+                # fits first stored by a search with another seed are recorded under this seed too
+                recorded = [task for task in reused if not stored[trial_key(*task)][3]] + tasks
+
+            outputs = parallel(fit_and_score_task(name, i, k) for name, i, k in tasks)
+            for (name, i, k), (score, fit_time, score_time) in zip(tasks, outputs):
+                scores[name][i, k] = score
+                fit_times[name][i, k] = fit_time
+                score_times[name][i, k] = score_time
+                evaluated[name][i, k] = True
+
+            if trial_store is not None:
+                trial_store.save([
+                    {"data_hash": data_key, "seed": seed, "model": name, "estimator_hash": estimator_hashes[name],
+                     "scoring": scoring_key, "fold": k, "fold_hash": fold_hashes[k], "params": param_keys[name][i],
+                     "score": scores[name][i, k], "fit_time": fit_times[name][i, k],
+                     "score_time": score_times[name][i, k]}
+                    for name, i, k in recorded
+                ])
+
+            for name in pipelines:
+                if r >= len(schedules[name]) - 1:
+                    continue
+                n_folds = schedules[name][r]
+                ranks = _rank(scores[name][survivors[name], :n_folds].mean(axis=1))
+                n_keep = int(np.ceil(len(survivors[name]) / halving_factor))
+                survivors[name] = np.sort(survivors[name][np.argsort(ranks, kind="stable")[:n_keep]])
+
+        results = {}
+        for name in pipelines:
+            cv_results = _cv_results(candidates[name], scores[name], fit_times[name],
+                                     score_times[name], evaluated[name])
+            best_index = int(cv_results["rank_test_score"].argmin())
+            results[name] = {
+                "best_params": candidates[name][best_index],
+                "best_score": cv_results["mean_test_score"][best_index],
+                "cv_results": cv_results,
+            }
+
+        refitted = parallel(refit_task(name, results[name]["best_params"]) for name in pipelines)
+
+    for name, estimator in zip(pipelines, refitted):
+        if shared[name] is not None:
+            # reassemble the full pipeline around a copy of the shared, already fitted
+            # preprocessor, so that refitting one model changes neither the others nor the cache
+            fitted_preprocessor, _, _ = transformed(
+                name, np.arange(_num_samples(X_train)), np.array([], dtype=int)
+            )
+            estimator = Pipeline(
+                copy.deepcopy(fitted_preprocessor).steps + [(shared[name][1], estimator)],
+                memory=pipelines[name].memory
+            )
+        results[name]["best_estimator"] = estimator
+
+    return results
@@ -4,6 +4,7 @@ import click
 import pandera as pa
 from deepchecks.tabular import Dataset
 from deepchecks.tabular.checks import FeatureLabelCorrelation, FeatureFeatureCorrelation
+from src.dedup_index import DedupIndex, hash_rows
 
 def check_empty_obs(combined_df):
     """
@@ -76,15 +77,16 @@ def check_duplicate_obs(combined_df):
     """
     Check for duplicate rows in the DataFrame.
 
-    This function uses `pandera` to validate if the input DataFrame contains
-    duplicate rows. It prints a success message if no duplicates are found,
-    or a warning message showing the duplicate rows.
+    Every row is hashed once with `hash_rows` (numbers compare by value, so 1 and 1.0
+    are equal), and the duplicate rows are found from these hashes in a single pass.
+    It prints a success message if no duplicates are found, or a warning message
+    showing the duplicate rows.
 
     Parameters:
         combined_df (pandas.DataFrame): The input DataFrame to be checked for duplicate rows.
         
-    Raises:
-        pandera.errors.SchemaError: If duplicate rows are found in the DataFrame.
+    Returns:
+        numpy.ndarray: Boolean mask of the rows that have a duplicate (all occurrences).
         
     Prints:
         - "No duplicate rows found." if no duplicate rows exist.
@@ -99,14 +101,183 @@ def check_duplicate_obs(combined_df):
         1  2  3
         2  2  3
     """
-    duplicate_obs_schema = pa.DataFrameSchema(
-        checks=[
-            pa.Check(lambda df: ~df.duplicated().any(), error="There're duplicate rows")
-        ]
-    )
-    try:
-        duplicate_obs_schema.validate(combined_df)
+    duplicated = pd.Series(hash_rows(combined_df)).duplicated(keep=False).to_numpy()
+    if duplicated.any():
+        print(f"Warning: There're duplicate rows: \n{combined_df[duplicated]}.")
+    else:
+        print("No duplicate rows found.")
+    return duplicated
+
+VALUE_RULES = {
+    "age": ("between", 0, 120),
+    "sex": ("isin", [0, 1]),
+    "cp": ("isin", [1, 2, 3, 4]),
+    "trestbps": ("between", 20, 220),
+    "chol": ("between", 0, 800),
+    "fbs": ("isin", [0, 1]),
+    "restecg": ("isin", [0, 1, 2]),
+    "thalach": ("between", 50, 240),
+    "exang": ("isin", [0, 1]),
+    "oldpeak": ("between", 0, 250),
+    "slope": ("isin", [1, 2, 3]),
+    "ca": ("between", 0, 4),
+    "thal": ("isin", [3, 6, 7]),
+    "label": ("between", 0, 4)
+}
+
+
+def _describe_rule(column, rule):
+    if rule[0] == "between":
+        return f"{column} between {rule[1]} and {rule[2]}"
+    return f"{column} in {rule[1]}"
+
+
+def _value_violations(df, rules, na_values=("?",)):
+    """Boolean matrix with one row per row of `df` and one column per rule, True where violated."""
+    missing_columns = [column for column in rules if column not in df.columns]
+    if missing_columns:
+        raise KeyError(f"Columns not found in DataFrame: {missing_columns}")
+
+    violations = np.zeros((len(df), len(rules)), dtype=bool)
+    for j, (column, rule) in enumerate(rules.items()):
+        raw = df[column]
+        if raw.dtype == "category":
+            raw = raw.astype(raw.cat.categories.dtype)
+        values = pd.to_numeric(raw, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        missing = raw.isna().to_numpy() | raw.isin(na_values).to_numpy()
+        if rule[0] == "between":
+            valid = (values >= rule[1]) & (values <= rule[2])
+        else:
+            valid = np.isin(values, rule[1])
+        violations[:, j] = ~(valid | missing)
+    return violations
+
+
+def check_value_ranges(combined_df, rules=None, na_values=("?",)):
+    """
+    Check that every value lies in its expected range or set, in one vectorized pass.
+
+    Each column is coerced to a float NumPy array once, the `?` sentinel is treated as
+    missing, and all rules are evaluated as a single boolean violation matrix (one
+    column per rule). Missing values never violate a rule; values that cannot be parsed
+    as numbers always do.
+
+    Parameters:
+        combined_df (pandas.DataFrame): The input DataFrame to be validated.
+        rules (dict, optional): Mapping of column name to `("between", low, high)`
+                                (inclusive) or `("isin", allowed_values)`.
+                                Defaults to `VALUE_RULES`.
+        na_values (tuple, optional): Values treated as missing. Defaults to ("?",).
+
+    Returns:
+        dict: Mapping of column name to a dictionary with the rule description
+              (`rule`), the number of violating rows (`violations`) and the index
+              labels of those rows (`rows`).
+
+    Raises:
+        KeyError: If a rule refers to a column that is not in the DataFrame.
+
+    Prints:
+        - "No outlier or anomalous value found." if no rule is violated.
+        - A warning with the violation count for every violated rule.
+
+    Examples:
+        >>> import pandas as pd
+        >>> df = pd.DataFrame({'age': [63, 150], 'cp': [1, 5]})
+        >>> report = check_value_ranges(df, {'age': ('between', 0, 120), 'cp': ('isin', [1, 2, 3, 4])})
+        Warning: 1 value(s) violate 'age between 0 and 120'.
+        Warning: 1 value(s) violate 'cp in [1, 2, 3, 4]'.
+        >>> report['age']['rows']
+        array([1])
+    """
+    if rules is None:
+        rules = VALUE_RULES
+    violations = _value_violations(combined_df, rules, na_values)
+
+    counts = violations.sum(axis=0)
+    report = {}
+    for j, (column, rule) in enumerate(rules.items()):
+        report[column] = {
+            "rule": _describe_rule(column, rule),
+            "violations": int(counts[j]),
+            "rows": combined_df.index.to_numpy()[violations[:, j]]
+        }
+
+    if not counts.any():
+        print("No outlier or anomalous value found.")
+    for column, result in report.items():
+        if result["violations"]:
+            print(f"Warning: {result['violations']} value(s) violate '{result['rule']}'.")
+    return report
+
+
+def validate_chunks(chunks, threshold=0.05):
+    """
+    Run the empty-row, missingness and duplicate checks over a stream of chunks.
+
+    This is the single-pass, out-of-core counterpart of `check_empty_obs`,
+    `check_missingness` and `check_duplicate_obs`. Only running aggregates are kept
+    between chunks: the number of rows and of all-NaN rows, the missing count of every
+    column, and a `DedupIndex` of 64-bit row fingerprints used to detect rows that duplicate
+    an earlier row (in the same or a previous chunk). The report matches what the
+    in-memory checks find on the concatenated data.
+
+    Parameters:
+        chunks (iterable of pandas.DataFrame): Chunks with the same columns, e.g. from
+                                               `pd.read_csv(..., chunksize=...)`.
+        threshold (float, optional): The proportion of missing values in a column that is
+                                     considered acceptable. Defaults to 0.05.
+
+    Returns:
+        dict: `n_rows`, `empty_rows` (number of all-NaN rows), `missing_prop`
+              (pandas.Series of missing proportions per column), `duplicate_rows`
+              (number of rows duplicating an earlier row, as `df.duplicated().sum()`)
+              and `duplicate_index` (index labels of those rows).
+
+    Prints:
+        - The same messages as `check_empty_obs` and `check_missingness`.
+        - "No duplicate rows found." or a warning with the duplicate count.
+
+    Examples:
+        >>> chunks = pd.read_csv('data/combined_df.csv', chunksize=100000)
+        >>> report = validate_chunks(chunks)
+        >>> report['duplicate_rows']
+        2
+    """
+    n_rows = 0
+    empty_rows = 0
+    missing_counts = None
+    dedup_index = DedupIndex()
+    duplicate_index = []
+
+    for chunk in chunks:
+        n_rows += len(chunk)
+        empty_rows += int(chunk.isna().all(axis=1).sum())
+        chunk_missing = chunk.isna().sum()
+        missing_counts = chunk_missing if missing_counts is None else missing_counts + chunk_missing
+
+        duplicate_index.extend(chunk.index[dedup_index.add(chunk)])
+
+    missing_prop = missing_counts / n_rows if n_rows else pd.Series(dtype="float64")
+    report = {
+        "n_rows": n_rows,
+        "empty_rows": empty_rows,
+        "missing_prop": missing_prop,
+        "duplicate_rows": len(duplicate_index),
+        "duplicate_index": np.asarray(duplicate_index)
+    }
+
+    if empty_rows:
+        print(f"Warning: There are {empty_rows} completely empty rows in dataset.")
+    else:
+        print("No missing row found.")
+    for col, prop in missing_prop.items():
+        if prop > threshold:
+            print(f"Warning: There're too many missing values in column '{col}'.")
+        else:
+            print(f"Column '{col}' passed the test of missingness.")
+    if duplicate_index:
+        print(f"Warning: There're {len(duplicate_index)} duplicate rows at index {report['duplicate_index'].tolist()}.")
+    else:
         print("No duplicate rows found.")
-    except pa.errors.SchemaError as e:
-        duplicate_rows = combined_df[combined_df.duplicated(keep=False)]
-        print(f"Warning: There're duplicate rows: \n{duplicate_rows}.")
\ No newline at end of file
+    return report
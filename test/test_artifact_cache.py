@@ -0,0 +1,71 @@
+import pytest
+import sys
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.artifact_cache import artifact_key, run_cached
+
+@pytest.fixture
+def step_files(tmp_path):
+    """An input file, an output path, a manifest directory and a step writing the output."""
+    input_file = tmp_path / "train_df.csv"
+    input_file.write_text("age,label\n63,1\n")
+    output_file = tmp_path / "x_train.csv"
+    calls = []
+
+    def compute():
+        calls.append(1)
+        output_file.write_text(input_file.read_text().upper())
+
+    return str(input_file), str(output_file), str(tmp_path / "manifests"), compute, calls
+
+# Test case 1: The key depends on the input contents and the config
+def test_artifact_key(step_files):
+    input_file, _, _, _, _ = step_files
+    key = artifact_key([input_file], {'format': 'csv'})
+    assert key == artifact_key([input_file], {'format': 'csv'})
+    assert key != artifact_key([input_file], {'format': 'feather'})
+    with open(input_file, "a") as f:
+        f.write("41,0\n")
+    assert key != artifact_key([input_file], {'format': 'csv'})
+    with pytest.raises(FileNotFoundError):
+        artifact_key([input_file + ".missing"])
+
+# Test case 2: An unchanged step is skipped; changed inputs, config or forcing rerun it
+def test_run_cached_skips_unchanged_step(step_files, capfd):
+    input_file, output_file, manifest_dir, compute, calls = step_files
+
+    assert run_cached('step', [input_file], [output_file], compute, manifest_dir=manifest_dir)
+    assert not run_cached('step', [input_file], [output_file], compute, manifest_dir=manifest_dir)
+    assert "Skipping step: outputs are up to date." in capfd.readouterr().out
+    assert run_cached('step', [input_file], [output_file], compute, config={'seed': 1}, manifest_dir=manifest_dir)
+    assert run_cached('step', [input_file], [output_file], compute, config={'seed': 1},
+                      manifest_dir=manifest_dir, force=True)
+    with open(input_file, "a") as f:
+        f.write("41,0\n")
+    assert run_cached('step', [input_file], [output_file], compute, config={'seed': 1}, manifest_dir=manifest_dir)
+    assert len(calls) == 4
+
+# Test case 3: A deleted or edited output makes the step run again
+def test_run_cached_checks_outputs(step_files):
+    input_file, output_file, manifest_dir, compute, calls = step_files
+    run_cached('step', [input_file], [output_file], compute, manifest_dir=manifest_dir)
+
+    os.remove(output_file)
+    assert run_cached('step', [input_file], [output_file], compute, manifest_dir=manifest_dir)
+    with open(output_file, "a") as f:
+        f.write("edited\n")
+    assert run_cached('step', [input_file], [output_file], compute, manifest_dir=manifest_dir)
+    assert len(calls) == 3
+
+# Test case 4: A skipped step touches its outputs, so they are newer than rewritten inputs
+def test_run_cached_touches_skipped_outputs(step_files):
+    input_file, output_file, manifest_dir, compute, calls = step_files
+    run_cached('step', [input_file], [output_file], compute, manifest_dir=manifest_dir)
+    os.utime(output_file, (0, 0))
+    with open(input_file, "w") as f:
+        f.write("age,label\n63,1\n")
+
+    assert not run_cached('step', [input_file], [output_file], compute, manifest_dir=manifest_dir)
+    assert os.path.getmtime(output_file) >= os.path.getmtime(input_file)
+    assert len(calls) == 1
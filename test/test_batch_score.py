@@ -0,0 +1,86 @@
+import pytest
+import numpy as np
+import pandas as pd
+from sklearn.datasets import load_iris
+from sklearn.linear_model import LogisticRegression
+from sklearn.svm import LinearSVC
+import sys 
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.batch_score import score_batches, read_batches
+from src.columnar_io import write_frame
+
+@pytest.fixture
+def patients(tmp_path):
+    data = load_iris(as_frame=True)
+    X = data.data
+    model = LogisticRegression(max_iter=1000).fit(X, data.target)
+    input_file = tmp_path / "patients.csv"
+    X.assign(patient_id=range(len(X))).to_csv(input_file, index=False)
+    return model, X, str(input_file)
+
+# Test case 1: Chunked CSV scoring matches scoring the whole frame at once
+def test_score_batches_csv(patients, tmp_path):
+    model, X, input_file = patients
+    output_file = str(tmp_path / "predictions.csv")
+
+    n_rows = score_batches(model, input_file, output_file, chunksize=40, id_column='patient_id')
+
+    predictions = pd.read_csv(output_file)
+    assert n_rows == len(X) == len(predictions)
+    assert list(predictions.columns) == ['patient_id', 'prediction', 'proba_0', 'proba_1', 'proba_2']
+    np.testing.assert_array_equal(predictions['patient_id'], np.arange(len(X)))
+    np.testing.assert_allclose(predictions[['proba_0', 'proba_1', 'proba_2']], model.predict_proba(X))
+
+# Test case 2: Parquet input and output are streamed in chunks too
+def test_score_batches_parquet(patients, tmp_path):
+    model, X, _ = patients
+    input_file = str(tmp_path / "patients.parquet")
+    output_file = str(tmp_path / "predictions.parquet")
+    X.to_parquet(input_file, index=False)
+
+    assert len(list(read_batches(input_file, chunksize=50))) == 3
+    score_batches(model, input_file, output_file, chunksize=50)
+    np.testing.assert_array_equal(pd.read_parquet(output_file)['prediction'], model.predict(X))
+
+# Test case 3: Models without predict_proba only output labels
+def test_score_batches_without_proba(patients, tmp_path):
+    _, X, _ = patients
+    model = LinearSVC().fit(X, load_iris().target)
+    input_file = str(tmp_path / "features.csv")
+    output_file = str(tmp_path / "predictions.csv")
+    X.to_csv(input_file, index=False)
+
+    score_batches(model, input_file, output_file)
+    assert list(pd.read_csv(output_file).columns) == ['prediction']
+
+# Test case 4: Missing input files raise FileNotFoundError
+def test_score_batches_missing_input(patients, tmp_path):
+    model, _, _ = patients
+    with pytest.raises(FileNotFoundError):
+        score_batches(model, 'non_existent_file.csv', str(tmp_path / "out.csv"))
+
+# Test case 5: Feather files are read in chunks of the requested size
+def test_read_batches_feather(patients, tmp_path):
+    _, X, _ = patients
+    input_file = str(tmp_path / "patients.feather")
+    X.to_feather(input_file, compression="uncompressed")
+
+    chunks = list(read_batches(input_file, chunksize=40, columns=['sepal length (cm)']))
+    assert [len(chunk) for chunk in chunks] == [40, 40, 40, 30]
+    pd.testing.assert_frame_equal(pd.concat(chunks), X[['sepal length (cm)']])
+
+# Test case 6: Chunks of every format are indexed by row position, and '?' can be read as missing
+@pytest.mark.parametrize('ext', ['csv', 'parquet', 'feather'])
+def test_read_batches_index(tmp_path, ext):
+    df = pd.DataFrame({'a': [1.0, None, 3.0, 4.0, 5.0]})
+    input_file = str(tmp_path / f"data.{ext}")
+    if ext == 'csv':
+        df.to_csv(input_file, index=False, na_rep='?')
+    else:
+        write_frame(df, input_file)
+
+    chunks = list(read_batches(input_file, chunksize=2, na_values=['?']))
+    assert [chunk.index.tolist() for chunk in chunks] == [[0, 1], [2, 3], [4]]
+    assert pd.concat(chunks)['a'].isna().tolist() == [False, True, False, False, False]
@@ -0,0 +1,49 @@
+import pytest
+import json
+import sys
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.benchmark import measure, run_benchmarks, compare_benchmarks
+
+# Test case 1: Functions are timed and their peak memory traced, without their output
+def test_measure(capfd):
+    def allocate(n):
+        print("allocating")
+        return bytearray(n)
+
+    result, seconds, peak = measure(allocate, 10 * 2 ** 20)
+    assert len(result) == 10 * 2 ** 20
+    assert seconds > 0
+    assert peak >= 10 * 2 ** 20
+    assert measure(allocate, 10, trace_memory=False)[2] is None
+    assert "allocating" not in capfd.readouterr().out
+
+# Test case 2: Every stage is benchmarked at every size and saved as JSON
+def test_run_benchmarks(tmp_path):
+    output_file = str(tmp_path / 'benchmarks' / 'pipeline.json')
+    report = run_benchmarks([400, 800], seed=1, models=['Decision Tree'], n_iter=1, n_bootstrap=200,
+                            output_file=output_file)
+
+    with open(output_file) as f:
+        saved = json.load(f)
+    assert saved == json.loads(json.dumps(report))
+    assert saved['metadata']['seed'] == 1
+    stages = [record['stage'] for record in saved['results'] if record['size'] == 400]
+    assert stages[0] == 'combine_load_data' and stages[-2:] == ['model.Decision Tree', 'model.bootstrap']
+    assert 'preprocess.fit_transform' in stages and 'validate.check_duplicate_obs' in stages
+    assert all(record['seconds'] > 0 and record['peak_memory_mb'] > 0 for record in saved['results'])
+
+# Test case 3: Stages slower or larger than the threshold are flagged as regressions
+def test_compare_benchmarks():
+    baseline = {"results": [{"stage": "clean", "size": 1000, "seconds": 1.0, "peak_memory_mb": 10.0},
+                            {"stage": "split", "size": 1000, "seconds": 1.0, "peak_memory_mb": 10.0}]}
+    current = {"results": [{"stage": "clean", "size": 1000, "seconds": 1.5, "peak_memory_mb": 10.0},
+                           {"stage": "split", "size": 1000, "seconds": 0.9, "peak_memory_mb": None},
+                           {"stage": "model", "size": 1000, "seconds": 9.0, "peak_memory_mb": 1.0}]}
+    comparison = compare_benchmarks(baseline, current, threshold=1.2).set_index('stage')
+
+    assert list(comparison.index) == ['clean', 'split']
+    assert comparison.loc['clean', 'time_ratio'] == pytest.approx(1.5)
+    assert comparison.loc['clean', 'regression']
+    assert not comparison.loc['split', 'regression']
@@ -0,0 +1,75 @@
+import pytest
+import numpy as np
+from sklearn.metrics import accuracy_score, f1_score, recall_score, roc_auc_score
+import sys
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.bootstrap_metrics import bootstrap_metrics, permutation_test, BOOTSTRAP_METRICS
+from src.evaluate_models import score_metrics
+
+@pytest.fixture
+def probas():
+    """Probabilities of three models of increasing skill on 300 test rows of 4 classes."""
+    rng = np.random.default_rng(0)
+    y = rng.choice(4, 300, p=[0.4, 0.3, 0.2, 0.1])
+    probas = {}
+    for skill, name in zip([0.0, 1.0, 3.0], ['random', 'weak', 'strong']):
+        logits = rng.normal(size=(300, 4))
+        logits[np.arange(300), y] += skill
+        proba = np.exp(logits) / np.exp(logits).sum(axis=1, keepdims=True)
+        probas[name] = (proba, np.arange(4))
+    return y, probas
+
+def resample_metrics(y, proba, indices):
+    y_pred = proba[indices].argmax(axis=1)
+    return [accuracy_score(y[indices], y_pred), recall_score(y[indices], y_pred, average='macro'),
+            f1_score(y[indices], y_pred, average='macro'), roc_auc_score(y[indices], proba[indices], multi_class='ovr')]
+
+# Test case 1: The estimates match score_metrics and the intervals those of a loop over resamples
+def test_bootstrap_metrics(probas):
+    y, probas = probas
+    result = bootstrap_metrics(y, probas, n_resamples=2000, seed=1, batch_size=300)
+    intervals = result['intervals'].set_index(['model', 'metric'])
+
+    assert len(intervals) == 3 * len(BOOTSTRAP_METRICS)
+    for name, (proba, classes) in probas.items():
+        expected = score_metrics(y, proba, classes)['metrics']
+        for metric in BOOTSTRAP_METRICS:
+            assert intervals.loc[(name, metric), 'estimate'] == pytest.approx(expected[metric])
+    assert (intervals['ci_lower'] <= intervals['estimate']).all()
+    assert (intervals['estimate'] <= intervals['ci_upper']).all()
+
+    # the same percentile intervals as resampling the rows in a Python loop
+    rng = np.random.default_rng(5)
+    looped = np.array([resample_metrics(y, probas['weak'][0], rng.integers(0, 300, 300)) for _ in range(1000)])
+    for metric, values in zip(['accuracy', 'recall_macro', 'f1_macro', 'roc_auc_ovr_macro'], looped.T):
+        assert intervals.loc[('weak', metric), 'ci_lower'] == pytest.approx(np.quantile(values, 0.025), abs=0.01)
+        assert intervals.loc[('weak', metric), 'ci_upper'] == pytest.approx(np.quantile(values, 0.975), abs=0.01)
+
+# Test case 2: Paired differences separate the strong model, and results do not depend on the batching
+def test_bootstrap_metrics_differences(probas):
+    y, probas = probas
+    result = bootstrap_metrics(y, probas, n_resamples=1000, seed=2, batch_size=250)
+    differences = result['differences'].set_index(['model_a', 'model_b', 'metric'])
+
+    assert differences.loc[('weak', 'strong', 'accuracy'), 'ci_upper'] < 0
+    assert differences.loc[('weak', 'strong', 'roc_auc_ovr_macro'), 'p_value'] < 0.01
+    assert differences.loc[('random', 'weak', 'accuracy'), 'difference'] == pytest.approx(
+        accuracy_score(y, probas['random'][0].argmax(axis=1)) - accuracy_score(y, probas['weak'][0].argmax(axis=1)))
+    # the p-values are those of the paired permutation test
+    permuted = permutation_test(y, probas['random'], probas['weak'], n_permutations=1000, seed=2, batch_size=250)
+    pair = result['differences'].query("model_a == 'random' and model_b == 'weak'")
+    assert pair['p_value'].tolist() == permuted['p_value'].tolist()
+    parallel = bootstrap_metrics(y, probas, n_resamples=1000, seed=2, batch_size=250, n_jobs=2)
+    assert parallel['intervals'].equals(result['intervals'])
+
+# Test case 3: The permutation test finds a difference between unlike models only
+def test_permutation_test(probas):
+    y, probas = probas
+    result = permutation_test(y, probas['strong'], probas['random'], n_permutations=500).set_index('metric')
+    assert (result['difference'] > 0).all()
+    assert (result['p_value'] == 1 / 501).all()
+
+    same = permutation_test(y, probas['weak'], probas['weak'], n_permutations=500).set_index('metric')
+    assert (same['difference'] == 0).all() and (same['p_value'] == 1).all()
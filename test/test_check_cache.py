@@ -0,0 +1,63 @@
+import pytest
+import numpy as np
+import pandas as pd
+from deepchecks.tabular import Dataset
+from deepchecks.tabular.checks import FeatureFeatureCorrelation
+import sys
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.check_cache import dataset_fingerprint, check_cache_key, run_check_cached
+
+@pytest.fixture
+def sample_df():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'age': rng.integers(30, 70, 50).astype(float),
+        'chol': rng.integers(150, 300, 50).astype(float),
+        'label': rng.integers(0, 2, 50)
+    })
+
+# Test case 1: The fingerprint is stable and changes with any value or dtype
+def test_dataset_fingerprint(sample_df):
+    fingerprint = dataset_fingerprint(sample_df)
+    assert fingerprint == dataset_fingerprint(sample_df.copy())
+
+    changed = sample_df.copy()
+    changed.loc[0, 'age'] += 1
+    assert dataset_fingerprint(changed) != fingerprint
+    assert dataset_fingerprint(sample_df.astype({'age': 'float32'})) != fingerprint
+
+# Test case 2: The cache key depends on the check parameters, its conditions and the data
+def test_check_cache_key_depends_on_check():
+    key = check_cache_key(FeatureFeatureCorrelation(), 'abc')
+    assert key == check_cache_key(FeatureFeatureCorrelation(), 'abc')
+    assert key != check_cache_key(FeatureFeatureCorrelation(n_samples=100), 'abc')
+    assert key != check_cache_key(FeatureFeatureCorrelation().add_condition_max_number_of_pairs_above_threshold(0.9), 'abc')
+    assert key != check_cache_key(FeatureFeatureCorrelation(), 'abd')
+
+# Test case 3: A cached result is loaded on the second run and keeps its conditions, failing ones too
+def test_run_check_cached_reuses_result(sample_df, tmp_path, capsys):
+    df = sample_df.assign(age_months=sample_df['age'] * 12)
+    ds = Dataset(df, label='label', cat_features=[])
+    fingerprint = dataset_fingerprint(df)
+
+    def make_check():
+        # age and age_months are perfectly correlated and no pair may be above 0, so the condition fails
+        return FeatureFeatureCorrelation(threshold=0.9).add_condition_max_number_of_pairs_above_threshold(0, 0)
+
+    first = run_check_cached(make_check(), ds, fingerprint, str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 1
+    assert "Using cached" not in capsys.readouterr().out
+    assert not first.passed_conditions()
+
+    second = run_check_cached(make_check(), ds, fingerprint, str(tmp_path))
+    assert "Using cached FeatureFeatureCorrelation" in capsys.readouterr().out
+    assert second.passed_conditions() is False
+    assert len(second.conditions_results) == len(first.conditions_results) == 1
+
+# Test case 4: Without a cache directory, the check simply runs
+def test_run_check_cached_without_cache_dir(sample_df):
+    ds = Dataset(sample_df, label='label', cat_features=[])
+    result = run_check_cached(FeatureFeatureCorrelation(threshold=0.9), ds, dataset_fingerprint(sample_df))
+    assert result.passed_conditions()
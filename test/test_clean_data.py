@@ -0,0 +1,63 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.clean_data import clean_frame, memory_report
+
+SCHEMA = {'age': 'float32', 'oldpeak': 'float32', 'cp': 'category', 'ca': 'category', 'label': 'category'}
+
+@pytest.fixture
+def raw_df():
+    """A small frame as it is read from the raw files, with '?' for missing values."""
+    return pd.DataFrame({
+        'age': [63, 41, 57],
+        'oldpeak': ['2.3', '?', '-0.5'],
+        'cp': [1, 4, 4],
+        'ca': ['0', '?', '1.0'],
+        'label': [0, 2, 1],
+        'site': ['va', 'va', 'cleveland']
+    })
+
+# Test case 1: Columns are converted to float32 and int8-coded categoricals
+def test_clean_frame_dtypes(raw_df):
+    cleaned = clean_frame(raw_df, SCHEMA, verbose=False)
+
+    assert cleaned['age'].dtype == 'float32'
+    assert cleaned['oldpeak'].tolist()[::2] == pytest.approx([2.3, -0.5])
+    assert np.isnan(cleaned['oldpeak'][1])
+    for column in ['cp', 'ca', 'label']:
+        assert cleaned[column].dtype == 'category'
+        assert cleaned[column].cat.codes.dtype == 'int8'
+    assert cleaned['site'].tolist() == raw_df['site'].tolist()
+    assert cleaned.columns.tolist() == raw_df.columns.tolist()
+
+# Test case 2: '1' and '1.0' are one category; categories are int8 only without missing values
+def test_clean_frame_categories(raw_df):
+    cleaned = clean_frame(raw_df, SCHEMA, verbose=False)
+
+    assert cleaned['cp'].cat.categories.tolist() == [1, 4]
+    assert cleaned['cp'].cat.categories.dtype == 'int8'
+    assert cleaned['ca'].cat.categories.tolist() == [0.0, 1.0]
+    assert cleaned['ca'].cat.categories.dtype == 'float32'
+    assert cleaned['ca'].isna().tolist() == [False, True, False]
+    assert np.isnan(cleaned[['cp', 'ca']].to_numpy(dtype='float64')[1, 1])
+
+# Test case 3: The input frame is left unchanged and the memory saved is reported
+def test_clean_frame_reports_memory(raw_df, capfd):
+    original = raw_df.copy()
+    cleaned = clean_frame(raw_df, SCHEMA)
+
+    pd.testing.assert_frame_equal(raw_df, original)
+    assert "saved)." in capfd.readouterr().out
+    assert cleaned.memory_usage(deep=True).sum() < raw_df.memory_usage(deep=True).sum()
+    assert memory_report(raw_df, cleaned).startswith("Memory usage:")
+
+# Test case 4: Invalid schemas are rejected
+def test_clean_frame_invalid_schema(raw_df):
+    with pytest.raises(KeyError):
+        clean_frame(raw_df, {'chol': 'float32'})
+    with pytest.raises(ValueError):
+        clean_frame(raw_df, {'age': 'int16'})
@@ -0,0 +1,85 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sys 
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+import src.columnar_io
+from src.columnar_io import read_frame, write_frame, with_format, frame_format, read_rows, iter_rows
+
+@pytest.fixture
+def clean_df():
+    """A small frame with the dtypes the cleaning step produces."""
+    return pd.DataFrame({
+        'age': [63.0, 41.0, np.nan],
+        'cp': pd.Series([1.0, 4.0, np.nan]).astype('category'),
+        'label': pd.Series([0, 2, 1]).astype('category')
+    })
+
+# Test case 1: Parquet and Feather round trips keep dtypes, including categoricals
+@pytest.mark.parametrize("fmt", ["parquet", "feather"])
+def test_round_trip_keeps_dtypes(clean_df, tmp_path, fmt):
+    path = str(tmp_path / f"clean.{fmt}")
+    write_frame(clean_df, path)
+
+    read_df = read_frame(path)
+    pd.testing.assert_frame_equal(read_df, clean_df)
+    assert read_df['cp'].dtype == 'category'
+
+# Test case 2: Only the requested columns are read
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "feather"])
+def test_read_columns(clean_df, tmp_path, fmt):
+    path = str(tmp_path / f"clean.{fmt}")
+    write_frame(clean_df, path)
+
+    assert list(read_frame(path, columns=['age']).columns) == ['age']
+
+# Test case 3: Formats are inferred from and applied to file extensions
+def test_formats():
+    assert frame_format('data/train_df.feather') == 'feather'
+    assert with_format('data/train_df.csv', 'parquet') == 'data/train_df.parquet'
+    with pytest.raises(ValueError):
+        frame_format('data/train_df.xlsx')
+    with pytest.raises(FileNotFoundError):
+        read_frame('non_existent_file.feather')
+
+# Test case 4: Rows are read by position, in the given order, with the stored dtypes
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "feather"])
+def test_read_rows(clean_df, tmp_path, fmt):
+    path = str(tmp_path / f"clean.{fmt}")
+    write_frame(clean_df, path)
+
+    rows = read_rows(path, np.array([2, 0], dtype=np.int32))
+    expected = read_frame(path).iloc[[2, 0]].reset_index(drop=True)
+    pd.testing.assert_frame_equal(rows, expected)
+    with pytest.raises(IndexError):
+        read_rows(path, [0, 3])
+
+# Test case 5: Chunked reads cover the requested rows once, in file order
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "feather"])
+def test_iter_rows(tmp_path, fmt):
+    df = pd.DataFrame({'age': np.arange(10, dtype=float), 'label': np.arange(10) % 3})
+    path = str(tmp_path / f"clean.{fmt}")
+    write_frame(df, path)
+
+    chunks = list(iter_rows(path, [7, 1, 8, 2, 9], chunksize=2))
+    assert all(len(chunk) <= 2 for chunk in chunks)
+    assert pd.concat(chunks)['age'].tolist() == [1.0, 2.0, 7.0, 8.0, 9.0]
+    with pytest.raises(IndexError):
+        list(iter_rows(path, [10], chunksize=2))
+
+# Test case 6: Every chunk gets the categories of the whole table, computed once
+@pytest.mark.parametrize("fmt", ["parquet", "feather"])
+def test_iter_rows_categories(tmp_path, fmt, monkeypatch):
+    df = pd.DataFrame({'cp': pd.Series([1.0, 1.0, 2.0, 3.0, 4.0, 4.0]).astype('category')})
+    path = str(tmp_path / f"clean.{fmt}")
+    write_frame(df, path)
+    calls = []
+    table_categories = src.columnar_io._table_categories
+    monkeypatch.setattr(src.columnar_io, '_table_categories', lambda table: calls.append(1) or table_categories(table))
+
+    chunks = list(iter_rows(path, [0, 1, 4, 5], chunksize=2))
+    assert [chunk['cp'].cat.categories.tolist() for chunk in chunks] == [[1.0, 2.0, 3.0, 4.0]] * 2
+    assert [chunk['cp'].tolist() for chunk in chunks] == [[1.0, 1.0], [4.0, 4.0]]
+    assert len(calls) == 1
@@ -4,7 +4,8 @@ import os
 current_dir = os.getcwd()
 sys.path.append(current_dir)
 import pandas as pd
-from src.combine_load_data import combine_load_data
+from src.combine_load_data import combine_load_data, combine_load_data_chunks, write_chunks, parse_missing
+from src.columnar_io import read_frame
 
 # Fixture to set up test data
 @pytest.fixture
@@ -61,5 +62,58 @@ def test_combine_load_data_column_mismatch(test_data):
     # Check if the column names in the DataFrame match the provided names
     assert list(combined_df.columns) == col_names
 
-    
-# pytest test/test_combine_load_data.py
\ No newline at end of file
+# Test case 4: Streaming chunks span file boundaries and match the in-memory result
+def test_combine_load_data_chunks_fixed_size(test_data):
+    col_names = ['col1', 'col2', 'col3']
+
+    chunks = list(combine_load_data_chunks(test_data, col_names, chunksize=3))
+
+    assert [len(chunk) for chunk in chunks] == [3, 1]
+    streamed_df = pd.concat(chunks)
+    expected_df = combine_load_data(test_data, col_names).astype('float64')
+    pd.testing.assert_frame_equal(streamed_df, expected_df)
+
+# Test case 5: The '?' sentinel is parsed as missing in streaming mode
+def test_combine_load_data_chunks_missing_sentinel(tmp_path):
+    file1 = tmp_path / "test_file1.csv"
+    file1.write_text("1,?,3\n4,5,?\n")
+
+    chunk = next(combine_load_data_chunks([str(file1)], ['a', 'b', 'c']))
+
+    assert chunk.isna().sum().sum() == 2
+    assert (chunk.dtypes == 'float64').all()
+
+# Test case 6: Streaming mode raises FileNotFoundError for missing files
+def test_combine_load_data_chunks_file_not_found():
+    with pytest.raises(FileNotFoundError):
+        list(combine_load_data_chunks(['non_existent_file.csv'], ['a', 'b', 'c']))
+
+# Test case 7: Chunks are written incrementally to CSV and Parquet
+@pytest.mark.parametrize("file_name", ["combined.csv", "combined.parquet", "combined.feather"])
+def test_write_chunks(test_data, tmp_path, file_name):
+    col_names = ['col1', 'col2', 'col3']
+    output_file = str(tmp_path / file_name)
+
+    n_rows = write_chunks(combine_load_data_chunks(test_data, col_names, chunksize=1), output_file)
+
+    written_df = read_frame(output_file)
+    assert n_rows == 4
+    pd.testing.assert_frame_equal(written_df.astype('float64'),
+                                  combine_load_data(test_data, col_names).astype('float64'))
+
+# Test case 8: The in-memory and streaming paths write byte-identical CSV files
+def test_write_chunks_same_csv_in_both_modes(tmp_path):
+    file1 = tmp_path / "site1.data"
+    file2 = tmp_path / "site2.data"
+    file1.write_text("63,1,?,.7\n41,0,2,0\n")
+    file2.write_text("57.0,?,3,-1.1\n?,1,4,2.25\n")
+    col_names = ['a', 'b', 'c', 'd']
+    in_memory, streamed = tmp_path / "in_memory.csv", tmp_path / "streamed.csv"
+
+    write_chunks([parse_missing(combine_load_data([str(file1), str(file2)], col_names), col_names)], str(in_memory))
+    write_chunks(combine_load_data_chunks([str(file1), str(file2)], col_names, chunksize=3), str(streamed))
+
+    assert in_memory.read_bytes() == streamed.read_bytes()
+    assert in_memory.read_text().splitlines()[1:] == ["63,1,?,0.7", "41,0,2,0", "57,?,3,-1.1", "?,1,4,2.25"]
+
+# pytest test/test_combine_load_data.py
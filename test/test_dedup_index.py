@@ -0,0 +1,46 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.dedup_index import hash_rows, DedupIndex, duplicated_rows, drop_duplicate_rows
+
+# Test case 1: Exact duplicates match pandas, with numbers compared by value
+def test_duplicated_rows_matches_pandas():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'A': rng.integers(0, 3, 200), 'B': rng.integers(0, 3, 200).astype(float),
+                       'C': rng.choice(['x', '?', None], 200)})
+    assert duplicated_rows(df).tolist() == df.duplicated().tolist()
+    assert (hash_rows(pd.DataFrame({'A': [1, 1.0, '1']})) == hash_rows(pd.DataFrame({'A': [1]}))[0]).all()
+
+# Test case 2: Near-duplicates are found within the tolerance, also across bucket boundaries
+def test_duplicated_rows_with_tolerance():
+    df = pd.DataFrame({'age': [63, 63, 63, 41, 41], 'oldpeak': [2.29, 2.31, 3.0, 1.0, np.nan]})
+    assert duplicated_rows(df, tolerances={'oldpeak': 0.1}).tolist() == [False, True, False, False, False]
+    assert duplicated_rows(df).tolist() == [False] * 5
+
+# Test case 3: The index remembers rows across batches and can be restored from its hashes
+def test_dedup_index_across_batches():
+    index = DedupIndex()
+    assert index.add(pd.DataFrame({'A': [1, 2, 2]})).tolist() == [False, False, True]
+    assert index.add(pd.DataFrame({'A': [3, 1]})).tolist() == [False, True]
+    assert len(index) == 5
+
+    restored = DedupIndex(hashes=index.hashes)
+    assert restored.add(pd.DataFrame({'A': [3, 4]})).tolist() == [True, False]
+
+# Test case 4: Duplicates are dropped by content, keeping the first occurrence and the index
+def test_drop_duplicate_rows():
+    df = pd.DataFrame({'A': [1, 2, 1, 3], 'B': ['x', 'y', 'x', 'y']}, index=[10, 11, 12, 13])
+    deduplicated, dropped = drop_duplicate_rows(df)
+    assert dropped.tolist() == [12]
+    assert deduplicated.index.tolist() == [10, 11, 13]
+    _, dropped = drop_duplicate_rows(df, columns=['B'])
+    assert dropped.tolist() == [12, 13]
+
+# Test case 5: Tolerance columns must be among the compared columns
+def test_dedup_index_unknown_tolerance_column():
+    with pytest.raises(KeyError):
+        duplicated_rows(pd.DataFrame({'A': [1]}), columns=['A'], tolerances={'B': 0.1})
@@ -0,0 +1,75 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.eda_charts import (density_frame, rug_frame, category_counts, numerical_chart,
+                            categorical_chart, save_charts)
+
+@pytest.fixture
+def train_df():
+    rng = np.random.default_rng(0)
+    n = 2000
+    df = pd.DataFrame({
+        'chol': rng.normal(240, 50, n).astype('float32'),
+        'cp': pd.Categorical(rng.integers(1, 5, n)),
+        'label': pd.Categorical(rng.integers(0, 3, n))
+    })
+    df.loc[:9, 'chol'] = np.nan
+    return df
+
+# Test case 1: Each density curve integrates to one over a range shared by the groups
+def test_density_frame(train_df):
+    density = density_frame(train_df, 'chol', steps=400)
+
+    assert set(density['label']) == {0, 1, 2}
+    for _, curve in density.groupby('label'):
+        assert len(curve) == 400
+        assert curve['value'].min() == pytest.approx(train_df['chol'].min())
+        assert curve['value'].max() == pytest.approx(train_df['chol'].max())
+        assert np.trapz(curve['density'], curve['value']) == pytest.approx(1, abs=0.03)
+
+# Test case 2: Binning many distinct values gives the same curve as the exact estimate
+def test_density_frame_binned(train_df):
+    exact = density_frame(train_df, 'chol')
+    binned = density_frame(train_df, 'chol', grid_bins=512)
+    np.testing.assert_allclose(binned['density'], exact['density'], atol=1e-5)
+
+# Test case 3: A column without values gives an empty frame, and its chart is still drawn
+def test_density_frame_all_missing(train_df, tmp_path):
+    train_df['chol'] = np.nan
+    density = density_frame(train_df, 'chol')
+
+    assert density.empty
+    assert density.columns.tolist() == ['value', 'density', 'label']
+    save_charts({str(tmp_path / 'numerical_chart.svg'): numerical_chart(train_df)})
+    assert (tmp_path / 'numerical_chart.svg').exists()
+
+# Test case 4: The rug keeps small data as is and thins large data to distinct positions
+def test_rug_frame(train_df):
+    assert len(rug_frame(train_df, 'chol')) == len(train_df) - 10
+
+    rug = rug_frame(train_df, 'chol', max_points=100, bins=50)
+    assert len(rug) <= 51 * 3
+    assert rug['chol'].between(train_df['chol'].min() - 1e-3, train_df['chol'].max() + 1e-3).all()
+
+# Test case 5: Category counts match the row counts, including missing categories and the color column itself
+def test_category_counts(train_df):
+    train_df.loc[:4, 'cp'] = np.nan
+    counts = category_counts(train_df, 'cp')
+    assert counts['count'].sum() == len(train_df)
+    assert counts['cp'].isna().any()
+    assert category_counts(train_df, 'label')['count'].tolist() == train_df['label'].value_counts(sort=False).tolist()
+
+# Test case 6: Charts only embed aggregated data and are saved concurrently
+def test_charts_saved(train_df, tmp_path):
+    big = train_df.sample(50000, replace=True, random_state=1)
+    charts = {str(tmp_path / 'numerical_chart.svg'): numerical_chart(big),
+              str(tmp_path / 'categorical_chart.svg'): categorical_chart(big)}
+    rows = sum(len(data) for data in charts[str(tmp_path / 'numerical_chart.svg')].to_dict()['datasets'].values())
+    assert rows < 5000
+
+    assert save_charts(charts) == list(charts)
+    assert all(os.path.getsize(path) > 0 for path in charts)
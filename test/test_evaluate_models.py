@@ -0,0 +1,100 @@
+import pytest
+import copy
+import json
+import numpy as np
+import pandas as pd
+from sklearn.datasets import make_classification
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.metrics import (accuracy_score, balanced_accuracy_score, precision_score, recall_score, f1_score,
+                             roc_auc_score, log_loss, confusion_matrix, classification_report)
+import sys
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.evaluate_models import score_metrics, evaluate_models, metrics_table, write_evaluation, SCALAR_METRICS
+
+@pytest.fixture
+def fitted_models():
+    """Two pipelines with copies of one fitted scaler, as returned by tune_models, and the test data."""
+    X, y = make_classification(n_samples=600, n_features=8, n_informative=5, n_classes=4, random_state=0)
+    X = pd.DataFrame(X, columns=[f'x{i}' for i in range(8)])
+    X_train, X_test, y_train, y_test = X[:400], X[400:], y[:400], y[400:]
+    scaler = StandardScaler().fit(X_train)
+    X_fit = scaler.transform(X_train)
+    models = {
+        'Logistic Regression': Pipeline([('scaler', copy.deepcopy(scaler)),
+                                         ('model', LogisticRegression().fit(X_fit, y_train))]),
+        'Decision Tree': Pipeline([('scaler', copy.deepcopy(scaler)), ('model', DecisionTreeClassifier(max_depth=4, random_state=0)
+                                                        .fit(X_fit, y_train))])
+    }
+    return models, X_test, y_test
+
+# Test case 1: The metrics match scikit-learn's, computed from one probability array
+def test_score_metrics(fitted_models):
+    models, X_test, y_test = fitted_models
+    model = models['Logistic Regression']
+    proba = model.predict_proba(X_test)
+    y_pred = model.predict(X_test)
+    evaluation = score_metrics(y_test, proba, model.classes_)
+    metrics = evaluation['metrics']
+
+    assert metrics['accuracy'] == pytest.approx(accuracy_score(y_test, y_pred))
+    assert metrics['balanced_accuracy'] == pytest.approx(balanced_accuracy_score(y_test, y_pred))
+    for average in ['macro', 'weighted']:
+        assert metrics[f'precision_{average}'] == pytest.approx(precision_score(y_test, y_pred, average=average))
+        assert metrics[f'recall_{average}'] == pytest.approx(recall_score(y_test, y_pred, average=average))
+        assert metrics[f'f1_{average}'] == pytest.approx(f1_score(y_test, y_pred, average=average))
+        assert metrics[f'roc_auc_ovr_{average}'] == pytest.approx(
+            roc_auc_score(y_test, proba, multi_class='ovr', average=average))
+    assert metrics['log_loss'] == pytest.approx(log_loss(y_test, proba))
+    assert metrics['brier_score'] == pytest.approx(((proba - np.eye(4)[y_test]) ** 2).sum(axis=1).mean())
+    assert 0 <= metrics['expected_calibration_error'] <= 1
+    assert sum(evaluation['calibration']['count']) == len(y_test)
+    assert evaluation['confusion_matrix'] == confusion_matrix(y_test, y_pred).tolist()
+    assert evaluation['classification_report'] == classification_report(y_test, y_pred, zero_division=0)
+
+# Test case 2: Test labels the model never saw get zero probability and count as missed
+def test_score_metrics_unseen_label():
+    y_true = np.array([0, 1, 2, 2, 1, 0])
+    proba = np.array([[0.8, 0.2], [0.3, 0.7], [0.6, 0.4], [0.1, 0.9], [0.4, 0.6], [0.5, 0.5]])
+    evaluation = score_metrics(y_true, proba, classes=[0, 1])
+
+    assert evaluation['labels'] == [0, 1, 2]
+    assert evaluation['confusion_matrix'] == [[2, 0, 0], [0, 2, 0], [1, 1, 0]]
+    assert evaluation['metrics']['accuracy'] == pytest.approx(4 / 6)
+    # a column of zeros ranks every row alike
+    assert evaluation['per_class']['2']['roc_auc'] == 0.5
+    assert evaluation['metrics']['log_loss'] == pytest.approx(-np.log(np.clip(
+        [0.8, 0.7, 1e-15, 1e-15, 0.6, 0.5], 1e-15, 1)).mean())
+
+# Test case 3: Models with the same fitted preprocessor transform the test data once
+def test_evaluate_models(fitted_models, monkeypatch):
+    models, X_test, y_test = fitted_models
+    calls = []
+    transform = StandardScaler.transform
+    monkeypatch.setattr(StandardScaler, 'transform', lambda self, X, copy=None: calls.append(len(X))
+                        or transform(self, X, copy=copy))
+
+    evaluations = evaluate_models(models, X_test, y_test, n_jobs=2)
+    assert calls == [len(X_test)]
+    for name, model in models.items():
+        assert evaluations[name]['metrics']['accuracy'] == pytest.approx(model.score(X_test, y_test))
+    table = metrics_table(evaluations)
+    assert table.index.tolist() == ['Logistic Regression', 'Decision Tree']
+    assert table.columns.tolist() == SCALAR_METRICS
+
+# Test case 4: One JSON file, one CSV table and a classification report per model are written
+def test_write_evaluation(fitted_models, tmp_path):
+    models, X_test, y_test = fitted_models
+    paths = write_evaluation(evaluate_models(models, X_test, y_test), str(tmp_path))
+
+    with open(paths['json']) as f:
+        saved = json.load(f)
+    assert set(saved) == set(models)
+    assert len(saved['Decision Tree']['confusion_matrix']) == 4
+    table = pd.read_csv(paths['csv'], index_col='model')
+    assert table.loc['Decision Tree', 'accuracy'] == pytest.approx(saved['Decision Tree']['metrics']['accuracy'])
+    assert os.path.basename(paths['reports']['Logistic Regression']) == 'classification_report_Logistic_Regression.txt'
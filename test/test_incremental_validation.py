@@ -0,0 +1,103 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+import src.incremental_validation
+from src.incremental_validation import validate_incremental, load_validation_state
+
+RULES = {'age': ('between', 0, 120), 'cp': ('isin', [1, 2, 3, 4])}
+
+@pytest.fixture
+def sample_df():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'age': rng.integers(30, 70, 40).astype(float),
+        'cp': rng.integers(1, 5, 40).astype(float),
+        'chol': rng.integers(150, 300, 40).astype(float),
+        'label': rng.integers(0, 2, 40)
+    })
+    df.loc[5, 'chol'] = np.nan
+    df.loc[30, 'age'] = 150
+    df.loc[35] = df.loc[3]
+    return df
+
+# Test case 1: Validating in two increments gives the same report as validating at once
+def test_validate_incremental_matches_full_run(sample_df, tmp_path):
+    full = validate_incremental(sample_df, str(tmp_path / 'full'), rules=RULES)
+    validate_incremental(sample_df.iloc[:20], str(tmp_path / 'inc'), rules=RULES)
+    merged = validate_incremental(sample_df, str(tmp_path / 'inc'), rules=RULES)
+
+    assert merged['new_rows'] == 20
+    assert merged['n_rows'] == full['n_rows'] == 40
+    assert merged['duplicate_index'].tolist() == full['duplicate_index'].tolist() == [35]
+    assert merged['value_ranges']['age']['rows'].tolist() == [30]
+    pd.testing.assert_series_equal(merged['missing_prop'], full['missing_prop'])
+    pd.testing.assert_frame_equal(merged['correlation'], full['correlation'])
+
+# Test case 2: Statistics and correlations match pandas on the whole data
+def test_validate_incremental_statistics(sample_df, tmp_path):
+    validate_incremental(sample_df.iloc[:25], str(tmp_path), rules=RULES)
+    report = validate_incremental(sample_df, str(tmp_path), rules=RULES)
+
+    np.testing.assert_allclose(report['correlation'].to_numpy(), sample_df.corr().to_numpy())
+    stats = sample_df.describe().T
+    np.testing.assert_allclose(report['column_stats'][['count', 'mean', 'std', 'min', 'max']].to_numpy(),
+                               stats[['count', 'mean', 'std', 'min', 'max']].to_numpy())
+    assert report['class_proportions'].sum() == pytest.approx(1)
+
+# Test case 3: Duplicates of already validated rows are found through the stored hashes
+def test_validate_incremental_duplicates_against_history(sample_df, tmp_path, capfd):
+    validate_incremental(sample_df.iloc[:20], str(tmp_path), rules=RULES)
+    appended = pd.concat([sample_df.iloc[:20], sample_df.iloc[[0]]], ignore_index=True)
+    report = validate_incremental(appended, str(tmp_path), rules=RULES)
+
+    assert report['new_rows'] == 1
+    assert report['duplicate_index'].tolist() == [20]
+    assert "Warning: There're 1 duplicate rows at index [20]." in capfd.readouterr().out
+
+# Test case 4: Edited history invalidates the state and everything is validated again
+def test_validate_incremental_edited_history(sample_df, tmp_path, capfd):
+    validate_incremental(sample_df.iloc[:20], str(tmp_path), rules=RULES)
+    edited = sample_df.copy()
+    edited.loc[0, 'age'] = 31.5
+    report = validate_incremental(edited, str(tmp_path), rules=RULES)
+
+    assert report['new_rows'] == 40
+    assert "does not match the data" in capfd.readouterr().out
+    assert load_validation_state(str(tmp_path))['n_rows'] == 40
+
+# Test case 5: A run without new rows reuses the stored state unchanged
+def test_validate_incremental_no_new_rows(sample_df, tmp_path, capfd):
+    first = validate_incremental(sample_df, str(tmp_path), rules=RULES)
+    second = validate_incremental(sample_df, str(tmp_path), rules=RULES)
+
+    assert second['new_rows'] == 0
+    assert "Validating 0 new row(s) (40 already validated)." in capfd.readouterr().out
+    pd.testing.assert_frame_equal(first['column_stats'], second['column_stats'])
+
+# Test case 6: Statistics stay accurate on large, offset values merged over many increments
+def test_validate_incremental_offset_values(tmp_path):
+    rng = np.random.default_rng(1)
+    x = 1e9 + rng.normal(size=300)
+    df = pd.DataFrame({'x': x, 'y': x + rng.normal(size=300), 'z': rng.normal(size=300)})
+    df.loc[::7, 'y'] = np.nan
+    for end in range(50, 301, 50):
+        report = validate_incremental(df.iloc[:end], str(tmp_path), rules={})
+
+    np.testing.assert_allclose(report['correlation'].to_numpy(), df.corr().to_numpy(), rtol=1e-6)
+    np.testing.assert_allclose(report['column_stats']['std'].to_numpy(), df.std().to_numpy(), rtol=1e-6)
+
+# Test case 7: Only a sample of the validated rows is hashed again
+def test_validate_incremental_verifies_a_sample(sample_df, tmp_path, monkeypatch):
+    validate_incremental(sample_df.iloc[:30], str(tmp_path), rules=RULES)
+    hashed = []
+    hash_rows = src.incremental_validation.hash_rows
+    monkeypatch.setattr(src.incremental_validation, 'hash_rows', lambda df: hashed.append(df.index.tolist()) or hash_rows(df))
+    report = validate_incremental(sample_df, str(tmp_path), rules=RULES, verify_rows=5)
+
+    assert report['new_rows'] == 10
+    assert len(hashed) == 1 and len(hashed[0]) == 5
+    assert hashed[0][0] == 0 and hashed[0][-1] == 29
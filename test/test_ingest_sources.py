@@ -0,0 +1,73 @@
+import pytest
+import json
+import hashlib
+import sys 
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.ingest_sources import resolve_sources, copy_from_mirror, sync_from_mirror, load_sources
+
+@pytest.fixture
+def site_files(tmp_path):
+    """Create three small site files in a temporary directory."""
+    contents = {"a": "1,2\n3,4\n", "b": "5,6\n", "c": "7,8\n9,?\n"}
+    for site, content in contents.items():
+        (tmp_path / f"processed.{site}.data").write_text(content)
+    return tmp_path
+
+# Test case 1: Sources are resolved from a glob pattern or a config file
+def test_resolve_sources(site_files):
+    from_glob = resolve_sources(pattern=str(site_files / "processed.*.data"))
+    assert [source['site'] for source in from_glob] == ['a', 'b', 'c']
+
+    config = site_files / "sources.json"
+    config.write_text(json.dumps({"sources": [
+        str(site_files / "processed.c.data"),
+        {"site": "bee", "path": str(site_files / "processed.b.data"), "sha256": "abc"}
+    ]}))
+    from_config = resolve_sources(config_path=str(config))
+    assert [source['site'] for source in from_config] == ['c', 'bee']
+    assert from_config[1]['sha256'] == 'abc'
+
+    with pytest.raises(ValueError):
+        resolve_sources()
+
+# Test case 2: Sites are loaded in parallel, combined in order and tagged
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_load_sources(site_files, use_processes):
+    sources = resolve_sources(pattern=str(site_files / "processed.*.data"))
+
+    combined_df = load_sources(sources, ['x', 'y'], max_workers=3, site_column='site',
+                               use_processes=use_processes)
+
+    assert combined_df['x'].tolist() == [1, 3, 5, 7, 9]
+    assert combined_df['site'].tolist() == ['a', 'a', 'b', 'c', 'c']
+
+# Test case 3: Mirror copies are checksum-verified, resumed and skipped when up to date
+def test_copy_from_mirror(site_files, tmp_path_factory):
+    dest_dir = tmp_path_factory.mktemp("dest")
+    mirror_file = site_files / "processed.a.data"
+    checksum = hashlib.sha256(mirror_file.read_bytes()).hexdigest()
+    source = {'site': 'a', 'path': str(dest_dir / "processed.a.data"), 'sha256': checksum}
+
+    # a partial copy from an interrupted run is resumed
+    (dest_dir / "processed.a.data.part").write_bytes(mirror_file.read_bytes()[:3])
+    assert copy_from_mirror(source, str(site_files)) == "copied"
+    assert (dest_dir / "processed.a.data").read_bytes() == mirror_file.read_bytes()
+    assert copy_from_mirror(source, str(site_files)) == "skipped"
+
+    bad_source = {'site': 'b', 'path': str(dest_dir / "processed.b.data"), 'sha256': "0" * 64}
+    with pytest.raises(ValueError):
+        copy_from_mirror(bad_source, str(site_files))
+    assert not (dest_dir / "processed.b.data").exists()
+
+# Test case 4: Checksums can come from .sha256 sidecar files in the mirror
+def test_sync_from_mirror_sidecar(site_files, tmp_path_factory):
+    dest_dir = tmp_path_factory.mktemp("dest")
+    mirror_file = site_files / "processed.b.data"
+    (site_files / "processed.b.data.sha256").write_text(
+        hashlib.sha256(mirror_file.read_bytes()).hexdigest() + "  processed.b.data\n")
+    sources = [{'site': 'b', 'path': str(dest_dir / "processed.b.data"), 'sha256': None}]
+
+    assert sync_from_mirror(sources, str(site_files)) == {'b': 'copied'}
+    assert sync_from_mirror(sources, str(site_files)) == {'b': 'skipped'}
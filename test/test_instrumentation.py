@@ -0,0 +1,116 @@
+import pytest
+import pstats
+import time
+import threading
+import sys
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.instrumentation import (stage_timer, configure_instrumentation, cv_split_records, write_trace_records,
+                                 read_trace_log, TRACE_LOG_ENV, PROFILER_ENV, PROFILE_STAGES_ENV, PROFILE_DIR_ENV)
+
+@pytest.fixture(autouse=True)
+def no_configuration(monkeypatch):
+    """Keep the instrumentation settings of one test from leaking into the others."""
+    for name in [TRACE_LOG_ENV, PROFILER_ENV, PROFILE_STAGES_ENV, PROFILE_DIR_ENV]:
+        # setting the variable first makes monkeypatch remove it again after the test,
+        # including when configure_instrumentation sets it
+        monkeypatch.setenv(name, '')
+        monkeypatch.delenv(name)
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(1000))
+
+# Test case 1: A stage is timed and logged as one JSON line, with the rows it processed
+def test_stage_timer(tmp_path):
+    log_file = str(tmp_path / 'trace.jsonl')
+    with stage_timer('clean', log_file=log_file, fmt='csv') as record:
+        busy(0.1)
+        record['rows'] = 10
+    with stage_timer('split', rows=7, log_file=log_file):
+        pass
+
+    log = read_trace_log(log_file)
+    assert log['stage'].tolist() == ['clean', 'split']
+    assert log['rows'].tolist() == [10, 7]
+    assert log.loc[0, 'fmt'] == 'csv' and (log['status'] == 'ok').all()
+    assert log.loc[0, 'wall_time'] >= 0.1 and log.loc[0, 'cpu_time'] > 0.05
+    assert log.loc[0, 'peak_rss_mb'] > 0 and log.loc[0, 'peak_rss_growth_mb'] >= 0
+
+# Test case 2: As a decorator, each call is logged, failures too
+def test_stage_timer_decorator(tmp_path):
+    configure_instrumentation(str(tmp_path / 'trace.jsonl'))
+
+    @stage_timer('validate')
+    def validate(fail):
+        if fail:
+            raise ValueError('invalid')
+        return 'valid'
+
+    assert validate(False) == 'valid'
+    with pytest.raises(ValueError):
+        validate(True)
+    log = read_trace_log(str(tmp_path / 'trace.jsonl'))
+    assert log['status'].tolist() == ['ok', 'failed']
+    assert log.loc[1, 'error'] == 'ValueError'
+
+    # nothing is written once the log is unset
+    configure_instrumentation(None)
+    validate(False)
+    assert len(read_trace_log(str(tmp_path / 'trace.jsonl'))) == 2
+
+# Test case 3: Only the selected stages are profiled, with cProfile or by sampling
+def test_stage_timer_profiles(tmp_path):
+    configure_instrumentation(str(tmp_path / 'trace.jsonl'), profiler='cprofile', profile_stages=['model'],
+                              profile_dir=str(tmp_path / 'profiles'))
+    with stage_timer('model.tune'):
+        busy(0.05)
+    with stage_timer('clean'):
+        busy(0.05)
+    with stage_timer('preprocess', profiler='sampling'):
+        busy(0.2)
+
+    assert sorted(os.listdir(tmp_path / 'profiles')) == ['model.tune.prof', 'preprocess.folded']
+    stats = pstats.Stats(str(tmp_path / 'profiles' / 'model.tune.prof'))
+    assert any(function[2] == 'busy' for function in stats.stats)
+    with open(tmp_path / 'profiles' / 'preprocess.folded') as f:
+        stacks = f.read().splitlines()
+    counts = {line.rsplit(' ', 1)[0]: int(line.rsplit(' ', 1)[1]) for line in stacks}
+    assert sum(counts.values()) > 10
+    # nearly all samples are taken inside busy
+    in_busy = sum(count for stack, count in counts.items() if 'busy (test_instrumentation.py' in stack)
+    assert in_busy >= 0.8 * sum(counts.values())
+    log = read_trace_log(str(tmp_path / 'trace.jsonl'))
+    assert log['profile'].isna().tolist() == [False, True, False]
+    with pytest.raises(ValueError):
+        configure_instrumentation(profiler='perf')
+
+# Test case 4: CV results give one record per evaluated candidate and split
+def test_cv_split_records(tmp_path):
+    nan = float('nan')
+    cv_results = {
+        'params': [{'C': 1}, {'C': 10}],
+        'split0_test_score': [0.8, 0.7], 'split0_fit_time': [0.2, 0.3], 'split0_score_time': [0.01, 0.02],
+        'split1_test_score': [0.9, nan], 'split1_fit_time': [0.4, 0.0], 'split1_score_time': [0.01, 0.0],
+        'mean_fit_time': [0.3, 0.3]
+    }
+    records = cv_split_records('Logistic Regression', cv_results, rows=100)
+
+    assert [(record['candidate'], record['split']) for record in records] == [(0, 0), (1, 0), (0, 1)]
+    assert records[2]['fit_time'] == 0.4 and records[2]['params'] == {'C': 1}
+    write_trace_records(records, str(tmp_path / 'trace.jsonl'))
+    assert read_trace_log(str(tmp_path / 'trace.jsonl'))['stage'].unique().tolist() == ['model.cv']
+
+# Test case 5: The CPU time of a stage leaves out the work of stages running on other threads
+def test_stage_timer_cpu_time_per_thread(tmp_path):
+    log_file = str(tmp_path / 'trace.jsonl')
+    other = threading.Thread(target=busy, args=(0.3,))
+    with stage_timer('waiting', log_file=log_file):
+        other.start()
+        other.join()
+
+    log = read_trace_log(log_file)
+    assert log.loc[0, 'cpu_time'] < 0.1
+    assert log.loc[0, 'process_cpu_time'] > 0.15
@@ -0,0 +1,50 @@
+import pytest
+import numpy as np
+from scipy import sparse
+import sys
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.matrix_io import save_matrix, load_matrix, matrix_nbytes
+
+@pytest.fixture
+def matrix():
+    return sparse.random(200, 15, density=0.2, format='csr', dtype=np.float32, random_state=0)
+
+# Test case 1: Dense float32 arrays round trip as memory-mapped .npy files
+def test_dense_round_trip(matrix, tmp_path):
+    path = str(tmp_path / 'X.npy')
+    save_matrix(matrix.toarray(), path)
+
+    loaded = load_matrix(path)
+    assert isinstance(loaded, np.memmap)
+    assert loaded.dtype == np.float32
+    np.testing.assert_array_equal(loaded, matrix.toarray())
+
+# Test case 2: Sparse CSR matrices round trip with their arrays memory-mapped
+def test_sparse_round_trip(matrix, tmp_path):
+    path = str(tmp_path / 'X.npz')
+    save_matrix(matrix, path)
+
+    loaded = load_matrix(path)
+    assert sparse.isspmatrix_csr(loaded)
+    assert loaded.dtype == np.float32
+    assert not loaded.data.flags.owndata
+    np.testing.assert_array_equal(loaded.toarray(), matrix.toarray())
+    np.testing.assert_array_equal(load_matrix(path, mmap_mode=None).toarray(), matrix.toarray())
+
+# Test case 3: The extension must match the kind of matrix
+def test_save_matrix_checks_extension(matrix, tmp_path):
+    with pytest.raises(ValueError):
+        save_matrix(matrix, str(tmp_path / 'X.npy'))
+    with pytest.raises(ValueError):
+        save_matrix(matrix.toarray(), str(tmp_path / 'X.npz'))
+    with pytest.raises(ValueError):
+        save_matrix(matrix, str(tmp_path / 'X.csv'))
+    with pytest.raises(FileNotFoundError):
+        load_matrix(str(tmp_path / 'missing.npy'))
+
+# Test case 4: Memory use counts the values and, for sparse matrices, the index arrays
+def test_matrix_nbytes(matrix):
+    assert matrix_nbytes(matrix.toarray()) == 200 * 15 * 4
+    assert matrix_nbytes(matrix) == matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
@@ -0,0 +1,58 @@
+import pytest
+import json
+import numpy as np
+from sklearn.datasets import load_iris
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.linear_model import LogisticRegression
+import sys 
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.model_registry import save_models, load_model, load_manifest, list_versions
+
+@pytest.fixture
+def fitted_models():
+    X, y = load_iris(return_X_y=True)
+    models = {
+        'Logistic Regression': LogisticRegression(max_iter=1000).fit(X, y),
+        'K-Nearest Neighbors': KNeighborsClassifier().fit(X, y)
+    }
+    return models, X
+
+# Test case 1: Every save creates a new version with a manifest
+def test_save_models_versions(fitted_models, tmp_path):
+    models, _ = fitted_models
+    registry_dir = str(tmp_path / "models")
+
+    first = save_models(models, registry_dir, metadata={'seed': np.int64(123)})
+    second = save_models(models, registry_dir)
+
+    assert list_versions(registry_dir) == ['v1', 'v2']
+    assert first.endswith('v1') and second.endswith('v2')
+    manifest = json.loads((tmp_path / "models" / "v1" / "manifest.json").read_text())
+    assert manifest['metadata'] == {'seed': 123}
+    assert manifest['models']['K-Nearest Neighbors'] == 'K-Nearest_Neighbors.joblib'
+
+# Test case 2: Loaded models predict like the saved ones, latest version by default
+def test_load_model(fitted_models, tmp_path):
+    models, X = fitted_models
+    registry_dir = str(tmp_path / "models")
+    save_models(models, registry_dir)
+    save_models(models, registry_dir)
+
+    model = load_model(registry_dir, 'K-Nearest Neighbors')
+    np.testing.assert_array_equal(model.predict(X), models['K-Nearest Neighbors'].predict(X))
+    assert load_manifest(registry_dir)['version'] == 'v2'
+
+# Test case 3: Missing versions and model names raise errors
+def test_load_model_missing(fitted_models, tmp_path):
+    models, _ = fitted_models
+    registry_dir = str(tmp_path / "models")
+    with pytest.raises(FileNotFoundError):
+        load_model(registry_dir, 'Logistic Regression')
+
+    save_models(models, registry_dir)
+    with pytest.raises(FileNotFoundError):
+        load_model(registry_dir, 'Logistic Regression', version='v9')
+    with pytest.raises(KeyError):
+        load_model(registry_dir, 'Decision Tree')
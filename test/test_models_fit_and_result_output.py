@@ -1,6 +1,5 @@
 import pytest
 import pandas as pd
-import numpy as np
 from sklearn.datasets import load_iris
 from sklearn.model_selection import train_test_split
 from sklearn.compose import ColumnTransformer
@@ -10,6 +9,7 @@ import os
 current_dir = os.getcwd()
 sys.path.append(current_dir)
 from src.models_fit_and_result_output import models_fit_and_result_output
+from src.instrumentation import read_trace_log, TRACE_LOG_ENV
 
 @pytest.fixture
 def sample_data():
@@ -84,4 +84,22 @@ def test_models_fit_and_result_output_print(sample_data, capsys, tmp_path):
     assert "Tuning hyperparameters for Support Vector Machine" in captured.out
     assert "Evaluating Support Vector Machine on test set..." in captured.out
     assert "Tuning hyperparameters for K-Nearest Neighbors" in captured.out
-    assert "Evaluating K-Nearest Neighbors on test set..." in captured.out
\ No newline at end of file
+    assert "Evaluating K-Nearest Neighbors on test set..." in captured.out
+
+def test_models_fit_and_result_output_trace_log(sample_data, tmp_path, monkeypatch):
+    """Test if the tuning, the CV splits and the evaluation are logged for the selected models."""
+    preprocessor, X_train, X_test, y_train, y_test = sample_data
+    log_file = tmp_path / "trace.jsonl"
+    monkeypatch.setenv(TRACE_LOG_ENV, str(log_file))
+
+    models_fit_and_result_output(preprocessor, X_train, y_train, X_test, y_test, str(tmp_path),
+                                 n_iter=2, model_names=['Decision Tree'])
+
+    log = read_trace_log(str(log_file))
+    assert log['stage'].value_counts().to_dict() == {'model.cv': 10, 'model.tune': 1, 'model.evaluate': 1,
+                                                     'model.bootstrap': 1}
+    assert (log.loc[log['stage'] == 'model.cv', 'fit_time'] > 0).all()
+    assert not (tmp_path / "classification_report_Logistic_Regression.txt").exists()
+    with pytest.raises(ValueError):
+        models_fit_and_result_output(preprocessor, X_train, y_train, X_test, y_test, str(tmp_path),
+                                     model_names=['Random Forest'])
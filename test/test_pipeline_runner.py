@@ -0,0 +1,135 @@
+import pytest
+import json
+import sys
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+import src.pipeline_runner
+from src.pipeline_runner import Stage, run_pipeline, default_stages, _dependencies
+
+STEP_SCRIPT = '''
+import time
+import click
+
+@click.command()
+@click.option('--input', 'inputs', multiple=True)
+@click.option('--output')
+@click.option('--sleep', type=float, default=0)
+@click.option('--fail', is_flag=True)
+def main(inputs, output, sleep, fail):
+    if fail:
+        raise RuntimeError('stage failed')
+    time.sleep(sleep)
+    with open(output + '.log', 'a') as log:
+        log.write('run\\n')
+    with open(output, 'w') as f:
+        f.write(''.join(open(path).read() for path in inputs) + output)
+'''
+
+@pytest.fixture
+def pipeline(tmp_path):
+    """A raw file and a diamond of stages: two independent stages reading the first one."""
+    script = tmp_path / 'step.py'
+    script.write_text(STEP_SCRIPT)
+    raw = tmp_path / 'raw.txt'
+    raw.write_text('raw')
+    path = lambda name: str(tmp_path / name)
+
+    def stage(name, inputs, output, *extra):
+        args = [arg for item in inputs for arg in ('--input', item)] + ['--output', output, *extra]
+        return Stage(name, str(script), args, inputs, [output])
+
+    def make_stages(*extra_b):
+        return [
+            stage('a', [str(raw)], path('a.txt')),
+            stage('b', [path('a.txt')], path('b.txt'), '--sleep', '0.5', *extra_b),
+            stage('c', [path('a.txt')], path('c.txt'), '--sleep', '0.5'),
+            stage('d', [path('b.txt'), path('c.txt')], path('d.txt')),
+        ]
+    return make_stages, raw, path
+
+def runs(path, name):
+    with open(path(f'{name}.txt.log')) as log:
+        return len(log.readlines())
+
+# Test case 1: Stages run in dependency order, independent ones concurrently, with timings
+def test_run_pipeline(pipeline, tmp_path, capfd):
+    make_stages, raw, path = pipeline
+    timings = run_pipeline(make_stages(), manifest_dir=path('manifests'), timings_file=path('timings.json'))
+
+    order = [timing['stage'] for timing in timings]
+    assert order[0] == 'a' and order[-1] == 'd'
+    assert all(timing['status'] == 'ran' for timing in timings)
+    with open(path('d.txt')) as f:
+        assert f.read().startswith('raw')
+    with open(path('timings.json')) as f:
+        saved = json.load(f)
+    # b and c sleep 0.5s each and overlap
+    assert saved['wall_time'] < sum(timing['seconds'] for timing in saved['stages'])
+    assert 'Wall time' in capfd.readouterr().out
+
+# Test case 2: Unchanged stages are skipped; a changed input reruns the stages downstream of it
+def test_run_pipeline_skips_unchanged(pipeline):
+    make_stages, raw, path = pipeline
+    run_pipeline(make_stages(), manifest_dir=path('manifests'))
+    timings = run_pipeline(make_stages(), manifest_dir=path('manifests'))
+    assert {timing['status'] for timing in timings} == {'skipped'}
+
+    raw.write_text('changed')
+    timings = run_pipeline(make_stages(), manifest_dir=path('manifests'))
+    assert {timing['status'] for timing in timings} == {'ran'}
+    assert runs(path, 'd') == 2
+
+    run_pipeline(make_stages(), targets=['b'], manifest_dir=path('manifests'), force=True)
+    assert runs(path, 'b') == 3 and runs(path, 'd') == 2
+
+# Test case 3: Editing a module of the src package reruns the stages instead of skipping them
+def test_run_pipeline_reruns_on_source_change(pipeline, tmp_path, monkeypatch):
+    make_stages, raw, path = pipeline
+    source_dir = tmp_path / 'src'
+    source_dir.mkdir()
+    (source_dir / 'preprocessing.py').write_text('SCALE = 1\n')
+    monkeypatch.setattr(src.pipeline_runner, 'SOURCE_DIR', str(source_dir))
+    run_pipeline(make_stages(), manifest_dir=path('manifests'))
+    assert {timing['status'] for timing in run_pipeline(make_stages(), manifest_dir=path('manifests'))} == {'skipped'}
+
+    (source_dir / 'preprocessing.py').write_text('SCALE = 2\n')
+    timings = run_pipeline(make_stages(), manifest_dir=path('manifests'))
+    assert {timing['status'] for timing in timings} == {'ran'}
+    assert runs(path, 'a') == 2
+
+    # stages declaring their own sources only follow those
+    stages = [Stage(stage.name, stage.script, stage.args, stage.inputs, stage.outputs, sources=[])
+              for stage in make_stages()]
+    run_pipeline(stages, manifest_dir=path('manifests'))
+    (source_dir / 'preprocessing.py').write_text('SCALE = 3\n')
+    assert {timing['status'] for timing in run_pipeline(stages, manifest_dir=path('manifests'))} == {'skipped'}
+
+# Test case 4: A failing stage stops its dependents and the error is raised
+def test_run_pipeline_failure(pipeline):
+    make_stages, raw, path = pipeline
+    with pytest.raises(RuntimeError):
+        run_pipeline(make_stages('--fail'), manifest_dir=path('manifests'))
+    assert not os.path.exists(path('d.txt'))
+
+# Test case 5: Inconsistent stage definitions are rejected
+def test_dependencies_errors(pipeline):
+    make_stages, raw, path = pipeline
+    stages = make_stages()
+    stages[0].inputs.append(path('d.txt'))
+    with pytest.raises(ValueError):
+        _dependencies(stages)
+    with pytest.raises(ValueError):
+        _dependencies(make_stages() + [make_stages()[0]])
+    with pytest.raises(ValueError):
+        run_pipeline(make_stages(), targets=['missing'], manifest_dir=path('manifests'))
+
+# Test case 6: The default stages form the pipeline of the Makefile
+def test_default_stages():
+    dependencies = _dependencies(default_stages('feather'))
+    assert dependencies['combine'] == set()
+    assert dependencies['validate'] == {'combine'}
+    assert dependencies['eda'] == {'clean', 'split'}
+    assert dependencies['preprocess'] == {'clean', 'split'}
+    assert os.path.join(src.pipeline_runner.SOURCE_DIR, 'preprocessing.py') in default_stages()[0].source_files()
+    assert dependencies['model'] == {'preprocess'}
@@ -0,0 +1,113 @@
+import pytest
+import asyncio
+import json
+from sklearn.datasets import load_iris
+from sklearn.linear_model import LogisticRegression
+import sys 
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.prediction_service import MicroBatcher, start_server
+
+class CountingModel:
+    """Wrap a fitted model and count the predict_proba calls."""
+    def __init__(self, model):
+        self.model = model
+        self.classes_ = model.classes_
+        self.feature_names_in_ = model.feature_names_in_
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        return self.model.predict_proba(X)
+
+@pytest.fixture
+def model_and_data():
+    data = load_iris(as_frame=True)
+    model = LogisticRegression(max_iter=1000).fit(data.data, data.target)
+    return CountingModel(model), data.data
+
+# Test case 1: Concurrent requests are grouped into one predict_proba call
+def test_micro_batcher_groups_requests(model_and_data):
+    model, X = model_and_data
+
+    async def run():
+        async with MicroBatcher(model, max_batch_size=256, max_delay=0.05) as batcher:
+            return await asyncio.gather(*[batcher.predict(X.iloc[[i]]) for i in range(10)]), batcher
+
+    results, batcher = asyncio.run(run())
+
+    assert model.calls == 1
+    for i, result in enumerate(results):
+        assert len(result) == 1
+        assert result['prediction'][0] == model.model.predict(X.iloc[[i]])[0]
+    stats = batcher.stats.summary()
+    assert stats['requests'] == 10 and stats['batches'] == 1
+    assert stats['p50_ms'] <= stats['p99_ms']
+
+# Test case 2: Batches are split once max_batch_size rows are collected
+def test_micro_batcher_max_batch_size(model_and_data):
+    model, X = model_and_data
+
+    async def run():
+        async with MicroBatcher(model, max_batch_size=4, max_delay=0.05) as batcher:
+            await asyncio.gather(*[batcher.predict(X.iloc[[i]]) for i in range(8)])
+
+    asyncio.run(run())
+    assert model.calls == 2
+
+# Test case 3: The HTTP endpoint scores JSON records, rejects malformed ones and reports stats
+def test_http_predict_and_stats(model_and_data):
+    model, X = model_and_data
+
+    async def request(port, method, path, body=b""):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n"
+                     "Connection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        status = int(response.split(b" ", 2)[1])
+        return status, json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+    async def run():
+        async with MicroBatcher(model) as batcher:
+            server = await start_server(batcher, port=0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                records = json.dumps(X.iloc[:3].to_dict(orient="records")).encode()
+                predicted = await request(port, "POST", "/predict", records)
+                bad = await request(port, "POST", "/predict", b"[]")
+                malformed = [await request(port, "POST", "/predict", body) for body in [b"[1, 2]", b"[null]", b"[{}, 3]"]]
+                missing = await request(port, "POST", "/predict", json.dumps({"petal width (cm)": 0.2}).encode())
+                stats = await request(port, "GET", "/stats")
+            return predicted, bad, malformed, missing, stats
+
+    predicted, bad, malformed, missing, stats = asyncio.run(run())
+
+    assert predicted[0] == 200
+    assert [p['prediction'] for p in predicted[1]['predictions']] == model.model.predict(X.iloc[:3]).tolist()
+    assert bad[0] == 400
+    assert [status for status, _ in malformed] == [400, 400, 400]
+    assert missing[0] == 400 and 'Missing columns' in missing[1]['error']
+    assert stats[0] == 200 and stats[1]['rows'] == 3
+
+# Test case 4: Requests with missing columns are rejected, and a bad request only fails itself
+def test_micro_batcher_isolates_bad_requests(model_and_data):
+    model, X = model_and_data
+    reordered = X.iloc[[2]][X.columns[::-1]]
+    bad_value = X.iloc[[3]].astype(object)
+    bad_value.iloc[0, 0] = 'abc'
+
+    async def run():
+        async with MicroBatcher(model, max_delay=0.05) as batcher:
+            with pytest.raises(ValueError, match='Missing columns'):
+                await batcher.predict(X.iloc[[0]].drop(columns=X.columns[0]))
+            return await asyncio.gather(batcher.predict(X.iloc[[1]]), batcher.predict(reordered),
+                                        batcher.predict(bad_value), return_exceptions=True)
+
+    good, reordered_result, bad = asyncio.run(run())
+
+    assert good['prediction'][0] == model.model.predict(X.iloc[[1]])[0]
+    assert reordered_result['prediction'][0] == model.model.predict(X.iloc[[2]])[0]
+    assert isinstance(bad, ValueError)
@@ -0,0 +1,102 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.preprocessing import (build_preprocessor, feature_names, fit_preprocessor_streaming,
+                               transform_chunks, QuantileSketch)
+from src.columnar_io import read_frame
+
+@pytest.fixture
+def features():
+    """Heart disease features with missing values and the cleaned dtypes."""
+    rng = np.random.default_rng(42)
+    n = 300
+    df = pd.DataFrame({
+        'age': rng.integers(29, 78, n).astype('float32'),
+        'sex': rng.integers(0, 2, n),
+        'cp': rng.integers(1, 5, n),
+        'trestbps': rng.normal(130, 18, n).round(),
+        'chol': rng.normal(240, 50, n),
+        'fbs': rng.choice([0.0, 1.0, np.nan], n, p=[0.8, 0.15, 0.05]),
+        'restecg': rng.choice([0.0, 1.0, 2.0, np.nan], n),
+        'thalach': rng.normal(140, 25, n).round(),
+        'exang': rng.choice([0.0, 1.0, np.nan], n),
+        'oldpeak': rng.choice([0.0, 0.5, 1.2, 2.3, -0.5, np.nan], n),
+        'slope': rng.choice([1.0, 2.0, 3.0, np.nan], n),
+        'ca': rng.choice([0.0, 1.0, 2.0, 3.0, np.nan], n),
+        'thal': rng.choice([3.0, 6.0, 7.0, np.nan], n)
+    })
+    df.loc[rng.choice(n, 20, replace=False), 'chol'] = np.nan
+    for column in ['cp', 'restecg', 'exang']:
+        df[column] = df[column].astype('category')
+    return df
+
+# Test case 1: The streaming fit transforms like the in-memory fit
+@pytest.mark.parametrize("chunksize", [7, 64, 1000])
+def test_fit_preprocessor_streaming_matches_fit(features, chunksize):
+    expected = build_preprocessor().fit(features)
+    chunks = (features.iloc[i:i + chunksize] for i in range(0, len(features), chunksize))
+    streamed = fit_preprocessor_streaming(chunks)
+
+    np.testing.assert_allclose(streamed.transform(features), expected.transform(features), atol=1e-10)
+    assert feature_names(streamed) == feature_names(expected)
+    numeric = streamed.named_transformers_['pipeline-1']
+    np.testing.assert_allclose(numeric[0].statistics_, expected.named_transformers_['pipeline-1'][0].statistics_)
+    np.testing.assert_allclose(numeric[1].var_, expected.named_transformers_['pipeline-1'][1].var_)
+
+# Test case 2: The sketch gives exact medians for few distinct values and close ones otherwise
+def test_quantile_sketch():
+    rng = np.random.default_rng(0)
+    small = rng.integers(0, 50, 1001).astype(float)
+    sketch = QuantileSketch(max_bins=64)
+    for part in np.array_split(small, 10):
+        sketch.update(part)
+    assert sketch.quantile(0.5) == np.median(small)
+
+    large = rng.normal(0, 1, 100_000)
+    sketch = QuantileSketch(max_bins=256)
+    for part in np.array_split(large, 50):
+        sketch.update(part)
+    assert len(sketch.centroids) <= 256
+    assert sketch.quantile(0.5) == pytest.approx(np.median(large), abs=0.02)
+    assert np.isnan(QuantileSketch().quantile(0.5))
+
+# Test case 3: Chunks are transformed to disk with the named output columns
+def test_transform_chunks(features, tmp_path):
+    preprocessor = build_preprocessor().fit(features)
+    output_file = str(tmp_path / 'processed.parquet')
+    n_rows = transform_chunks(preprocessor, (features.iloc[i:i + 50] for i in range(0, 300, 50)), output_file)
+
+    written = read_frame(output_file)
+    assert n_rows == 300
+    assert written.columns.tolist() == feature_names(preprocessor)
+    np.testing.assert_allclose(written.to_numpy(), preprocessor.transform(features))
+
+# Test case 4: Float32 and sparse preprocessors give the same values in compact matrices
+@pytest.mark.parametrize("sparse", [False, True])
+def test_build_preprocessor_compact(features, sparse):
+    expected = build_preprocessor().fit_transform(features)
+    compact = build_preprocessor(dtype='float32', sparse=sparse)
+    transformed = compact.fit_transform(features)
+
+    assert transformed.dtype == np.float32
+    assert hasattr(transformed, 'tocsr') == sparse
+    dense = transformed.toarray() if sparse else transformed
+    np.testing.assert_allclose(dense, expected, rtol=1e-5, atol=1e-6)
+    streamed = fit_preprocessor_streaming([features.iloc[:100], features.iloc[100:]],
+                                          build_preprocessor(dtype='float32', sparse=sparse))
+    assert streamed.transform(features).dtype == np.float32
+    with pytest.raises(ValueError):
+        build_preprocessor(dtype='int8')
+
+# Test case 5: Unsupported transformers and empty streams are rejected
+def test_fit_preprocessor_streaming_errors(features):
+    from sklearn.compose import make_column_transformer
+    from sklearn.preprocessing import MinMaxScaler
+    with pytest.raises(ValueError):
+        fit_preprocessor_streaming([features], make_column_transformer((MinMaxScaler(), ['age'])))
+    with pytest.raises(ValueError):
+        fit_preprocessor_streaming([])
@@ -0,0 +1,53 @@
+import pytest
+import numpy as np
+import sys
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from sklearn.model_selection import train_test_split
+from src.split_data import split_indices, save_split, load_split
+
+@pytest.fixture
+def labels():
+    return np.random.default_rng(0).choice([0, 1, 2, 3, 4], 500, p=[0.45, 0.3, 0.12, 0.1, 0.03])
+
+# Test case 1: The default split matches train_test_split row for row, as int32 positions
+def test_split_matches_train_test_split():
+    train_idx, test_idx = split_indices(918)
+    expected_train, expected_test = train_test_split(np.arange(918), test_size=0.3, random_state=123)
+
+    assert train_idx.dtype == np.int32 and test_idx.dtype == np.int32
+    np.testing.assert_array_equal(train_idx, expected_train)
+    np.testing.assert_array_equal(test_idx, expected_test)
+
+# Test case 2: Stratified splits keep the label proportions
+def test_stratified_split(labels):
+    train_idx, test_idx = split_indices(len(labels), stratify=labels)
+
+    assert sorted(np.concatenate([train_idx, test_idx]).tolist()) == list(range(len(labels)))
+    for label in np.unique(labels):
+        assert np.mean(labels[test_idx] == label) == pytest.approx(np.mean(labels == label), abs=0.01)
+
+# Test case 3: Grouped splits keep every site in one split
+def test_grouped_split():
+    sites = np.repeat(['cleveland', 'hungarian', 'switzerland', 'va'], [303, 294, 123, 200])
+    train_idx, test_idx = split_indices(len(sites), groups=sites, random_state=1)
+
+    assert not set(sites[train_idx]) & set(sites[test_idx])
+    assert len(train_idx) + len(test_idx) == len(sites)
+    with pytest.raises(ValueError):
+        split_indices(len(sites), groups=sites, stratify=sites)
+    with pytest.raises(ValueError):
+        split_indices(10, groups=sites)
+
+# Test case 4: Splits are saved as int32 .npy files and loaded memory-mapped
+def test_save_and_load_split(tmp_path):
+    train_idx, test_idx = split_indices(100)
+    save_split(train_idx, test_idx, str(tmp_path))
+
+    loaded_train, loaded_test = load_split(str(tmp_path))
+    assert isinstance(loaded_train, np.memmap) and loaded_train.dtype == np.int32
+    np.testing.assert_array_equal(loaded_train, train_idx)
+    np.testing.assert_array_equal(loaded_test, test_idx)
+    with pytest.raises(FileNotFoundError):
+        load_split(str(tmp_path / 'missing'))
@@ -0,0 +1,36 @@
+import pytest
+import numpy as np
+import sys
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.synthetic_data import synthetic_heart_data, write_site_files, COLUMNS, MISSING_RATES
+from src.combine_load_data import combine_load_data
+
+# Test case 1: The data has the UCI columns, ranges and missing values, and is reproducible
+def test_synthetic_heart_data():
+    df = synthetic_heart_data(20000, seed=3)
+
+    assert df.columns.tolist() == COLUMNS
+    assert df.equals(synthetic_heart_data(20000, seed=3))
+    assert set(df['label']) == {0, 1, 2, 3, 4}
+    assert set(df['cp']) == {1.0, 2.0, 3.0, 4.0}
+    assert df['thalach'].dropna().between(60, 202).all()
+    for column, rate in MISSING_RATES.items():
+        assert df[column].isna().mean() == pytest.approx(rate, abs=0.01)
+    assert df['label'].isna().sum() == 0 and df['age'].isna().sum() == 0
+    assert df.duplicated().sum() >= 20
+    # sicker patients reach lower maximum heart rates
+    assert df.groupby('label')['thalach'].mean().is_monotonic_decreasing
+
+# Test case 2: Site files are read back by combine_load_data with '?' for missing values
+def test_write_site_files(tmp_path):
+    df = synthetic_heart_data(1001, seed=0)
+    paths = write_site_files(df, str(tmp_path))
+
+    assert [os.path.basename(path) for path in paths] == ['processed.hungarian.data', 'processed.switzerland.data',
+                                                          'processed.cleveland.data', 'processed.va.data']
+    combined = combine_load_data(paths, COLUMNS)
+    assert combined.shape == (1001, 14)
+    assert (combined['ca'] == '?').sum() == df['ca'].isna().sum()
+    np.testing.assert_array_equal(combined['age'].to_numpy(), df['age'].to_numpy())
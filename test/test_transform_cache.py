@@ -0,0 +1,70 @@
+import pytest
+import numpy as np
+import pandas as pd
+from sklearn.datasets import load_iris
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.linear_model import LogisticRegression
+from sklearn.neighbors import KNeighborsClassifier
+import sys 
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.transform_cache import TransformCache, DEFAULT_MAX_BYTES
+from src.tune_models import tune_models
+
+# Test case 1: Values are computed once and then served from memory
+def test_transform_cache_hits_and_misses():
+    cache = TransformCache()
+    assert cache.max_bytes == DEFAULT_MAX_BYTES
+    calls = []
+    compute = lambda: calls.append(1) or np.ones(3)
+
+    cache.get('a', compute)
+    cache.get('a', compute)
+    cache.get('b', compute)
+
+    assert len(calls) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+# Test case 2: Least recently used entries are evicted beyond max_bytes
+def test_transform_cache_eviction():
+    cache = TransformCache(max_bytes=2 * 800)
+    for key in ['a', 'b', 'c']:
+        cache.get(key, lambda: np.zeros(100))
+
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    cache.get('a', lambda: np.zeros(100))
+    assert cache.misses == 4
+
+# Test case 3: Entries persisted on disk are reused by a new cache
+def test_transform_cache_disk(tmp_path):
+    TransformCache(cache_dir=str(tmp_path)).get('a', lambda: np.arange(5))
+    cache = TransformCache(cache_dir=str(tmp_path))
+    value = cache.get('a', lambda: pytest.fail("value should be loaded from disk"))
+
+    np.testing.assert_array_equal(value, np.arange(5))
+    assert cache.hits == 1
+
+# Test case 4: tune_models preprocesses each fold once for all models and candidates
+def test_tune_models_uses_transform_cache():
+    data = load_iris()
+    X = pd.DataFrame(data.data, columns=data.feature_names)
+    y = data.target
+    preprocessor = StandardScaler()
+    pipelines = {
+        'lr': make_pipeline(preprocessor, LogisticRegression(max_iter=1000)),
+        'knn': make_pipeline(preprocessor, KNeighborsClassifier())
+    }
+    params = {
+        'lr': {'logisticregression__C': [0.01, 0.1, 1, 10]},
+        'knn': {'kneighborsclassifier__n_neighbors': [3, 5, 7, 9]}
+    }
+    cache = TransformCache()
+    results = tune_models(pipelines, params, X, y, n_iter=4, cv=5, transform_cache=cache)
+
+    # 5 folds + the full training set for the refit
+    assert cache.misses == 6
+    assert cache.hits == 2 * 4 * 5 - 5 + 2 * 2 - 1
+    assert results['knn']['best_estimator'].predict(X).shape == (150,)
@@ -0,0 +1,108 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sklearn
+from scipy import stats
+from sklearn.datasets import load_iris
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+import sys
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.trial_store import TrialStore, params_key
+from src.tune_models import tune_models
+
+@pytest.fixture
+def search_setup():
+    """Two pipelines with continuous and discrete parameter distributions on the iris data."""
+    X, y = load_iris(return_X_y=True, as_frame=True)
+    pipelines = {
+        'Logistic Regression': make_pipeline(StandardScaler(), LogisticRegression(max_iter=500)),
+        'Decision Tree': make_pipeline(StandardScaler(), DecisionTreeClassifier(random_state=0))
+    }
+    param_distributions = {
+        'Logistic Regression': {'logisticregression__C': stats.loguniform(1e-2, 1e2)},
+        'Decision Tree': {'decisiontreeclassifier__max_depth': [2, 3, 4, 5, 6, 7],
+                          'decisiontreeclassifier__criterion': ['gini', 'entropy']}
+    }
+    return pipelines, param_distributions, X, y
+
+# Test case 1: Parameters have one canonical text, whatever their order and NumPy types
+def test_params_key():
+    assert params_key({'b': np.int64(3), 'a': np.float64(0.1)}) == params_key({'a': 0.1, 'b': 3})
+    assert params_key({'a': 0.1}) != params_key({'a': 0.1000001})
+
+# Test case 2: A repeated search refits nothing and gives the same results
+@pytest.mark.parametrize('search', ['random', 'halving'])
+def test_tune_models_reuses_trials(search_setup, tmp_path, search):
+    pipelines, param_distributions, X, y = search_setup
+    expected = tune_models(pipelines, param_distributions, X, y, n_iter=4, search=search)
+
+    store = TrialStore(str(tmp_path))
+    tune_models(pipelines, param_distributions, X, y, n_iter=4, search=search, trial_store=store)
+    assert store.hits == 0 and store.misses > 0
+    store = TrialStore(str(tmp_path))
+    results = tune_models(pipelines, param_distributions, X, y, n_iter=4, search=search, trial_store=store)
+    assert store.misses == 0 and store.hits > 0
+
+    for name in pipelines:
+        assert results[name]['best_params'] == expected[name]['best_params']
+        np.testing.assert_array_equal(results[name]['cv_results']['mean_test_score'],
+                                      expected[name]['cv_results']['mean_test_score'])
+        assert results[name]['best_estimator'].score(X, y) == expected[name]['best_estimator'].score(X, y)
+
+# Test case 3: Only new (candidate, fold) pairs are fitted; changed data, models or scikit-learn start afresh
+def test_tune_models_partial_reuse(search_setup, tmp_path, monkeypatch):
+    pipelines, param_distributions, X, y = search_setup
+    store = TrialStore(str(tmp_path))
+    tune_models(pipelines, param_distributions, X, y, n_iter=3, seed=1, trial_store=store)
+
+    # a larger search with the same seed samples the same first candidates
+    store = TrialStore(str(tmp_path))
+    tune_models(pipelines, param_distributions, X, y, n_iter=5, seed=1, trial_store=store)
+    assert (store.hits, store.misses) == (2 * 3 * 5, 2 * 2 * 5)
+
+    # the discrete decision tree grid is shared with another seed, the continuous C is not
+    store = TrialStore(str(tmp_path))
+    tune_models(pipelines, param_distributions, X, y, n_iter=5, seed=2, trial_store=store)
+    seed_2 = store.load(seed=2)
+    assert store.hits > 0 and len(seed_2) == 2 * 5 * 5
+    assert set(store.load(seed=1)['params']) != set(seed_2['params'])
+
+    store = TrialStore(str(tmp_path))
+    monkeypatch.setattr(sklearn, '__version__', '0.0.1')
+    tune_models(pipelines, param_distributions, X, y, n_iter=3, seed=1, trial_store=store)
+    assert store.hits == 0
+    monkeypatch.undo()
+
+    store = TrialStore(str(tmp_path))
+    pipelines['Decision Tree'] = make_pipeline(StandardScaler(), DecisionTreeClassifier(random_state=1))
+    tune_models(pipelines, param_distributions, X.iloc[1:], y.iloc[1:], n_iter=3, seed=1, trial_store=store)
+    assert store.hits == 0
+
+# Test case 4: Stored searches can be compared without refitting, and compacted
+def test_trial_store_summary_and_compact(search_setup, tmp_path):
+    pipelines, param_distributions, X, y = search_setup
+    for n_iter in [2, 4]:
+        results = tune_models(pipelines, param_distributions, X, y, n_iter=n_iter, trial_store=TrialStore(str(tmp_path)))
+
+    store = TrialStore(str(tmp_path))
+    summary = store.summary()
+    assert len(summary) == 8 and (summary['n_folds'] == 5).all()
+    best = summary[summary['model'] == 'Logistic Regression'].iloc[0]
+    assert best['params'] == params_key(results['Logistic Regression']['best_params'])
+    assert best['mean_score'] == pytest.approx(results['Logistic Regression']['best_score'])
+
+    data_hash = store.load()['data_hash'].iloc[0]
+    folds = store.load_folds(data_hash)
+    assert folds['fold'].tolist() == [0, 1, 2, 3, 4]
+    assert sorted(np.concatenate(folds['test_indices'].tolist())) == list(range(len(X)))
+
+    trials = store.load()
+    store.compact()
+    assert len(os.listdir(tmp_path / 'trials')) == 1 and len(os.listdir(tmp_path / 'folds')) == 1
+    pd.testing.assert_frame_equal(store.load().sort_values(['model', 'params', 'fold']).reset_index(drop=True),
+                                  trials.sort_values(['model', 'params', 'fold']).reset_index(drop=True))
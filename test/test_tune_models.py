@@ -0,0 +1,95 @@
+import pytest
+import numpy as np
+import pandas as pd
+from scipy import stats
+from sklearn.datasets import load_iris
+from sklearn.model_selection import RandomizedSearchCV
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+import sys 
+import os
+current_dir = os.getcwd()
+sys.path.append(current_dir)
+from src.tune_models import tune_models
+
+@pytest.fixture
+def search_setup():
+    """Fixture with two pipelines, their parameter distributions and iris data."""
+    data = load_iris()
+    X = pd.DataFrame(data.data, columns=data.feature_names)
+    y = pd.Series(data.target)
+    pipelines = {
+        'Logistic Regression': make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000)),
+        'Decision Tree': make_pipeline(StandardScaler(), DecisionTreeClassifier(random_state=123))
+    }
+    param_distributions = {
+        'Logistic Regression': {'logisticregression__C': stats.loguniform(1e-3, 1e3)},
+        'Decision Tree': {
+            'decisiontreeclassifier__max_depth': [1, 2, 3, 5],
+            'decisiontreeclassifier__min_samples_split': stats.randint(2, 20)
+        }
+    }
+    return pipelines, param_distributions, X, y
+
+# Test case 1: Best parameters and scores match a serial RandomizedSearchCV
+@pytest.mark.parametrize("n_jobs", [None, 2])
+def test_tune_models_matches_randomized_search(search_setup, n_jobs):
+    pipelines, param_distributions, X, y = search_setup
+    results = tune_models(pipelines, param_distributions, X, y, n_iter=5, seed=42, n_jobs=n_jobs)
+
+    for model_name, pipeline in pipelines.items():
+        search = RandomizedSearchCV(pipeline, param_distributions[model_name], n_iter=5,
+                                    cv=5, scoring="accuracy", random_state=42)
+        search.fit(X, y)
+        assert results[model_name]['best_params'] == search.best_params_
+        assert results[model_name]['best_score'] == pytest.approx(search.best_score_)
+        np.testing.assert_allclose(results[model_name]['cv_results']['mean_test_score'],
+                                   search.cv_results_['mean_test_score'])
+        np.testing.assert_array_equal(results[model_name]['best_estimator'].predict(X),
+                                      search.best_estimator_.predict(X))
+
+# Test case 2: cv_results contain per-split scores for every candidate
+def test_tune_models_cv_results_shape(search_setup):
+    pipelines, param_distributions, X, y = search_setup
+    results = tune_models(pipelines, param_distributions, X, y, n_iter=3, cv=4)
+
+    cv_results = results['Decision Tree']['cv_results']
+    assert len(cv_results['params']) == 3
+    for k in range(4):
+        assert len(cv_results[f'split{k}_test_score']) == 3
+        assert len(cv_results[f'split{k}_fit_time']) == 3
+    assert cv_results['rank_test_score'].min() == 1
+
+# Test case 3: Successive halving evaluates only the survivors on every fold
+def test_tune_models_halving_drops_candidates(search_setup):
+    pipelines, param_distributions, X, y = search_setup
+    results = tune_models(pipelines, param_distributions, X, y, n_iter=9, cv=5,
+                          search="halving", halving_factor=3)
+
+    for model_name, result in results.items():
+        n_folds = result['cv_results']['n_folds']
+        best_index = result['cv_results']['rank_test_score'].argmin()
+        # 9 candidates on 1 fold, then the best 3 on all 5 folds
+        assert sorted(n_folds.tolist()) == [1] * 6 + [5] * 3
+        assert n_folds[best_index] == 5
+        assert result['best_params'] == result['cv_results']['params'][best_index]
+
+# Test case 4: Unknown search strategies are rejected
+def test_tune_models_unknown_search(search_setup):
+    pipelines, param_distributions, X, y = search_setup
+    with pytest.raises(ValueError):
+        tune_models(pipelines, param_distributions, X, y, search="grid")
+
+# Test case 5: Every best pipeline holds its own copy of the shared fitted preprocessor
+def test_tune_models_pipelines_do_not_share_steps(search_setup):
+    pipelines, param_distributions, X, y = search_setup
+    results = tune_models(pipelines, param_distributions, X, y, n_iter=2)
+
+    tree = results['Decision Tree']['best_estimator']
+    logistic = results['Logistic Regression']['best_estimator']
+    assert tree[0] is not logistic[0]
+    expected = logistic.predict_proba(X)
+    tree[0].set_params(with_mean=False).fit(X * 10)
+    np.testing.assert_array_equal(logistic.predict_proba(X), expected)
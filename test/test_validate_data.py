@@ -4,7 +4,7 @@ import sys
 import os
 current_dir = os.getcwd()
 sys.path.append(current_dir)
-from src.validate_data import check_empty_obs, check_missingness, check_duplicate_obs
+from src.validate_data import check_empty_obs, check_missingness, check_duplicate_obs, check_value_ranges, validate_chunks
 
 # Test for check_empty_obs
 def test_check_empty_obs_no_empty_rows(capfd):
@@ -55,4 +55,61 @@ def test_check_duplicate_obs_with_duplicates(capfd):
     
     # Capture printed output
     captured = capfd.readouterr()
-    assert "Warning: There're duplicate rows" in captured.out
\ No newline at end of file
+    assert "Warning: There're duplicate rows" in captured.out
+
+# Test for check_value_ranges
+def test_check_value_ranges_no_violations(capfd):
+    """Test check_value_ranges when every value is in range or missing."""
+    df = pd.DataFrame({'age': [63, None, 41], 'cp': ['1', '?', '4']})
+    report = check_value_ranges(df, {'age': ('between', 0, 120), 'cp': ('isin', [1, 2, 3, 4])})
+    captured = capfd.readouterr()
+    assert "No outlier or anomalous value found." in captured.out
+    assert report['age']['violations'] == 0 and report['cp']['violations'] == 0
+
+def test_check_value_ranges_with_violations(capfd):
+    """Test check_value_ranges reports per-rule counts and row indices."""
+    df = pd.DataFrame({'age': [63, 150, -1], 'cp': [1, 5, 'x'], 'thal': [3, 6, 7]},
+                      index=[10, 11, 12])
+    report = check_value_ranges(df, {'age': ('between', 0, 120), 'cp': ('isin', [1, 2, 3, 4]),
+                                     'thal': ('isin', [3, 6, 7])})
+    captured = capfd.readouterr()
+    assert report['age']['violations'] == 2
+    assert report['age']['rows'].tolist() == [11, 12]
+    assert report['cp']['rows'].tolist() == [11, 12]
+    assert report['thal']['violations'] == 0
+    assert "Warning: 2 value(s) violate 'age between 0 and 120'." in captured.out
+
+def test_check_value_ranges_categorical_columns():
+    """Test check_value_ranges on categorical columns from the cleaning step."""
+    df = pd.DataFrame({'cp': pd.Series([1.0, 2.0, 9.0, None]).astype('category')})
+    report = check_value_ranges(df, {'cp': ('isin', [1, 2, 3, 4])})
+    assert report['cp']['rows'].tolist() == [2]
+
+def test_check_value_ranges_missing_column():
+    """Test check_value_ranges raises for rules on unknown columns."""
+    with pytest.raises(KeyError):
+        check_value_ranges(pd.DataFrame({'A': [1]}), {'age': ('between', 0, 120)})
+
+# Test for validate_chunks
+def test_validate_chunks_matches_in_memory(capfd):
+    """Test validate_chunks gives the same counts as the in-memory checks."""
+    df = pd.DataFrame({'A': [1, None, 2, 1, None, 2, 3], 'B': ['x', None, '?', 'x', None, '?', 'y']})
+    chunks = [df.iloc[i:i + 3] for i in range(0, len(df), 3)]
+
+    report = validate_chunks(chunks, threshold=0.5)
+
+    captured = capfd.readouterr()
+    assert report['n_rows'] == 7
+    assert report['empty_rows'] == df.isna().all(axis=1).sum()
+    pd.testing.assert_series_equal(report['missing_prop'], df.isna().mean())
+    assert report['duplicate_rows'] == df.duplicated().sum()
+    assert report['duplicate_index'].tolist() == df.index[df.duplicated()].tolist()
+    assert "Warning: There're 3 duplicate rows" in captured.out
+
+def test_validate_chunks_mixed_dtypes(capfd):
+    """Test validate_chunks finds duplicates across chunks parsed with different dtypes."""
+    chunks = [pd.DataFrame({'A': [1, 2]}), pd.DataFrame({'A': [1.0, 3.0]}, index=[2, 3])]
+    report = validate_chunks(chunks)
+    captured = capfd.readouterr()
+    assert report['duplicate_index'].tolist() == [2]
+    assert "No missing row found." in captured.out